@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0002_hot_path_indexes'),
+        ('events', '0018_event_trending_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_event_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['event', '-created_at', '-id'], name='comment_event_created_idx'),
+        ),
+    ]
@@ -1,11 +1,22 @@
 # comments/models.py
 from django.db import models
 from django.contrib.auth.models import User
-from events.models import Event
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from events.models import Event, update_engagement
+
+# Digits per id in Comment.path
+PATH_WIDTH = 10
+
 
 class Comment(models.Model):
     """
-    Comment model, related to User and Event.
+    Comment model, related to User and Event. Replies form threads: each
+    comment stores the top-level comment it belongs to (root) and a
+    materialized path of zero-padded ids from the root down, so a whole
+    thread or subtree is one range scan on (root, path) in reply order.
     """
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     event = models.ForeignKey(
@@ -13,12 +24,99 @@ class Comment(models.Model):
         related_name='comments', 
         on_delete=models.CASCADE
     )
+    parent = models.ForeignKey(
+        'self', null=True, blank=True, related_name='replies', on_delete=models.CASCADE
+    )
+    # Set once the comment has an id; see place_in_thread() below
+    root = models.ForeignKey(
+        'self', null=True, blank=True, related_name='+', on_delete=models.CASCADE
+    )
+    path = models.CharField(max_length=250, blank=True, editable=False)
+    # Direct replies, kept in step by the receivers below
+    reply_count = models.PositiveIntegerField(default=0)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pages of an event's comments, see CommentCursorPagination
+            models.Index(fields=['event', '-created_at', '-id'], name='comment_event_created_idx'),
+            # The same for top-level comments only, for threaded pages
+            models.Index(
+                fields=['event', '-created_at', '-id'],
+                condition=Q(parent__isnull=True),
+                name='comment_event_thread_idx',
+            ),
+            models.Index(fields=['root', 'path'], name='comment_root_path_idx'),
+        ]
         
     def __str__(self):
         return f'{self.owner} commented on {self.event}'
+
+    @property
+    def depth(self):
+        """0 for top-level comments, 1 for their replies and so on"""
+        return max(len(self.path) // PATH_WIDTH - 1, 0)
+
+    def can_have_replies(self):
+        return len(self.path) + PATH_WIDTH <= self._meta.get_field('path').max_length
+
+
+def thread(comment):
+    """
+    A comment and every reply beneath it, in reply order: parents before
+    their replies, siblings oldest first. Paths are all digits, so the
+    subtree is the range [path, path + 1) under any collation.
+    """
+    upper = str(int(comment.path) + 1).zfill(len(comment.path))
+    return Comment.objects.filter(
+        root_id=comment.root_id, path__gte=comment.path, path__lt=upper
+    ).order_by('path')
+
+
+def first_replies(root_ids, count):
+    """
+    Up to `count` replies from each of the given threads, in reply order,
+    in a single query: a row number per thread over the (root, path)
+    index, filtered to the first rows of each.
+    """
+    return (
+        Comment.objects.filter(root_id__in=root_ids, parent__isnull=False)
+        .annotate(position=Window(RowNumber(), partition_by=F('root_id'), order_by=F('path').asc()))
+        .filter(position__lte=count)
+        .order_by('path')
+    )
+
+
+@receiver(post_save, sender=Comment)
+def increment_comments_count(sender, instance, created, **kwargs):
+    if created:
+        update_engagement(instance.event_id, 'comments_count', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comments_count(sender, instance, **kwargs):
+    update_engagement(instance.event_id, 'comments_count', -1, instance.created_at)
+
+
+@receiver(post_save, sender=Comment)
+def place_in_thread(sender, instance, created, **kwargs):
+    """Fill in a new comment's root and path, and count it on its parent"""
+    if not created:
+        return
+    parent = instance.parent
+    instance.path = (parent.path if parent else '') + str(instance.pk).zfill(PATH_WIDTH)
+    instance.root_id = parent.root_id if parent else instance.pk
+    Comment.objects.filter(pk=instance.pk).update(path=instance.path, root_id=instance.root_id)
+    if parent:
+        Comment.objects.filter(pk=parent.pk).update(reply_count=F('reply_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_reply_count(sender, instance, **kwargs):
+    if instance.parent_id:
+        Comment.objects.filter(pk=instance.parent_id, reply_count__gte=1).update(
+            reply_count=F('reply_count') - 1
+        )
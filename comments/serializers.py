@@ -1,19 +1,88 @@
 # comments/serializers.py
+from collections import defaultdict
+
+from django.conf import settings
 from rest_framework import serializers
-from .models import Comment
+from .models import Comment, first_replies
 
 class CommentSerializer(serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.username')
     event_title = serializers.ReadOnlyField(source='event.title')
     is_owner = serializers.SerializerMethodField()
+    # Threading: set parent to reply; the rest is maintained for you
+    root = serializers.ReadOnlyField(source='root_id')
+    depth = serializers.ReadOnlyField()
+    reply_count = serializers.ReadOnlyField()
 
     def get_is_owner(self, obj):
         request = self.context['request']
         return request.user == obj.owner
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            # A comment's event and place in its thread are fixed once posted
+            for name in ('event', 'parent'):
+                if name in fields:
+                    fields[name].read_only = True
+        return fields
+
+    def get_event_id(self, attrs):
+        return attrs['event'].pk
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if self.instance is not None:
+            return attrs
+        parent = attrs.get('parent')
+        if parent is not None:
+            if parent.event_id != self.get_event_id(attrs):
+                raise serializers.ValidationError(
+                    {'parent': 'Replies must be on the same event as the comment they answer.'}
+                )
+            if not parent.can_have_replies():
+                raise serializers.ValidationError({'parent': 'This thread is too deep to reply to.'})
+        return attrs
+
     class Meta:
         model = Comment
         fields = [
-            'id', 'owner', 'event', 'event_title','content', 
-            'created_at', 'updated_at', 'is_owner'
-        ] 
\ No newline at end of file
+            'id', 'owner', 'event', 'event_title','content',
+            'created_at', 'updated_at', 'is_owner',
+            'parent', 'root', 'depth', 'reply_count',
+        ]
+
+
+class ThreadListSerializer(serializers.ListSerializer):
+    """
+    Loads the first COMMENT_THREAD_REPLIES replies of every thread on the
+    page in one query, instead of one query per top-level comment.
+    """
+    def to_representation(self, data):
+        roots = list(data.all() if hasattr(data, 'all') else data)
+        replies = self.context.setdefault('thread_replies', defaultdict(list))
+        if roots:
+            page = first_replies([root.pk for root in roots], settings.COMMENT_THREAD_REPLIES)
+            for reply in page.select_related('owner', 'event'):
+                replies[reply.root_id].append(reply)
+        return super().to_representation(roots)
+
+
+class EventCommentSerializer(CommentSerializer):
+    """
+    Top-level comments under /api/events/<id>/comments/, where the URL
+    sets the event, each with the start of its thread under `replies`.
+    """
+    replies = serializers.SerializerMethodField()
+
+    def get_event_id(self, attrs):
+        return int(self.context['view'].kwargs['event_pk'])
+
+    def get_replies(self, obj):
+        replies = self.context.get('thread_replies', {}).get(obj.pk, [])
+        return CommentSerializer(replies, many=True, context=self.context).data
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['replies']
+        read_only_fields = ['event']
+        list_serializer_class = ThreadListSerializer
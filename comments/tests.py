@@ -1,3 +1,217 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Event
+from .models import Comment, thread
+
+
+class EventCommentListTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.event = self._create_event()
+        self.other_event = self._create_event()
+        self.url = reverse('event-comment-list', kwargs={'event_pk': self.event.pk})
+
+    def _create_event(self):
+        return Event.objects.create(
+            owner=self.user, title='Test Event', description='Test Description',
+            date=timezone.now() + timedelta(days=7), location='Test Location', category='tech',
+        )
+
+    def _comment(self, content, event=None):
+        return Comment.objects.create(owner=self.user, event=event or self.event, content=content)
+
+    def _walk(self, url):
+        contents = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            contents += [row['content'] for row in response.data['results']]
+            url = response.data['next']
+        return contents
+
+    def test_pages_cover_only_this_events_comments(self):
+        """Test walking the cursor returns the event's comments once, newest first"""
+        for index in range(15):
+            self._comment(f'Comment {index}')
+        self._comment('Elsewhere', event=self.other_event)
+        self.assertEqual(self._walk(self.url), [f'Comment {index}' for index in reversed(range(15))])
+
+    def test_since_returns_only_new_comments(self):
+        """Test the since link fetches comments posted after the page"""
+        self._comment('Old')
+        first = self.client.get(self.url)
+        since = first.data['since']
+
+        self.assertEqual(self.client.get(since).data['results'], [])
+        self._comment('New')
+        self._comment('Newer')
+        response = self.client.get(since)
+        self.assertEqual([row['content'] for row in response.data['results']], ['Newer', 'New'])
+
+        # Polling again from the newest comment finds nothing more
+        self.assertEqual(self.client.get(response.data['since']).data['results'], [])
+
+    def test_page_query_count_is_constant(self):
+        """Test a page is three queries, however many threads it has"""
+        self._comment('Only')
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+        for index in range(9):
+            self._comment(f'Comment {index}')
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['event_title'], 'Test Event')
+
+    def test_post_takes_the_event_from_the_url(self):
+        """Test commenting through the event URL ignores any event in the body"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, {'content': 'Hello', 'event': self.other_event.pk})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Comment.objects.get().event, self.event)
+
+    def test_unknown_event_is_404(self):
+        """Test listing comments of a missing event is a 404, not an empty page"""
+        url = reverse('event-comment-list', kwargs={'event_pk': self.other_event.pk + 100})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_flat_list_filters_by_event(self):
+        """Test /api/comments/?event= returns one event's comments"""
+        self._comment('Here')
+        self._comment('Elsewhere', event=self.other_event)
+        response = self.client.get(reverse('comment-list'), {'event': self.event.pk})
+        self.assertEqual([row['content'] for row in response.data['results']], ['Here'])
+
+    def test_pages_read_the_event_index(self):
+        """Test an event's comment page is read from the keyset index"""
+        queryset = Comment.objects.filter(event=self.event).order_by('-created_at', '-id')[:11]
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            self.assertIn('comment_event_created_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+class CommentThreadTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.event = Event.objects.create(
+            owner=self.user, title='Test Event', description='Test Description',
+            date=timezone.now() + timedelta(days=7), location='Test Location', category='tech',
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _comment(self, content, parent=None):
+        return Comment.objects.create(
+            owner=self.user, event=self.event, content=content, parent=parent
+        )
+
+    def _tree(self):
+        """root > (a > a1, b), plus a second thread"""
+        root = self._comment('root')
+        a = self._comment('a', root)
+        self._comment('b', root)
+        self._comment('a1', a)
+        self._comment('other')
+        return root, a
+
+    def test_replies_get_root_path_and_counts(self):
+        """Test a reply records its thread and bumps its parent's reply_count"""
+        root, a = self._tree()
+        a.refresh_from_db()
+        root.refresh_from_db()
+        self.assertEqual(a.root, root)
+        self.assertEqual(a.depth, 1)
+        self.assertTrue(a.path.startswith(root.path))
+        self.assertEqual(root.reply_count, 2)
+        self.assertEqual(a.reply_count, 1)
+
+        Comment.objects.get(content='a1').delete()
+        a.refresh_from_db()
+        self.assertEqual(a.reply_count, 0)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.comments_count, 4)
+
+    def test_thread_is_one_range_in_reply_order(self):
+        """Test a subtree comes back parents first, without other threads"""
+        root, a = self._tree()
+        root.refresh_from_db()
+        a.refresh_from_db()
+        self.assertEqual([c.content for c in thread(root)], ['root', 'a', 'a1', 'b'])
+        self.assertEqual([c.content for c in thread(a)], ['a', 'a1'])
+
+        plan = thread(root).explain()
+        if connection.vendor == 'sqlite':
+            self.assertIn('comment_root_path_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_thread_endpoint(self):
+        """Test /thread/ returns the whole thread with depths in two queries"""
+        root, _ = self._tree()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('comment-thread', args=[root.pk]))
+        rows = [(row['content'], row['depth']) for row in response.data['results']]
+        self.assertEqual(rows, [('root', 0), ('a', 1), ('a1', 2), ('b', 1)])
+
+    @override_settings(COMMENT_THREAD_REPLIES=2)
+    def test_event_list_nests_first_replies(self):
+        """Test the event list shows top-level comments with their first replies"""
+        root, _ = self._tree()
+        self._comment('c', root)
+        url = reverse('event-comment-list', kwargs={'event_pk': self.event.pk})
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        threads = {row['content']: row for row in response.data['results']}
+        self.assertEqual(list(threads), ['other', 'root'])
+        self.assertEqual([row['content'] for row in threads['root']['replies']], ['a', 'a1'])
+        self.assertEqual(threads['root']['reply_count'], 3)
+        self.assertEqual(threads['other']['replies'], [])
+
+    def test_edits_cannot_move_a_comment(self):
+        """Test updating a comment ignores a new event or parent"""
+        root = self._comment('root')
+        reply = self._comment('reply', root)
+        other_event = Event.objects.create(
+            owner=self.user, title='Other', description='d',
+            date=timezone.now() + timedelta(days=7), location='Test Location', category='tech',
+        )
+        response = self.client.put(
+            reverse('comment-detail', args=[reply.pk]),
+            {'content': 'edited', 'event': other_event.pk, 'parent': ''},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        reply.refresh_from_db()
+        self.assertEqual((reply.content, reply.event, reply.parent), ('edited', self.event, root))
+
+    def test_since_covers_new_threads_not_replies(self):
+        """Test the event list's since link only returns new top-level comments"""
+        root = self._comment('root')
+        since = self.client.get(reverse('event-comment-list', kwargs={'event_pk': self.event.pk})).data['since']
+        self._comment('reply', root)
+        self.assertEqual(self.client.get(since).data['results'], [])
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 1)
+
+    def test_reply_through_the_api(self):
+        """Test posting a reply, and rejecting a parent from another event"""
+        root = self._comment('root')
+        url = reverse('event-comment-list', kwargs={'event_pk': self.event.pk})
+        response = self.client.post(url, {'content': 'reply', 'parent': root.pk})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['root'], root.pk)
+        self.assertEqual(response.data['depth'], 1)
+
+        other_event = Event.objects.create(
+            owner=self.user, title='Other', description='d',
+            date=timezone.now() + timedelta(days=7), location='Test Location', category='tech',
+        )
+        url = reverse('event-comment-list', kwargs={'event_pk': other_event.pk})
+        response = self.client.post(url, {'content': 'stray', 'parent': root.pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parent', response.data)
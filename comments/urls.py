@@ -5,4 +5,6 @@ from . import views
 urlpatterns = [
     path('comments/', views.CommentList.as_view(), name='comment-list'),
     path('comments/<int:pk>/', views.CommentDetail.as_view(), name='comment-detail'),
+    path('comments/<int:pk>/thread/', views.CommentThread.as_view(), name='comment-thread'),
+    path('events/<int:event_pk>/comments/', views.EventCommentList.as_view(), name='event-comment-list'),
 ]
\ No newline at end of file
@@ -1,24 +1,70 @@
 # comments/views.py
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Comment
-from .serializers import CommentSerializer
+from .models import Comment, thread
+from .serializers import CommentSerializer, EventCommentSerializer
+from events.models import Event
+from eventify.pagination import CommentCursorPagination, ThreadPagination
+from eventify.counters import AtomicCreateMixin
 from eventify.permissions import IsOwnerOrReadOnly
 
-class CommentList(generics.ListCreateAPIView):
+class CommentList(AtomicCreateMixin, generics.ListCreateAPIView):
     """
     List comments or create a comment if logged in.
     Can filter by event and owner.
     """
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    queryset = Comment.objects.all()
+    # owner and event are read for owner, event_title and is_owner
+    queryset = Comment.objects.select_related('owner', 'event')
     filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
-    filterset_fields = ['created_at', 'updated_at']
+    filterset_fields = ['event', 'owner', 'created_at', 'updated_at']
     template_name = None
+    # Count and page, plus a lookup each to validate ?event= and ?owner=
+    query_budget = {'GET': 4}
 
-    def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+class EventCommentList(AtomicCreateMixin, generics.ListCreateAPIView):
+    """
+    List an event's threads newest first, each top-level comment with its
+    first replies, or comment on the event if logged in. Pages are keyset
+    ranges on the top-level comment index, and the `since` link fetches
+    only threads started after the current page. Replies are not covered
+    by `since`; a thread's reply_count shows when to re-read it from
+    /api/comments/<id>/thread/.
+    """
+    serializer_class = EventCommentSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CommentCursorPagination
+    filter_backends = []
+    # The event's existence, then the page of threads and their first
+    # replies, whatever the page size
+    query_budget = {'GET': 3}
+
+    def get_queryset(self):
+        get_object_or_404(Event.objects.only('pk'), pk=self.kwargs['event_pk'])
+        return Comment.objects.filter(
+            event_id=self.kwargs['event_pk'], parent__isnull=True
+        ).select_related('owner', 'event')
+
+    def get_create_kwargs(self):
+        event = get_object_or_404(Event, pk=self.kwargs['event_pk'])
+        return {**super().get_create_kwargs(), 'event': event}
+
+class CommentThread(generics.ListAPIView):
+    """
+    A comment and all of its replies, parents before their replies and
+    siblings oldest first, read as one range on the (root, path) index.
+    """
+    serializer_class = CommentSerializer
+    pagination_class = ThreadPagination
+    filter_backends = []
+    # The comment's path, then the page of its thread
+    query_budget = {'GET': 2}
+
+    def get_queryset(self):
+        comment = get_object_or_404(Comment.objects.only('root', 'path'), pk=self.kwargs['pk'])
+        return thread(comment).select_related('owner', 'event')
 
 class CommentDetail(generics.RetrieveUpdateDestroyAPIView):
     """
@@ -26,4 +72,4 @@ class CommentDetail(generics.RetrieveUpdateDestroyAPIView):
     """
     permission_classes = [IsOwnerOrReadOnly]
     serializer_class = CommentSerializer
-    queryset = Comment.objects.all()
\ No newline at end of file
+    queryset = Comment.objects.select_related('owner', 'event')
\ No newline at end of file
@@ -0,0 +1,62 @@
+# eventify/conditional.py
+import hashlib
+from datetime import datetime
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Adds strong ETag and Last-Modified validators to a retrieve view.
+
+    The validators come from one primary key lookup of `validator_fields`,
+    so a matching If-None-Match or If-Modified-Since is answered with a
+    304 before the view's annotated queryset or its serializer run.
+    Last-Modified is the latest timestamp among those fields. The ETag
+    includes the requesting user because the body carries viewer-specific
+    fields such as is_owner.
+
+    Views whose body also depends on data outside the row return it from
+    get_validator_extras() to fold it into the ETag. No timestamp covers
+    that data, so such views answer only If-None-Match with a 304.
+    """
+    validator_fields = ('updated_at',)
+
+    def get_validator_extras(self, request):
+        return None
+
+    def get_validators(self, request):
+        row = (
+            self.get_queryset().model.objects
+            .filter(pk=self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+            .values_list(*self.validator_fields)
+            .first()
+        )
+        if row is None:
+            return None, None, False
+        extras = self.get_validator_extras(request)
+        modified = max(value for value in row if isinstance(value, datetime))
+        raw = ':'.join(
+            [type(self).__name__, str(request.user.pk)]
+            + [value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in row]
+            + [str(value) for value in extras or ()]
+        )
+        etag = '"%s"' % hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+        return etag, int(modified.timestamp()), extras is None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified, dates_cover_body = self.get_validators(request)
+        if etag is None:
+            # Let the normal path produce the 404
+            return super().get(request, *args, **kwargs)
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified if dates_cover_body else None
+        )
+        response = not_modified or super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
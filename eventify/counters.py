@@ -0,0 +1,36 @@
+# eventify/counters.py
+from django.db import transaction
+
+
+class StoredCountersMixin:
+    """
+    For models with counter columns that are only ever changed by atomic
+    F() updates. A full save() of an existing row writes every other
+    field but leaves `stored_counters` alone, so saving an instance read
+    before an increment cannot write the old value back over it.
+    """
+    stored_counters = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not args:
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.stored_counters
+            ]
+        super().save(*args, **kwargs)
+
+
+class AtomicCreateMixin:
+    """
+    For create views of rows that a post_save receiver counts on another
+    model, such as likes on Event.likes_count. The insert and the counter
+    update commit or roll back together, so a failure in either can never
+    leave the stored counter out of step with the rows it mirrors.
+    """
+    def get_create_kwargs(self):
+        return {'owner': self.request.user}
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            serializer.save(**self.get_create_kwargs())
@@ -0,0 +1,94 @@
+# eventify/middleware.py
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('eventify.queries')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised instead of logging when QUERY_BUDGET_STRICT is on, as in tests"""
+
+
+class QueryStats:
+    """
+    Execute wrapper that records the number of statements, their total
+    time and the slowest one for a single request.
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_sql = None
+        self.slowest_duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if elapsed >= self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql
+
+    def server_timing(self):
+        queries = 'query' if self.count == 1 else 'queries'
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="{self.count} {queries}", '
+            f'db-slowest;dur={self.slowest_duration * 1000:.2f}'
+        )
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records query count, total DB time and the slowest statement for each
+    request, and reports them in a Server-Timing header when
+    settings.QUERY_SERVER_TIMING is on.
+
+    Views can declare a `query_budget`, either an int or a dict keyed by
+    HTTP method. Going over it logs a warning, or raises
+    QueryBudgetExceeded when settings.QUERY_BUDGET_STRICT is set, so N+1
+    regressions fail the test suite.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            request.query_stats = stats
+            response = self.get_response(request)
+
+        if getattr(settings, 'QUERY_SERVER_TIMING', False):
+            response['Server-Timing'] = stats.server_timing()
+        self.check_budget(request, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # DRF's as_view() exposes the view class as .cls
+        view_class = getattr(view_func, 'cls', None)
+        budget = getattr(view_class, 'query_budget', None)
+        if isinstance(budget, dict):
+            budget = budget.get(request.method)
+        request.query_budget = budget
+        request.query_budget_view = getattr(view_class, '__name__', None)
+
+    def check_budget(self, request, stats):
+        budget = getattr(request, 'query_budget', None)
+        if budget is None or stats.count <= budget:
+            return
+        message = (
+            f'{request.query_budget_view} {request.method} {request.path} ran '
+            f'{stats.count} queries (budget {budget}); slowest '
+            f'{stats.slowest_duration * 1000:.2f}ms: {stats.slowest_sql}'
+        )
+        if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
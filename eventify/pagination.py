@@ -0,0 +1,188 @@
+# eventify/pagination.py
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (ordering value, id).
+
+    Each page is a single range scan from the last row seen, so there is
+    no COUNT(*) and no OFFSET, and rows inserted while a client is paging
+    never shift or repeat results. The ordering comes from the view's
+    OrderingFilter when the client passes one, and the id is always added
+    as a tie-breaker so the key is unique. Ordering values must be
+    non-null.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    # Ordering used when the client does not ask for one
+    ordering = '-date'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.key, self.descending = self.get_ordering(request, queryset, view)
+        position = self.decode_cursor(request)
+        reverse = bool(position and position['r'])
+
+        # Walking backwards flips the ordering, then the page is flipped back
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(prefix + self.key, prefix + 'pk')
+        if position:
+            queryset = queryset.filter(
+                self.after(self.key, position['v'], position['id'], descending)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.page = results
+        return results
+
+    @staticmethod
+    def after(key, value, pk, descending):
+        """
+        Rows strictly past (value, pk). The leading range condition on the
+        ordering column lets the database drive the scan from the index.
+        """
+        op = 'lt' if descending else 'gt'
+        bound = 'lte' if descending else 'gte'
+        return Q(**{f'{key}__{bound}': value}) & (
+            Q(**{f'{key}__{op}': value}) | Q(**{f'pk__{op}': pk})
+        )
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the (key, descending) pair for this request, taking the
+        first ordering the view's OrderingFilter accepts.
+        """
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        field = ordering[0] if ordering else self.get_default_ordering(queryset)
+        return field.lstrip('-'), field.startswith('-')
+
+    def get_default_ordering(self, queryset):
+        return self.ordering
+
+    def get_value(self, item):
+        value = getattr(item, self.key)
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if position['o'] != self.key or not {'v', 'id', 'r'} <= position.keys():
+                raise ValueError
+        except (BinasciiError, KeyError, TypeError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, item, reverse):
+        position = {
+            'o': self.key,
+            'v': self.get_value(item),
+            'id': item.pk,
+            'r': int(reverse),
+        }
+        encoded = b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class EventCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for the event feed, newest event date first to
+    match Event.Meta.ordering, nearest first for ?near= queries and best
+    match first for searches.
+    """
+
+    def get_default_ordering(self, queryset):
+        if 'distance' in queryset.query.annotations:
+            return 'distance'
+        if 'search_rank' in queryset.query.annotations:
+            return '-search_rank'
+        return self.ordering
+
+
+class CommentCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for an event's comments, newest first. Responses
+    also carry a `since` link that returns only comments posted after
+    the newest one on the page, so clients can poll for new comments
+    without re-reading the first page. It covers the paginated queryset
+    only: on an event's thread list that means new threads, not replies.
+    """
+    ordering = '-created_at'
+
+    def get_since_link(self):
+        if self.page:
+            return self.encode_cursor(self.page[0], reverse=True)
+        # Nothing newer than the cursor yet; poll the same link again
+        return self.base_url
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['since'] = self.get_since_link()
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['since'] = {'type': 'string', 'format': 'uri'}
+        return response_schema
+
+
+class ThreadPagination(KeysetPagination):
+    """Keyset pagination through a comment thread in reply order"""
+    ordering = 'path'
@@ -122,9 +122,13 @@ INSTALLED_APPS = [
     'comments',
     'profiles',
     'events',
+    'uploads',
+    'feed',
+    'recommendations',
 ]
 
 MIDDLEWARE = [
+    'eventify.middleware.QueryInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -220,6 +224,47 @@ else:
     }
 
 
+# Cache configuration
+# Redis is shared by every gunicorn worker; the in-memory fallback is
+# per process, so it is only safe for local development and tests
+if 'REDIS_URL' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Anonymous event list/detail response cache. Entries are retired by
+# version stamps on write; the timeout only bounds memory use
+EVENT_CACHE_ENABLED = 'REDIS_URL' in os.environ or 'DEV' in os.environ
+EVENT_CACHE_TIMEOUT = 60 * 60
+
+# ?ordering=-trending ranks events by engagement weighted per counter.
+# The decay_trending_scores command halves the scores every
+# EVENT_TRENDING_HALF_LIFE hours; schedule it to run hourly. Removing an
+# interaction takes back only its decayed weight
+EVENT_TRENDING_WEIGHTS = {
+    'likes_count': 1.0,
+    'comments_count': 2.0,
+    'favorites_count': 2.0,
+    'attendees_count': 3.0,
+}
+EVENT_TRENDING_HALF_LIFE = 24
+
+# Replies shown under each top-level comment on an event's comment list;
+# the rest of a thread comes from /api/comments/<id>/thread/
+COMMENT_THREAD_REPLIES = 3
+
+# Geocoder used to fill Event.latitude/longitude from the location text
+EVENT_GEOCODER = 'events.geo.GazetteerGeocoder'
+
 # Cloudinary settings for production only
 CLOUDINARY_STORAGE = {
     'CLOUD_NAME': os.getenv('CLOUDINARY_CLOUD_NAME'),
@@ -233,6 +278,65 @@ cloudinary.config(
     api_secret = os.getenv('CLOUDINARY_API_SECRET')
 )
 
+# Deferred image uploads (see uploads.pipeline). Requests spool files to
+# UPLOADS_SPOOL_DIR and background threads in the same process send them
+# to storage; set UPLOADS_WORKER_THREADS to 0 to leave them for the
+# process_uploads command instead. Use uploads.storage.FakeBackend to
+# run without Cloudinary
+UPLOADS_BACKEND = os.environ.get('UPLOADS_BACKEND', 'uploads.storage.CloudinaryBackend')
+UPLOADS_SPOOL_DIR = os.environ.get('UPLOADS_SPOOL_DIR', os.path.join(BASE_DIR, 'spool'))
+UPLOADS_FAKE_ROOT = os.path.join(BASE_DIR, 'fake-storage')
+UPLOADS_FAKE_URL = '/fake-storage/'
+UPLOADS_WORKER_THREADS = int(os.environ.get('UPLOADS_WORKER_THREADS', 2))
+UPLOADS_MAX_ATTEMPTS = 3
+# Failed uploads are retried after UPLOADS_RETRY_DELAY seconds, doubling
+# each attempt. Jobs stuck processing for UPLOADS_STALE_AFTER seconds
+# (their worker died) are requeued by the process_uploads command
+UPLOADS_RETRY_DELAY = 30
+UPLOADS_STALE_AFTER = 600
+# Storage calls time out after these many seconds, and after
+# UPLOADS_BREAKER_THRESHOLD consecutive failures the worker stops calling
+# storage for UPLOADS_BREAKER_RESET seconds, leaving the default image
+UPLOADS_CONNECT_TIMEOUT = 3
+UPLOADS_READ_TIMEOUT = 30
+UPLOADS_BREAKER_THRESHOLD = 5
+UPLOADS_BREAKER_RESET = 30
+# Latency (seconds) and error rate injected by FakeBackend
+UPLOADS_FAKE_LATENCY = 0
+UPLOADS_FAKE_ERROR_RATE = 0
+# Lifetime of signed direct-upload parameters; Cloudinary's own limit
+UPLOADS_SIGNATURE_MAX_AGE = 3600
+# Images are cropped to their field's transformation size and re-encoded
+# in this format before upload
+UPLOADS_IMAGE_FORMAT = 'WEBP'
+UPLOADS_IMAGE_QUALITY = 82
+# Sizes generated for each image field at upload time, smallest first,
+# so list views can fetch the thumbnail instead of the full image
+UPLOADS_IMAGE_VARIANTS = {
+    'cover': {'thumbnail': (200, 150), 'medium': (400, 300), 'full': (800, 600)},
+    'avatar': {'thumbnail': (64, 64), 'medium': (160, 160), 'full': (400, 400)},
+}
+
+# New events are copied into each follower's timeline when they are
+# created, unless the author has at least FEED_FANOUT_LIMIT followers;
+# those accounts are pulled into their followers' timelines by the
+# fan_in_timelines command, which should run every few minutes
+FEED_FANOUT_LIMIT = 1000
+# Recent events copied into a timeline when its owner follows someone
+FEED_BACKFILL = 20
+
+# Most similar events stored per event by build_event_neighbors, and how
+# many recommendations /api/events/recommended/ returns
+RECOMMENDATIONS_NEIGHBORS = 20
+RECOMMENDATIONS_LIMIT = 20
+# Related events shown on an event page, from hashed text vectors of this
+# many dimensions. Each process keeps upcoming events' vectors in memory
+# and reloads them in the background every RECOMMENDATIONS_CONTENT_TTL
+# seconds; run rebuild_event_vectors after changing the dimensions
+RECOMMENDATIONS_RELATED = 6
+RECOMMENDATIONS_CONTENT_DIMENSIONS = 256
+RECOMMENDATIONS_CONTENT_TTL = 300
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -318,6 +422,14 @@ LOGGING = {
 }
 
 
+# Per-view query budgets (see eventify.middleware). Over-budget requests
+# log a warning, or raise when strict; the test runner turns strict on
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT') == '1'
+TEST_RUNNER = 'eventify.test_runner.QueryBudgetTestRunner'
+# Query counts and DB time per request in a Server-Timing header. They
+# describe the backend, so they are only sent in development
+QUERY_SERVER_TIMING = 'DEV' in os.environ
+
 # CSRF settings
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
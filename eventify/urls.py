@@ -14,6 +14,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include 
 from rest_framework_simplejwt.views import (
@@ -47,4 +49,10 @@ urlpatterns = [
     path('api/', include('likes.urls')),
     path('api/', include('events.urls')),
     path('api/', include('profiles.urls')),
+    path('api/', include('uploads.urls')),
+    path('api/', include('feed.urls')),
+    path('api/', include('recommendations.urls')),
 ]
+
+# Files written by uploads.storage.FakeBackend; static() is a no-op unless DEBUG
+urlpatterns += static(settings.UPLOADS_FAKE_URL, document_root=settings.UPLOADS_FAKE_ROOT)
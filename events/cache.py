@@ -0,0 +1,170 @@
+# events/cache.py
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from .models import Event
+
+STATS_KEYS = {'hits': 'events:cache:hits', 'misses': 'events:cache:misses'}
+
+
+def _version_key(scope):
+    return f'events:version:{scope}'
+
+
+def get_version(scope):
+    """
+    Return the version stamp for a scope ('all', 'category:<name>' or
+    'event:<pk>'). Stamps are random rather than counters, so a stamp
+    evicted from the cache can never come back with an old value.
+    """
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_versions(*scopes):
+    cache.set_many({_version_key(scope): uuid.uuid4().hex for scope in scopes}, None)
+
+
+def invalidate_event(event_id, *categories):
+    """
+    Retire every cached response that can contain this event. The stamps
+    are bumped straight away for reads inside this transaction, and again
+    after commit so a response rebuilt from pre-commit data is not kept.
+    """
+    if not categories:
+        categories = Event.objects.filter(pk=event_id).values_list('category', flat=True)
+    scopes = ['all', f'event:{event_id}'] + [f'category:{name}' for name in set(categories)]
+    bump_versions(*scopes)
+    transaction.on_commit(lambda: bump_versions(*scopes))
+
+
+def invalidate_owner_events(owner_id):
+    """
+    Retire every cached response showing one of a user's events, whose
+    bodies carry the owner's username and profile. One query for their
+    ids and categories, then the same double bump as invalidate_event().
+    """
+    rows = Event.objects.filter(owner_id=owner_id).values_list('pk', 'category')
+    scopes = {'all'}
+    for pk, category in rows:
+        scopes.update([f'event:{pk}', f'category:{category}'])
+    if len(scopes) == 1:
+        # No events, so nothing cached shows this owner
+        return
+    bump_versions(*scopes)
+    transaction.on_commit(lambda: bump_versions(*scopes))
+
+
+def record(outcome):
+    key = STATS_KEYS[outcome]
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, None)
+
+
+def cache_stats():
+    values = cache.get_many(STATS_KEYS.values())
+    stats = {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / total, 4) if total else None
+    return stats
+
+
+class CachedReadMixin:
+    """
+    Serves GETs by anonymous users from the cache. Keys combine the host,
+    the view, its URL kwargs, the normalized query string and the version
+    stamp of whatever the response depends on, so writes retire entries
+    immediately instead of waiting for a TTL.
+    """
+    def get_cache_scope(self, request, **kwargs):
+        if 'pk' in kwargs:
+            return f"event:{kwargs['pk']}"
+        categories = request.query_params.getlist('category')
+        if len(categories) == 1:
+            return f'category:{categories[0]}'
+        return 'all'
+
+    def get_cache_key(self, request, **kwargs):
+        params = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in set(values)
+            if value != ''
+        )
+        scope = self.get_cache_scope(request, **kwargs)
+        raw = repr((
+            request.get_host(),
+            type(self).__name__,
+            sorted(kwargs.items()),
+            params,
+            request.accepted_renderer.format,
+            get_version(scope),
+        ))
+        return 'events:response:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        if not settings.EVENT_CACHE_ENABLED or request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        key = self.get_cache_key(request, **kwargs)
+        data = cache.get(key)
+        if data is not None:
+            record('hits')
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        record('misses')
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.EVENT_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+@receiver(pre_save, sender=Event)
+def remember_category(sender, instance, **kwargs):
+    # An event moving category must retire its old category's lists too
+    instance._cached_categories = {instance.category}
+    if instance.pk:
+        instance._cached_categories.update(
+            Event.objects.filter(pk=instance.pk).values_list('category', flat=True)
+        )
+
+
+@receiver(post_save, sender=Event)
+def invalidate_saved_event(sender, instance, **kwargs):
+    invalidate_event(instance.pk, *getattr(instance, '_cached_categories', {instance.category}))
+
+
+@receiver(post_delete, sender=Event)
+def invalidate_deleted_event(sender, instance, **kwargs):
+    invalidate_event(instance.pk, instance.category)
+
+
+@receiver(post_save, sender=User)
+def invalidate_renamed_owner(sender, instance, created, update_fields=None, **kwargs):
+    # Logins only save last_login, and a new user has no events yet
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    invalidate_owner_events(instance.pk)
+
+
+@receiver(post_save, sender='profiles.Profile')
+def invalidate_profile_owner(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_owner_events(instance.owner_id)
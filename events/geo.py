@@ -0,0 +1,166 @@
+# events/geo.py
+import math
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Event
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.045
+COORDINATES = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+class GazetteerGeocoder:
+    """
+    Offline geocoder backed by a small table of towns and cities. Matches
+    the whole location first, then each comma-separated part from the end
+    ("Town Hall, Leeds"), then single words. Literal "lat,lng" strings are
+    taken as-is.
+    """
+    places = {
+        'london': (51.5074, -0.1278),
+        'manchester': (53.4808, -2.2426),
+        'birmingham': (52.4862, -1.8904),
+        'leeds': (53.8008, -1.5491),
+        'liverpool': (53.4084, -2.9916),
+        'glasgow': (55.8642, -4.2518),
+        'edinburgh': (55.9533, -3.1883),
+        'bristol': (51.4545, -2.5879),
+        'sheffield': (53.3811, -1.4701),
+        'newcastle': (54.9783, -1.6178),
+        'cardiff': (51.4816, -3.1791),
+        'belfast': (54.5973, -5.9301),
+        'dublin': (53.3498, -6.2603),
+        'nottingham': (52.9548, -1.1581),
+        'leicester': (52.6369, -1.1398),
+        'brighton': (50.8225, -0.1372),
+        'oxford': (51.7520, -1.2577),
+        'cambridge': (52.2053, 0.1218),
+        'york': (53.9600, -1.0873),
+        'bath': (51.3811, -2.3590),
+        'southampton': (50.9097, -1.4044),
+        'aberdeen': (57.1497, -2.0943),
+        'paris': (48.8566, 2.3522),
+        'berlin': (52.5200, 13.4050),
+        'amsterdam': (52.3676, 4.9041),
+        'madrid': (40.4168, -3.7038),
+        'barcelona': (41.3874, 2.1686),
+        'rome': (41.9028, 12.4964),
+        'lisbon': (38.7223, -9.1393),
+        'new york': (40.7128, -74.0060),
+        'los angeles': (34.0522, -118.2437),
+        'san francisco': (37.7749, -122.4194),
+        'chicago': (41.8781, -87.6298),
+        'toronto': (43.6532, -79.3832),
+        'sydney': (-33.8688, 151.2093),
+        'melbourne': (-37.8136, 144.9631),
+        'tokyo': (35.6762, 139.6503),
+    }
+
+    def geocode(self, location):
+        match = COORDINATES.match(location)
+        if match:
+            lat, lng = float(match.group(1)), float(match.group(2))
+            if -90 <= lat <= 90 and -180 <= lng <= 180:
+                return lat, lng
+            return None
+
+        text = location.lower().strip()
+        parts = [part.strip() for part in text.split(',')]
+        words = re.findall(r'[a-z]+', text)
+        for candidate in [text] + parts[::-1] + words[::-1]:
+            if candidate in self.places:
+                return self.places[candidate]
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_geocoder():
+    return import_string(settings.EVENT_GEOCODER)()
+
+
+@lru_cache(maxsize=1024)
+def geocode(location):
+    """Return (latitude, longitude) for a location string, or None"""
+    if not location:
+        return None
+    return get_geocoder().geocode(location)
+
+
+@receiver(pre_save, sender=Event)
+def geocode_event(sender, instance, **kwargs):
+    instance.latitude, instance.longitude = geocode(instance.location) or (None, None)
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Q over the indexed latitude/longitude columns that contains every
+    point within radius_km, splitting at the antimeridian if needed.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    box = Q(latitude__range=(lat - dlat, lat + dlat))
+    cos_lat = math.cos(math.radians(min(abs(lat) + dlat, 90)))
+    if cos_lat < 1e-6 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+        # The circle wraps a pole, so every longitude is in range
+        return box & Q(longitude__isnull=False)
+
+    dlng = radius_km / (KM_PER_DEGREE * cos_lat)
+    west, east = lng - dlng, lng + dlng
+    if west < -180:
+        lngs = Q(longitude__gte=west + 360) | Q(longitude__lte=east)
+    elif east > 180:
+        lngs = Q(longitude__gte=west) | Q(longitude__lte=east - 360)
+    else:
+        lngs = Q(longitude__range=(west, east))
+    return box & lngs
+
+
+def distance_km(lat, lng):
+    """Haversine distance expression from (lat, lng) to each event"""
+    lat1 = Radians(Value(lat, output_field=FloatField()))
+    lat2 = Radians(F('latitude'))
+    dlat = Radians(F('latitude') - Value(lat, output_field=FloatField()))
+    dlng = Radians(F('longitude') - Value(lng, output_field=FloatField()))
+    a = Power(Sin(dlat / 2), 2) + Cos(lat1) * Cos(lat2) * Power(Sin(dlng / 2), 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(a, Value(1.0))))
+
+
+class NearFilter(BaseFilterBackend):
+    """
+    ?near=lat,lng&radius_km=N limits events to a radius and annotates
+    each with its distance. The bounding box is answered from the
+    (latitude, longitude) index, so the exact haversine distance is only
+    computed for rows inside it.
+    """
+    default_radius_km = 25
+    max_radius_km = 500
+
+    def filter_queryset(self, request, queryset, view):
+        near = request.query_params.get('near')
+        if not near:
+            return queryset
+        match = COORDINATES.match(near)
+        try:
+            lat, lng = float(match.group(1)), float(match.group(2))
+            radius = float(request.query_params.get('radius_km', self.default_radius_km))
+        except (AttributeError, ValueError):
+            raise ValidationError({'near': 'Expected near=lat,lng and a numeric radius_km'})
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180 and 0 < radius <= self.max_radius_km):
+            raise ValidationError({
+                'near': f'Coordinates out of range or radius_km not in (0, {self.max_radius_km}]'
+            })
+
+        return (
+            queryset.filter(bounding_box(lat, lng, radius))
+            .annotate(distance=distance_km(lat, lng))
+            .filter(distance__lte=radius)
+        )
@@ -0,0 +1,95 @@
+# events/management/commands/decay_trending_scores.py
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from comments.models import Comment
+from events.cache import bump_versions
+from events.models import Event, EventAttendee, decay_factor
+from favorites.models import Favorite
+from likes.models import Like
+
+# Scores below this are set to zero instead of decaying forever
+FLOOR = 0.01
+
+# Counter -> (rows it mirrors, when each row happened), for --rebuild
+SOURCES = {
+    'likes_count': (Like.objects.all(), 'created_at'),
+    'comments_count': (Comment.objects.all(), 'created_at'),
+    'favorites_count': (Favorite.objects.all(), 'created_at'),
+    'attendees_count': (
+        EventAttendee.objects.filter(status=EventAttendee.REGISTERED), 'registered_at'
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = 'Decay every event\'s trending score in one UPDATE, or rebuild the scores.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=float,
+            default=1.0,
+            help='Hours since the last run; match the schedule.',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute scores from interaction timestamps instead. Holds a '
+                 'lock on every event, so engagement waits until it finishes.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of events written per UPDATE batch with --rebuild.',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            count = self.rebuild(options['batch_size'])
+            message = f'Rebuilt trending scores for {count} events'
+        else:
+            factor = decay_factor(options['hours'])
+            count = Event.objects.filter(trending_score__gt=0).update(
+                trending_score=Case(
+                    When(trending_score__lt=FLOOR / factor, then=Value(0.0)),
+                    default=F('trending_score') * factor,
+                )
+            )
+            message = f'Decayed {count} trending scores by {factor:.4f}'
+
+        # The order is unchanged but cached pages carry old cursor values
+        bump_versions('all', *(f'category:{name}' for name, _ in Event.CATEGORY_CHOICES))
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def rebuild(self, batch_size):
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Read the sources as of the lock below, so interactions
+                # that wait on it are added to the rebuilt scores once
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+            # Lock every event first: an increment landing between reading
+            # the sources and writing the scores would otherwise be lost.
+            # Likes, comments and registrations wait until the rebuild is done
+            list(Event.objects.select_for_update().values_list('pk', flat=True))
+            now = timezone.now()
+            scores = defaultdict(float)
+            for field, (rows, timestamp) in SOURCES.items():
+                weight = settings.EVENT_TRENDING_WEIGHTS.get(field, 0)
+                for event_id, at in rows.values_list('event_id', timestamp).iterator():
+                    hours = (now - at).total_seconds() / 3600
+                    scores[event_id] += weight * decay_factor(hours)
+
+            Event.objects.update(trending_score=0)
+            Event.objects.bulk_update(
+                [Event(pk=pk, trending_score=score) for pk, score in scores.items()],
+                ['trending_score'],
+                batch_size=batch_size,
+            )
+        return len(scores)
@@ -0,0 +1,44 @@
+# events/management/commands/geocode_events.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from events.cache import invalidate_event
+from events.geo import geocode
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Fill in latitude/longitude for events from their location text.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-geocode every event, not just those without coordinates.',
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+        if not options['all']:
+            events = events.filter(latitude__isnull=True)
+
+        updated, cleared = [], 0
+        now = timezone.now()
+        fields = ('pk', 'location', 'latitude', 'longitude', 'category')
+        for event in events.only(*fields).iterator():
+            # A location that no longer resolves loses its old coordinates
+            coordinates = geocode(event.location) or (None, None)
+            if coordinates != (event.latitude, event.longitude):
+                event.latitude, event.longitude = coordinates
+                event.updated_at = now
+                updated.append(event)
+                cleared += coordinates[0] is None
+        # bulk_update() skips save() and its receivers, so move updated_at
+        # and retire cached responses here
+        Event.objects.bulk_update(
+            updated, ['latitude', 'longitude', 'updated_at'], batch_size=500
+        )
+        for event in updated:
+            invalidate_event(event.pk, event.category)
+        self.stdout.write(self.style.SUCCESS(
+            f'Geocoded {len(updated) - cleared} events, cleared {cleared}'
+        ))
@@ -0,0 +1,20 @@
+# events/management/commands/rebuild_event_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from events.search import get_backend, reindex_event
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents for every event.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if get_backend(connections[using]) is None:
+            self.stdout.write('No full-text backend for this database; nothing to do')
+            return
+        with transaction.atomic(using=using):
+            reindex_event(using=using)
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
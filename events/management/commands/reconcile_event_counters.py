@@ -0,0 +1,55 @@
+# events/management/commands/reconcile_event_counters.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+from events.models import Event, EventAttendee
+
+# Stored counter column -> count of the rows it mirrors
+COUNTERS = {
+    'likes_count': Count('likes'),
+    'comments_count': Count('comments'),
+    # Waitlisted attendees do not take a seat
+    'attendees_count': Count(
+        'attendees', filter=Q(attendees__status=EventAttendee.REGISTERED)
+    ),
+    'favorites_count': Count('favorited_by'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Recount event engagement counters and repair any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted events without writing the fixes.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of events written per UPDATE batch.',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for field, count in COUNTERS.items():
+            # One join at a time keeps each recount query linear
+            drifted = (
+                Event.objects.order_by()
+                .annotate(actual=count)
+                .exclude(**{field: F('actual')})
+                .values_list('pk', 'actual')
+            )
+            fixes = [Event(pk=pk, **{field: actual}) for pk, actual in drifted]
+            total += len(fixes)
+            self.stdout.write(f'{field}: {len(fixes)} drifted')
+            if fixes and not options['dry_run']:
+                with transaction.atomic():
+                    Event.objects.bulk_update(
+                        fixes, [field], batch_size=options['batch_size']
+                    )
+
+        verb = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} drifted counters'))
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:51
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    sources = {
+        'likes_count': apps.get_model('likes', 'Like'),
+        'comments_count': apps.get_model('comments', 'Comment'),
+        'attendees_count': apps.get_model('events', 'EventAttendee'),
+        'favorites_count': apps.get_model('favorites', 'Favorite'),
+    }
+    for field, model in sources.items():
+        counts = (
+            model.objects.filter(event=OuterRef('pk'))
+            .order_by()
+            .values('event')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        Event.objects.update(**{field: Coalesce(Subquery(counts), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_alter_event_cover'),
+        ('likes', '0002_alter_like_options'),
+        ('comments', '0001_initial'),
+        ('favorites', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='attendees_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
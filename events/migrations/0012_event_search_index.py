@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# The search schema as of this migration, copied from events.search so
+# later changes to that module cannot change what this migration does
+INSTALL = {
+    'postgresql': [
+        'ALTER TABLE events_event ADD COLUMN search_vector tsvector',
+        'CREATE INDEX event_search_vector_idx ON events_event USING GIN (search_vector)',
+        """
+        UPDATE events_event AS e SET search_vector =
+            setweight(to_tsvector('english', coalesce(e.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(u.username, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(e.category, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(e.location, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(e.description, '')), 'C')
+        FROM auth_user AS u WHERE u.id = e.owner_id
+        """,
+    ],
+    'sqlite': [
+        'CREATE VIRTUAL TABLE events_event_fts USING fts5('
+        'title, description, location, category, username, '
+        "tokenize='porter unicode61')",
+        'INSERT INTO events_event_fts '
+        '(rowid, title, description, location, category, username) '
+        'SELECT e.id, e.title, e.description, e.location, e.category, u.username '
+        'FROM events_event e JOIN auth_user u ON u.id = e.owner_id',
+    ],
+}
+
+UNINSTALL = {
+    'postgresql': ['ALTER TABLE events_event DROP COLUMN search_vector'],
+    'sqlite': ['DROP TABLE events_event_fts'],
+}
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        with connection.cursor() as cursor:
+            for sql in statements.get(connection.vendor, []):
+                cursor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_event_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_for_vendor(INSTALL), run_for_vendor(UNINSTALL)),
+    ]
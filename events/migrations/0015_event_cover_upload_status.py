@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_event_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='cover_upload_status',
+            field=models.CharField(choices=[('none', 'None'), ('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='none', max_length=20),
+        ),
+    ]
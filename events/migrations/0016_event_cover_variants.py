@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0015_event_cover_upload_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='cover_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
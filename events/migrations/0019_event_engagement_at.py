@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0018_event_trending_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='engagement_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,10 +1,19 @@
 #events/models.py
 
+from django.conf import settings
 from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from cloudinary.models import CloudinaryField
+from eventify.counters import StoredCountersMixin
+from profiles.models import update_profile_counter
+from uploads.models import UploadStatus
 
-class Event(models.Model):
+class Event(StoredCountersMixin, models.Model):
     CATEGORY_CHOICES = [
         ('music', 'Music'),
         ('tech', 'Technology'),
@@ -22,6 +31,9 @@ class Event(models.Model):
     description = models.TextField()
     date = models.DateTimeField()
     location = models.CharField(max_length=255)
+    # Filled from location by the geocoder in events/geo.py
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     # Use a more explicit CloudinaryField configuration
     cover = CloudinaryField(
@@ -39,29 +51,118 @@ class Event(models.Model):
             'height': 600
         }
     )
+    cover_upload_status = models.CharField(
+        max_length=20, choices=UploadStatus.choices, default=UploadStatus.NONE
+    )
+    # Resized variant URLs written at upload time; see uploads.storage
+    cover_variants = models.JSONField(default=dict, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Maximum registered attendees; blank for no limit. Registrations past
+    # it are waitlisted, see claim_seat() below
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    # Stored engagement counters, kept in step with the like, comment,
+    # attendee and favorite tables by update_engagement() below
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    attendees_count = models.PositiveIntegerField(default=0)
+    favorites_count = models.PositiveIntegerField(default=0)
+    # When a counter above last moved. updated_at only tracks the owner's
+    # edits; Last-Modified is the later of the two
+    engagement_at = models.DateTimeField(null=True, blank=True)
+    # Weighted engagement that decays over time, for ?ordering=-trending.
+    # Raised with the counters above and scaled down in bulk by the
+    # decay_trending_scores command
+    trending_score = models.FloatField(default=0)
+    # Never written back by save(), which may hold values from before a
+    # concurrent like or registration
+    stored_counters = (
+        'likes_count', 'comments_count', 'attendees_count', 'favorites_count',
+        'engagement_at', 'trending_score',
+    )
 
     class Meta:
         ordering = ['-date']
+        # (value, id) keys for the event list's keyset pagination
+        indexes = [
+            models.Index(fields=['date', 'id'], name='event_date_id_idx'),
+            models.Index(fields=['likes_count', 'id'], name='event_likes_id_idx'),
+            models.Index(fields=['comments_count', 'id'], name='event_comments_id_idx'),
+            models.Index(fields=['attendees_count', 'id'], name='event_attendees_id_idx'),
+            models.Index(fields=['trending_score', 'id'], name='event_trending_id_idx'),
+            # Filtered list views: ?category= and ?owner__profile=
+            models.Index(fields=['category', '-date', '-id'], name='event_category_date_idx'),
+            models.Index(fields=['owner', '-date', '-id'], name='event_owner_date_idx'),
+            # Bounding-box lookups for ?near=
+            models.Index(fields=['latitude', 'longitude'], name='event_lat_lng_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.owner}"
-    
-    def save(self, *args, **kwargs):
-        """Override save method to handle Cloudinary cover field"""
-        try:
-            # Call parent save method
-            super().save(*args, **kwargs)
-        except Exception as e:
-            # If error is related to Cloudinary, try to save without the image
-            if 'cover' in str(e).lower() or 'cloudinary' in str(e).lower():
-                # Set cover to default value
-                self.cover = None
-                # Try saving again without triggering this custom save method
-                super(Event, self).save(*args, **kwargs)
-            else:
-                # Re-raise other errors
-                raise
+
+
+def decay_factor(hours):
+    """The share of an interaction's trending weight left after `hours`"""
+    return 0.5 ** (hours / settings.EVENT_TRENDING_HALF_LIFE)
+
+
+def trending_update(field, delta, at=None):
+    """
+    The trending_score change for a change in one engagement counter, as
+    update() keyword arguments. Never takes the score below zero. When
+    undoing an interaction, pass `at`, the time it happened, so only
+    what is left of its weight after decay is taken back.
+    """
+    weight = settings.EVENT_TRENDING_WEIGHTS.get(field)
+    if not weight:
+        return {}
+    if at is not None:
+        weight *= decay_factor((timezone.now() - at).total_seconds() / 3600)
+    return {'trending_score': Greatest(F('trending_score') + weight * delta, Value(0.0))}
+
+
+def update_engagement(event_id, field, delta, at=None):
+    """
+    Atomically adjust one of the stored engagement counters on an event.
+    Decrements never take a counter below zero, so a stray delete cannot
+    break the positive constraint; the reconcile_event_counters command
+    repairs any drift. engagement_at moves with the counters so
+    Last-Modified stays truthful without touching updated_at. `at` is
+    passed on to trending_update().
+    """
+    events = Event.objects.filter(pk=event_id)
+    if delta < 0:
+        events = events.filter(**{f'{field}__gte': -delta})
+    events.update(
+        **{field: F(field) + delta, 'engagement_at': timezone.now()},
+        **trending_update(field, delta, at),
+    )
+
+    # Cached list and detail responses include the counters
+    from .cache import invalidate_event
+    invalidate_event(event_id)
+
+
+def claim_seat(event_id, seats=1, category=None):
+    """
+    Take seats on an event if it has enough left, by incrementing
+    attendees_count only while the result stays within capacity. The
+    check and the increment are one UPDATE, so concurrent registrations
+    are serialized by the row lock and can never oversell. Returns
+    whether the seats were taken. Pass the event's category if known to
+    save a lookup when invalidating cached responses.
+    """
+    claimed = Event.objects.filter(
+        Q(capacity__isnull=True) | Q(attendees_count__lte=F('capacity') - seats),
+        pk=event_id,
+    ).update(
+        attendees_count=F('attendees_count') + seats,
+        engagement_at=timezone.now(),
+        **trending_update('attendees_count', seats),
+    )
+    if claimed:
+        from .cache import invalidate_event
+        invalidate_event(event_id, *[category] if category else [])
+    return bool(claimed)
 
 
 # Model to track event attendance/registration
@@ -82,10 +183,97 @@ class EventAttendee(models.Model):
         on_delete=models.CASCADE
     )
     registered_at = models.DateTimeField(auto_now_add=True)
+    # Only registered attendees count towards attendees_count and capacity
+    REGISTERED = 'registered'
+    WAITLISTED = 'waitlisted'
+    STATUS_CHOICES = [
+        (REGISTERED, 'Registered'),
+        (WAITLISTED, 'Waitlisted'),
+    ]
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=REGISTERED)
 
     class Meta:
         ordering = ['-registered_at']
         unique_together = ['owner', 'event']  # Prevents duplicate registrations
+        indexes = [
+            models.Index(fields=['owner', '-registered_at'], name='attendee_owner_registered_idx'),
+            # Oldest waitlisted attendee first, for promotion
+            models.Index(fields=['event', 'status', 'registered_at'], name='attendee_event_status_idx'),
+        ]
 
     def __str__(self):
-        return f'{self.owner} attending {self.event}'
\ No newline at end of file
+        return f'{self.owner} {self.status} for {self.event}'
+
+
+def register_attendee(owner, event):
+    """
+    Register a user for an event, or waitlist them if it is full. Call
+    inside a transaction: if the insert fails, the seat is given back.
+    """
+    attendee = EventAttendee(owner=owner, event=event)
+    attendee.seat_claimed = claim_seat(event.pk, category=event.category)
+    if not attendee.seat_claimed:
+        attendee.status = EventAttendee.WAITLISTED
+    attendee.save()
+    return attendee
+
+
+def promote_waitlist(event_id):
+    """
+    Move waitlisted attendees into free seats, oldest first. Seats are
+    claimed before anyone is promoted, so this is safe alongside
+    concurrent registrations and cancellations. Returns the number of
+    attendees promoted.
+    """
+    waitlist = EventAttendee.objects.filter(event_id=event_id, status=EventAttendee.WAITLISTED)
+    promoted = 0
+    while True:
+        row = (
+            Event.objects.filter(pk=event_id)
+            .values_list('capacity', 'attendees_count', 'category')
+            .first()
+        )
+        if row is None:
+            return promoted
+        capacity, taken, category = row
+        candidates = waitlist.order_by('registered_at', 'pk').values_list('pk', flat=True)
+        if capacity is not None:
+            candidates = candidates[:max(capacity - taken, 0)]
+        candidates = list(candidates)
+        if not candidates:
+            return promoted
+        if not claim_seat(event_id, len(candidates), category):
+            # Seats were taken in the meantime; look again
+            continue
+        moved = waitlist.filter(pk__in=candidates).update(status=EventAttendee.REGISTERED)
+        promoted += moved
+        if moved == len(candidates):
+            return promoted
+        # Some left the waitlist in the meantime; give their seats back
+        update_engagement(event_id, 'attendees_count', moved - len(candidates))
+
+
+@receiver(post_save, sender=Event)
+def increment_events_count(sender, instance, created, **kwargs):
+    if created:
+        update_profile_counter(instance.owner_id, 'events_count', 1)
+
+
+@receiver(post_delete, sender=Event)
+def decrement_events_count(sender, instance, **kwargs):
+    update_profile_counter(instance.owner_id, 'events_count', -1)
+
+
+@receiver(post_save, sender=EventAttendee)
+def increment_attendees_count(sender, instance, created, **kwargs):
+    # register_attendee() has already counted the seat it claimed
+    if created and instance.status == EventAttendee.REGISTERED and not getattr(
+        instance, 'seat_claimed', False
+    ):
+        update_engagement(instance.event_id, 'attendees_count', 1)
+
+
+@receiver(post_delete, sender=EventAttendee)
+def decrement_attendees_count(sender, instance, **kwargs):
+    if instance.status == EventAttendee.REGISTERED:
+        update_engagement(instance.event_id, 'attendees_count', -1, instance.registered_at)
@@ -0,0 +1,203 @@
+# events/search.py
+import re
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework import filters
+
+from .models import Event
+
+
+class PostgresSearchBackend:
+    """
+    Maintains a weighted tsvector column on events_event, indexed with
+    GIN, and ranks matches with ts_rank.
+    """
+    document = """
+        setweight(to_tsvector('english', coalesce(e.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(u.username, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(e.category, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(e.location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(e.description, '')), 'C')
+    """
+
+    def install(self, cursor):
+        cursor.execute('ALTER TABLE events_event ADD COLUMN search_vector tsvector')
+        cursor.execute(
+            'CREATE INDEX event_search_vector_idx '
+            'ON events_event USING GIN (search_vector)'
+        )
+
+    def uninstall(self, cursor):
+        cursor.execute('ALTER TABLE events_event DROP COLUMN search_vector')
+
+    def index(self, cursor, event_id=None, owner_id=None):
+        sql = (
+            f'UPDATE events_event AS e SET search_vector = {self.document} '
+            'FROM auth_user AS u WHERE u.id = e.owner_id'
+        )
+        if event_id is not None:
+            cursor.execute(sql + ' AND e.id = %s', [event_id])
+        elif owner_id is not None:
+            cursor.execute(sql + ' AND e.owner_id = %s', [owner_id])
+        else:
+            cursor.execute(sql)
+
+    def unindex(self, cursor, event_id):
+        # The vector lives on the event row and goes with it
+        pass
+
+    def query(self, terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search(self, queryset, terms):
+        query = self.query(terms)
+        return queryset.filter(
+            RawSQL(
+                "events_event.search_vector @@ to_tsquery('english', %s)",
+                [query],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                "ts_rank(events_event.search_vector, to_tsquery('english', %s))",
+                [query],
+                output_field=FloatField(),
+            )
+        )
+
+
+class SqliteSearchBackend:
+    """
+    Maintains an FTS5 shadow table keyed by event id and ranks matches
+    with bm25, so search works the same way on local databases.
+    """
+    table = 'events_event_fts'
+    # bm25 column weights: title, description, location, category, username
+    weights = '10.0, 1.0, 4.0, 4.0, 4.0'
+
+    def install(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE {self.table} USING fts5('
+            'title, description, location, category, username, '
+            "tokenize='porter unicode61')"
+        )
+
+    def uninstall(self, cursor):
+        cursor.execute(f'DROP TABLE {self.table}')
+
+    def index(self, cursor, event_id=None, owner_id=None):
+        sql = (
+            f'INSERT INTO {self.table} '
+            '(rowid, title, description, location, category, username) '
+            'SELECT e.id, e.title, e.description, e.location, e.category, u.username '
+            'FROM events_event e JOIN auth_user u ON u.id = e.owner_id'
+        )
+        if event_id is not None:
+            self.unindex(cursor, event_id)
+            cursor.execute(sql + ' WHERE e.id = %s', [event_id])
+        elif owner_id is not None:
+            cursor.execute(
+                f'DELETE FROM {self.table} '
+                'WHERE rowid IN (SELECT id FROM events_event WHERE owner_id = %s)',
+                [owner_id],
+            )
+            cursor.execute(sql + ' WHERE e.owner_id = %s', [owner_id])
+        else:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(sql)
+
+    def unindex(self, cursor, event_id):
+        cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [event_id])
+
+    def query(self, terms):
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def search(self, queryset, terms):
+        query = self.query(terms)
+        return queryset.filter(
+            RawSQL(
+                f'events_event.id IN (SELECT rowid FROM {self.table} '
+                f'WHERE {self.table} MATCH %s)',
+                [query],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f'(SELECT -bm25({self.table}, {self.weights}) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s AND rowid = events_event.id)',
+                [query],
+                output_field=FloatField(),
+            )
+        )
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'sqlite': SqliteSearchBackend(),
+}
+
+
+def get_backend(connection):
+    """Return the search backend for a connection, or None if unsupported"""
+    return BACKENDS.get(connection.vendor)
+
+
+def reindex_event(event_id=None, using='default', owner_id=None):
+    """
+    Refresh one event's search document, every event of one owner's if
+    owner_id is given, or every event's if neither is
+    """
+    connection = connections[using]
+    backend = get_backend(connection)
+    if backend is not None:
+        with connection.cursor() as cursor:
+            backend.index(cursor, event_id, owner_id)
+
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, using, **kwargs):
+    reindex_event(instance.pk, using)
+
+
+@receiver(post_save, sender=User)
+def reindex_owner_events(sender, instance, created, using, update_fields=None, **kwargs):
+    # The owner's username is part of each event's document. Logins only
+    # save last_login, and a new user has no events yet
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    reindex_event(using=using, owner_id=instance.pk)
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, using, **kwargs):
+    connection = connections[using]
+    backend = get_backend(connection)
+    if backend is not None:
+        with connection.cursor() as cursor:
+            backend.unindex(cursor, instance.pk)
+
+
+class EventSearchFilter(filters.SearchFilter):
+    """
+    ?search= backed by the database's full-text index. Matches title,
+    description, location, category and owner username, and annotates
+    each event with a search_rank the paginator orders by. Databases
+    without a backend fall back to SearchFilter's icontains lookups.
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = [
+            token
+            for term in self.get_search_terms(request)
+            for token in re.findall(r'\w+', term)
+        ]
+        if not terms:
+            return queryset
+        backend = get_backend(connections[queryset.db])
+        if backend is None:
+            return super().filter_queryset(request, queryset, view)
+        return backend.search(queryset, terms)
@@ -1,11 +1,23 @@
 # events/serializers.py
 from rest_framework import serializers
-from .models import Event, EventAttendee
-from likes.models import Like
-from favorites.models import Favorite
+from .models import Event, EventAttendee, register_attendee
+from .viewer_state import ViewerState
+from uploads.serializers import CloudinaryImageField, ImageVariantsField, SignedUploadMixin
 import os
 
-class EventSerializer(serializers.ModelSerializer):
+
+class EventListSerializer(serializers.ListSerializer):
+    """
+    Resolves the viewer's like, favorite and attendance ids for the whole
+    page up front so each event reads them from a map.
+    """
+    def to_representation(self, data):
+        events = list(data.all() if hasattr(data, 'all') else data)
+        ViewerState.for_context(self.context).load(event.pk for event in events)
+        return super().to_representation(events)
+
+
+class EventSerializer(SignedUploadMixin, serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.username')
     is_owner = serializers.SerializerMethodField()
     like_id = serializers.SerializerMethodField()
@@ -16,38 +28,43 @@ class EventSerializer(serializers.ModelSerializer):
     # Add fields for event attendance
     attendees_count = serializers.ReadOnlyField()
     attendance_id = serializers.SerializerMethodField()  # To track current user's attendance
+    # 'registered' or 'waitlisted'; an attendance_id alone does not mean a seat
+    attendance_status = serializers.SerializerMethodField()
+    # Geocoded from location; distance is only set for ?near= queries
+    latitude = serializers.FloatField(read_only=True)
+    longitude = serializers.FloatField(read_only=True)
+    distance_km = serializers.SerializerMethodField()
     # Make cover an explicit image field to ensure proper handling
-    cover = serializers.ImageField(required=False)
+    cover = CloudinaryImageField(required=False)
+    # Covers are uploaded in the background; see uploads.pipeline
+    cover_upload_status = serializers.ReadOnlyField()
+    # Thumbnail, medium and full URLs; lists should use the thumbnail
+    cover_variants = ImageVariantsField('cover')
+    # Or uploaded straight to storage with /api/uploads/sign/
+    signed_upload_fields = ('cover',)
 
 
+    def get_distance_km(self, obj):
+        distance = getattr(obj, 'distance', None)
+        return round(distance, 2) if distance is not None else None
 
     def get_is_owner(self, obj):
         request = self.context['request']
         return request.user == obj.owner
 
     def get_like_id(self, obj):
-        user = self.context['request'].user
-        if user.is_authenticated:
-            like = Like.objects.filter(owner=user, event=obj).first()
-            return like.id if like else None
-        return None
+        return ViewerState.for_context(self.context).get('like', obj)
 
     def get_favorite_id(self, obj):
         """Get favorite ID for the current user only"""
-        user = self.context['request'].user
-        if user.is_authenticated:
-            # Only return favorite ID if the current user has favorited this event
-            favorite = Favorite.objects.filter(owner=user, event=obj).first()
-            return favorite.id if favorite else None
-        return None
+        return ViewerState.for_context(self.context).get('favorite', obj)
         
     # Get attendance ID for the current user if they're registered
     def get_attendance_id(self, obj):
-        user = self.context['request'].user
-        if user.is_authenticated:
-            attendance = EventAttendee.objects.filter(owner=user, event=obj).first()
-            return attendance.id if attendance else None
-        return None
+        return ViewerState.for_context(self.context).get('attendance', obj)
+
+    def get_attendance_status(self, obj):
+        return ViewerState.for_context(self.context).detail('attendance', obj)
 
     def validate_cover(self, value):
         """Custom validation for cover field"""
@@ -68,14 +85,25 @@ class EventSerializer(serializers.ModelSerializer):
         
     class Meta:
         model = Event
+        list_serializer_class = EventListSerializer
         fields = [
             'id', 'owner', 'created_at', 'updated_at', 'title',
-            'description', 'date', 'location', 'category', 'cover',
-            'price', 'is_owner', 'like_id', 'likes_count', 'comments_count',
-            'favorite_id', 'favorites_count', 'attendees_count', 'attendance_id'
+            'description', 'date', 'location', 'category', 'cover', 'cover_upload_status', 'cover_variants',
+            'price', 'capacity', 'is_owner', 'like_id', 'likes_count', 'comments_count',
+            'favorite_id', 'favorites_count', 'attendees_count', 'attendance_id', 'attendance_status',
+            'latitude', 'longitude', 'distance_km',
         ]
 
 
+class RelatedEventSerializer(serializers.ModelSerializer):
+    """Compact summary of an event for the related list on event pages"""
+    cover = CloudinaryImageField(read_only=True)
+
+    class Meta:
+        model = Event
+        fields = ['id', 'title', 'date', 'location', 'category', 'cover']
+
+
 # Serializer for event attendance/registration
 class EventAttendeeSerializer(serializers.ModelSerializer):
     """
@@ -87,6 +115,8 @@ class EventAttendeeSerializer(serializers.ModelSerializer):
     event_date = serializers.ReadOnlyField(source='event.date')
     # Use a SerializerMethodField to convert Cloudinary field to URL string
     event_image = serializers.SerializerMethodField()
+    # Waitlisted when the event was full at registration time
+    status = serializers.ReadOnlyField()
     
     # Convert CloudinaryResource to string URL to make it JSON serializable
     def get_event_image(self, obj):
@@ -98,6 +128,10 @@ class EventAttendeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = EventAttendee
         fields = [
-            'id', 'owner', 'event', 'registered_at', 
+            'id', 'owner', 'event', 'registered_at', 'status',
             'event_title', 'event_date', 'event_image'
         ]
+
+    def create(self, validated_data):
+        # Seats are claimed atomically; see events.models.claim_seat
+        return register_attendee(validated_data['owner'], validated_data['event'])
@@ -2,14 +2,29 @@
 
 from django.contrib.auth.models import User
 from django.utils import timezone
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from django.urls import reverse
-from .models import Event
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from eventify.middleware import QueryBudgetExceeded
+from .views import EventList
+from io import StringIO
+from .models import Event, EventAttendee, register_attendee
 from likes.models import Like
 from comments.models import Comment
+from favorites.models import Favorite
 from datetime import datetime, timedelta
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from django.core.files.uploadedfile import SimpleUploadedFile
 import tempfile
 import cloudinary.uploader
@@ -101,7 +116,7 @@ class CommentTests(APITestCase):
     def test_create_comment(self):
         """Test creating a comment on an event"""
         self.client.force_authenticate(user=self.user)
-        url = reverse('comment-list', kwargs={'event_pk': self.event.pk})
+        url = reverse('event-comment-list', kwargs={'event_pk': self.event.pk})
         data = {'content': 'New comment', 'event': self.event.pk}
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -109,10 +124,10 @@ class CommentTests(APITestCase):
 
     def test_list_comments(self):
         """Test retrieving comments for an event"""
-        url = reverse('comment-list', kwargs={'event_pk': self.event.pk})
+        url = reverse('event-comment-list', kwargs={'event_pk': self.event.pk})
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
 class LikeTests(APITestCase):
     def setUp(self):
@@ -156,6 +171,649 @@ class LikeTests(APITestCase):
         self.assertEqual(Like.objects.count(), 1)
 
 
+class EngagementCounterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.user2 = User.objects.create_user(username='testuser2', password='testpass123')
+        self.event = Event.objects.create(
+            owner=self.user,
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now() + timedelta(days=7),
+            location='Test Location',
+            category='tech',
+            price=10.00
+        )
+
+    def test_like_api_updates_likes_count(self):
+        """Test liking and unliking through the API keeps likes_count in step"""
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.post(reverse('like-list'), {'event': self.event.pk})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.likes_count, 1)
+
+        self.client.delete(reverse('like-detail', kwargs={'pk': response.data['id']}))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.likes_count, 0)
+
+    def test_duplicate_like_does_not_double_count(self):
+        """Test a rejected duplicate like leaves likes_count untouched"""
+        self.client.force_authenticate(user=self.user2)
+        self.client.post(reverse('like-list'), {'event': self.event.pk})
+        response = self.client.post(reverse('like-list'), {'event': self.event.pk})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.likes_count, 1)
+
+    def test_counters_follow_creates_and_deletes(self):
+        """Test every engagement table maintains its counter"""
+        Comment.objects.create(owner=self.user2, event=self.event, content='Hi')
+        Favorite.objects.create(owner=self.user2, event=self.event)
+        attendance = EventAttendee.objects.create(owner=self.user2, event=self.event)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.comments_count, 1)
+        self.assertEqual(self.event.favorites_count, 1)
+        self.assertEqual(self.event.attendees_count, 1)
+
+        attendance.delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendees_count, 0)
+
+    def test_list_returns_stored_counters(self):
+        """Test the list endpoint serializes the stored counters"""
+        Like.objects.create(owner=self.user2, event=self.event)
+        response = self.client.get(reverse('event-list'))
+        self.assertEqual(response.data['results'][0]['likes_count'], 1)
+
+    def test_reconcile_repairs_drift(self):
+        """Test the reconcile command recounts drifted counters"""
+        Like.objects.create(owner=self.user2, event=self.event)
+        Event.objects.filter(pk=self.event.pk).update(likes_count=7, comments_count=3)
+
+        call_command('reconcile_event_counters', stdout=StringIO())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.likes_count, 1)
+        self.assertEqual(self.event.comments_count, 0)
+
+
+class ViewerStateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.viewer = User.objects.create_user(username='viewer', password='testpass123')
+
+    def _create_events(self, count):
+        events = []
+        for i in range(count):
+            event = Event.objects.create(
+                owner=self.user,
+                title=f'Event {i}',
+                description='Test Description',
+                date=timezone.now() + timedelta(days=i + 1),
+                location='Test Location',
+                category='tech',
+            )
+            Like.objects.create(owner=self.viewer, event=event)
+            Favorite.objects.create(owner=self.viewer, event=event)
+            events.append(event)
+        return events
+
+    def _count_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('event-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response
+
+    def test_viewer_ids_are_resolved(self):
+        """Test the list reports the viewer's own like and favorite ids"""
+        event = self._create_events(1)[0]
+        self.client.force_authenticate(user=self.viewer)
+        _, response = self._count_list_queries()
+        row = response.data['results'][0]
+        self.assertEqual(row['like_id'], Like.objects.get(event=event).id)
+        self.assertEqual(row['favorite_id'], Favorite.objects.get(event=event).id)
+        self.assertIsNone(row['attendance_id'])
+
+    def test_query_count_independent_of_page_size(self):
+        """Test a full page costs the same number of queries as a short one"""
+        self.client.force_authenticate(user=self.viewer)
+        self._create_events(2)
+        short_page, _ = self._count_list_queries()
+        self._create_events(8)
+        full_page, response = self._count_list_queries()
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(short_page, full_page)
+
+
+class EventPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.now = timezone.now()
+        for i in range(25):
+            self._create_event(f'Event {i}', days=i + 1, likes_count=i % 4)
+
+    def _create_event(self, title, days, likes_count=0):
+        event = Event.objects.create(
+            owner=self.user,
+            title=title,
+            description='Test Description',
+            date=self.now + timedelta(days=days),
+            location='Test Location',
+            category='tech',
+        )
+        Event.objects.filter(pk=event.pk).update(likes_count=likes_count)
+        return event
+
+    def _walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_follow_date_then_id(self):
+        """Test walking the cursor returns every event once, newest first"""
+        ids = self._walk(reverse('event-list'))
+        expected = list(Event.objects.order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_no_total_count(self):
+        """Test the response skips the COUNT(*) total"""
+        response = self.client.get(reverse('event-list'))
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+
+    def test_inserts_do_not_shift_pages(self):
+        """Test events inserted mid-walk neither repeat nor skip rows"""
+        first = self.client.get(reverse('event-list'))
+        self._create_event('Newest', days=100)
+        seen = [row['id'] for row in first.data['results']]
+        seen += self._walk(first.data['next'])
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_ordering_by_counter(self):
+        """Test ordering by likes_count pages with id as the tie-breaker"""
+        ids = self._walk(reverse('event-list') + '?ordering=-likes_count')
+        expected = list(
+            Event.objects.order_by('-likes_count', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_prior_page(self):
+        """Test the previous cursor walks back to the same page"""
+        first = self.client.get(reverse('event-list'))
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [row['id'] for row in back.data['results']],
+            [row['id'] for row in first.data['results']],
+        )
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        response = self.client.get(reverse('event-list') + '?cursor=nonsense')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EventSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='organiser', password='testpass123')
+        self.jazz_title = self._create_event('Jazz Night', 'Live music downtown', 'Leeds')
+        self.jazz_body = self._create_event('Friday Social', 'Bring friends, jazz trio', 'York')
+        self.hike = self._create_event('Peak Walk', 'A long hike', 'Sheffield')
+
+    def _create_event(self, title, description, location):
+        return Event.objects.create(
+            owner=self.user,
+            title=title,
+            description=description,
+            date=timezone.now() + timedelta(days=7),
+            location=location,
+            category='other',
+        )
+
+    def _search(self, term):
+        response = self.client.get(reverse('event-list'), {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def test_search_matches_description_and_location(self):
+        """Test search covers description and location, not just title"""
+        self.assertEqual(self._search('hike'), [self.hike.pk])
+        self.assertEqual(self._search('sheffield'), [self.hike.pk])
+
+    def test_title_matches_rank_first(self):
+        """Test a title match outranks a description match"""
+        self.assertEqual(self._search('jazz'), [self.jazz_title.pk, self.jazz_body.pk])
+
+    def test_prefix_and_owner_matches(self):
+        """Test partial words and owner usernames still match"""
+        self.assertEqual(self._search('sheff'), [self.hike.pk])
+        self.assertEqual(len(self._search('organiser')), 3)
+
+    def test_index_follows_save_and_delete(self):
+        """Test the index is updated when events are edited or deleted"""
+        self.hike.title = 'Peak Scramble'
+        self.hike.save()
+        self.assertEqual(self._search('scramble'), [self.hike.pk])
+        self.hike.delete()
+        self.assertEqual(self._search('scramble'), [])
+
+    def test_index_follows_owner_rename(self):
+        """Test renaming the owner re-indexes their events under the new name"""
+        self.user.username = 'promoter'
+        self.user.save()
+        self.assertEqual(len(self._search('promoter')), 3)
+        self.assertEqual(self._search('organiser'), [])
+
+    def test_search_results_paginate(self):
+        """Test ranked search results page through the cursor"""
+        for i in range(12):
+            self._create_event(f'Jazz Jam {i}', 'Session', 'Hull')
+        first = self.client.get(reverse('event-list'), {'search': 'jazz'})
+        second = self.client.get(first.data['next'])
+        ids = [row['id'] for row in first.data['results'] + second.data['results']]
+        self.assertEqual(len(ids), 14)
+        self.assertEqual(len(set(ids)), 14)
+
+
+class HotPathIndexTests(APITestCase):
+    """
+    Runs EXPLAIN over the list endpoints' hot queries on a seeded dataset
+    and fails if any of them falls back to a sequential table scan.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f'user{i}', password='testpass123')
+            for i in range(20)
+        ]
+        now = timezone.now()
+        categories = [choice for choice, _ in Event.CATEGORY_CHOICES]
+        Event.objects.bulk_create(
+            Event(
+                owner=cls.users[i % 20],
+                title=f'Event {i}',
+                description='Seeded',
+                date=now + timedelta(hours=i),
+                location='Seeded',
+                category=categories[i % len(categories)],
+            )
+            for i in range(500)
+        )
+        events = list(Event.objects.all())
+        for model in (Like, Favorite, EventAttendee):
+            model.objects.bulk_create(
+                model(owner=user, event=event)
+                for user in cls.users
+                for event in events[:50]
+            )
+        Comment.objects.bulk_create(
+            Comment(owner=cls.users[0], event=event, content='Seeded')
+            for event in events
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndexes(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+            self.assertNotIn('Seq Scan', plan, plan)
+        else:
+            # SQLite reports a full table scan as "SCAN <table>" without an index
+            scans = re.findall(r'SCAN (\w+)\b(?! USING)', queryset.explain())
+            self.assertEqual(scans, [], queryset.explain())
+
+    def _page(self, queryset):
+        return queryset.select_related('owner').order_by('-date', '-id')[:11]
+
+    def test_event_list(self):
+        """Test the default list page is read from the date index"""
+        self.assertUsesIndexes(self._page(Event.objects.all()))
+
+    def test_trending_list(self):
+        """Test ?ordering=-trending is read from the trending index"""
+        queryset = (
+            Event.objects.select_related('owner')
+            .annotate(trending=F('trending_score'))
+            .order_by('-trending', '-id')[:11]
+        )
+        self.assertUsesIndexes(queryset)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', queryset.explain())
+
+    def test_event_list_by_category(self):
+        """Test ?category= uses the category index"""
+        self.assertUsesIndexes(self._page(Event.objects.filter(category='music')))
+
+    def test_event_list_by_owner_profile(self):
+        """Test ?owner__profile= uses the owner index"""
+        profile = self.users[3].profile
+        self.assertUsesIndexes(self._page(Event.objects.filter(owner__profile=profile)))
+
+    def test_event_list_favorites_and_attending(self):
+        """Test ?favorite= and ?attending= use indexed id lists"""
+        user = self.users[5]
+        for model in (Favorite, EventAttendee):
+            ids = model.objects.filter(owner=user).values_list('event_id', flat=True)
+            self.assertUsesIndexes(self._page(Event.objects.filter(id__in=ids)))
+
+    def test_event_list_near(self):
+        """Test ?near= bounding boxes are read from the coordinate index"""
+        from .geo import bounding_box
+        self.assertUsesIndexes(self._page(Event.objects.filter(bounding_box(53.8, -1.55, 25))))
+
+    def test_attendance_by_owner(self):
+        """Test a user's registrations are read from the owner index"""
+        self.assertUsesIndexes(
+            EventAttendee.objects.filter(owner=self.users[2]).order_by('-registered_at')[:10]
+        )
+
+    def test_engagement_by_event(self):
+        """Test an event's comments, likes and favorites use the event index"""
+        event = Event.objects.order_by('date').first()
+        for model in (Comment, Like, Favorite):
+            self.assertUsesIndexes(
+                model.objects.filter(event=event).order_by('-created_at')[:10]
+            )
+
+
+class EventResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.tech = self._create_event('Tech Talk', 'tech')
+        self.music = self._create_event('Gig', 'music')
+
+    def _create_event(self, title, category):
+        return Event.objects.create(
+            owner=self.user,
+            title=title,
+            description='Test Description',
+            date=timezone.now() + timedelta(days=7),
+            location='Test Location',
+            category=category,
+        )
+
+    def test_repeat_anonymous_read_is_a_hit(self):
+        """Test a second identical anonymous GET is served from the cache"""
+        url = reverse('event-list')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(queries), 0)
+
+    def test_query_params_are_normalized(self):
+        """Test parameter order and blank values do not split the cache"""
+        url = reverse('event-list')
+        self.client.get(url + '?category=tech&ordering=-date')
+        response = self.client.get(url + '?ordering=-date&search=&category=tech')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_owner_rename_retires_cached_events(self):
+        """Test a new username shows on cached lists and details"""
+        list_url = reverse('event-list')
+        detail_url = reverse('event-detail', kwargs={'pk': self.tech.pk})
+        self.client.get(list_url)
+        self.client.get(detail_url)
+        self.user.username = 'renamed'
+        self.user.save()
+        response = self.client.get(list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual({row['owner'] for row in response.data['results']}, {'renamed'})
+        self.assertEqual(self.client.get(detail_url).data['owner'], 'renamed')
+
+        # Saving the profile retires them too; a login does not
+        self.user.profile.save()
+        self.assertEqual(self.client.get(list_url)['X-Cache'], 'MISS')
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(list_url)['X-Cache'], 'HIT')
+
+    def test_like_retires_cached_counts(self):
+        """Test an interaction on an event is visible on the next read"""
+        url = reverse('event-detail', kwargs={'pk': self.tech.pk})
+        self.client.get(url)
+        Like.objects.create(owner=self.user, event=self.tech)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['likes_count'], 1)
+
+    def test_category_lists_are_versioned_separately(self):
+        """Test a change to a tech event keeps the music list cached"""
+        url = reverse('event-list')
+        self.client.get(url, {'category': 'music'})
+        self.client.get(url, {'category': 'tech'})
+        self.tech.title = 'Renamed'
+        self.tech.save()
+        self.assertEqual(self.client.get(url, {'category': 'music'})['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(url, {'category': 'tech'})['X-Cache'], 'MISS')
+
+    def test_category_change_retires_old_category(self):
+        """Test moving an event out of a category refreshes that list"""
+        url = reverse('event-list')
+        self.client.get(url, {'category': 'tech'})
+        self.tech.category = 'music'
+        self.tech.save()
+        response = self.client.get(url, {'category': 'tech'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_authenticated_reads_bypass_cache(self):
+        """Test viewer-specific responses are never cached"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('event-list')
+        self.client.get(url)
+        self.assertNotIn('X-Cache', self.client.get(url))
+
+    def test_stats_are_staff_only(self):
+        """Test hit and miss counters are exposed to staff"""
+        url = reverse('event-list')
+        self.client.get(url)
+        self.client.get(url)
+        stats_url = reverse('event-cache-stats')
+        self.assertEqual(self.client.get(stats_url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(user=User.objects.create_user(
+            username='staff', password='testpass123', is_staff=True
+        ))
+        response = self.client.get(stats_url)
+        self.assertEqual(response.data['hits'], 1)
+        self.assertEqual(response.data['misses'], 1)
+
+
+class EventConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.event = Event.objects.create(
+            owner=self.user,
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now() + timedelta(days=7),
+            location='Test Location',
+            category='tech',
+        )
+        self.url = reverse('event-detail', kwargs={'pk': self.event.pk})
+
+    def test_matching_etag_returns_304_from_one_query(self):
+        """Test a matching If-None-Match skips the queryset and serializer"""
+        etag = self.client.get(self.url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(queries), 1)
+
+    def test_if_modified_since_alone_is_not_trusted(self):
+        """Test If-Modified-Since gets a full response, since related events are undated"""
+        first = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=first['ETag'], HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_engagement_changes_etag(self):
+        """Test a new like invalidates the ETag"""
+        etag = self.client.get(self.url)['ETag']
+        Like.objects.create(owner=self.user, event=self.event)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_engagement_moves_last_modified_not_updated_at(self):
+        """Test a like moves Last-Modified but leaves the owner's updated_at"""
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Event.objects.filter(pk=self.event.pk).update(updated_at=an_hour_ago)
+        last_modified = self.client.get(self.url)['Last-Modified']
+        Like.objects.create(owner=self.user, event=self.event)
+        self.assertNotEqual(self.client.get(self.url)['Last-Modified'], last_modified)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.updated_at, an_hour_ago)
+
+    def test_etag_varies_by_viewer(self):
+        """Test viewer-specific fields give each user their own ETag"""
+        anonymous = self.client.get(self.url)['ETag']
+        self.client.force_authenticate(user=self.user)
+        self.assertNotEqual(self.client.get(self.url)['ETag'], anonymous)
+
+    def test_missing_event_is_404(self):
+        """Test unknown ids still return a 404"""
+        response = self.client.get(reverse('event-detail', kwargs={'pk': 9999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QueryBudgetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        Event.objects.create(
+            owner=self.user,
+            title='Test Event',
+            description='Test Description',
+            date=timezone.now() + timedelta(days=7),
+            location='Test Location',
+            category='tech',
+        )
+
+    @override_settings(QUERY_SERVER_TIMING=True)
+    def test_server_timing_reports_queries(self):
+        """Test each response reports its query count and DB time"""
+        response = self.client.get(reverse('event-list'))
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="1 query", db-slowest;dur=[\d.]+$'
+        )
+
+    @override_settings(QUERY_SERVER_TIMING=False)
+    def test_server_timing_is_off_by_default(self):
+        """Test query timings are not sent outside development"""
+        response = self.client.get(reverse('event-list'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_over_budget_fails_under_tests(self):
+        """Test exceeding a view's query budget raises in strict mode"""
+        with mock.patch.object(EventList, 'query_budget', {'GET': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('event-list'))
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_over_budget_logs_in_production(self):
+        """Test exceeding a view's query budget logs a warning otherwise"""
+        with mock.patch.object(EventList, 'query_budget', 0):
+            with self.assertLogs('eventify.queries', level='WARNING') as logs:
+                response = self.client.get(reverse('event-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('EventList GET', logs.output[0])
+
+
+class NearbyEventTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.leeds = self._create_event('Leeds Meetup', 'Town Hall, Leeds')
+        self.york = self._create_event('York Walk', 'York')
+        self.london = self._create_event('London Gig', 'London')
+        self.unknown = self._create_event('Somewhere', 'The moon')
+
+    def _create_event(self, title, location):
+        return Event.objects.create(
+            owner=self.user,
+            title=title,
+            description='Test Description',
+            date=timezone.now() + timedelta(days=7),
+            location=location,
+            category='other',
+        )
+
+    def _near(self, **params):
+        return self.client.get(reverse('event-list'), params)
+
+    def test_locations_are_geocoded_on_save(self):
+        """Test saving an event fills its coordinates from the gazetteer"""
+        self.assertAlmostEqual(self.leeds.latitude, 53.8008)
+        self.assertIsNone(self.unknown.latitude)
+        self.york.location = '53.0, -1.0'
+        self.york.save()
+        self.assertEqual((self.york.latitude, self.york.longitude), (53.0, -1.0))
+
+    def test_regeocoding_clears_unresolvable_locations(self):
+        """Test geocode_events --all drops coordinates a location no longer gives"""
+        Event.objects.filter(pk=self.york.pk).update(location='The far side')
+        output = StringIO()
+        call_command('geocode_events', '--all', stdout=output)
+        self.york.refresh_from_db()
+        self.assertIsNone(self.york.latitude)
+        self.assertIsNone(self.york.longitude)
+        self.assertIn('Geocoded 0 events, cleared 1', output.getvalue())
+
+    @override_settings(EVENT_CACHE_ENABLED=True)
+    def test_regeocoding_retires_cached_responses(self):
+        """Test coordinates written by geocode_events show up through the cache"""
+        cache.clear()
+        url = reverse('event-detail', kwargs={'pk': self.york.pk})
+        Event.objects.filter(pk=self.york.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        first = self.client.get(url)
+        self.assertIsNotNone(first.data['latitude'])
+        Event.objects.filter(pk=self.york.pk).update(location='The far side')
+        call_command('geocode_events', '--all', stdout=StringIO())
+        response = self.client.get(url)
+        self.assertIsNone(response.data['latitude'])
+        self.assertNotEqual(response['Last-Modified'], first['Last-Modified'])
+
+    def test_near_filters_by_radius_and_orders_by_distance(self):
+        """Test ?near= returns events in range, nearest first"""
+        response = self._near(near='53.79,-1.54', radius_km=50)
+        rows = response.data['results']
+        self.assertEqual([row['id'] for row in rows], [self.leeds.pk, self.york.pk])
+        self.assertLess(rows[0]['distance_km'], 2)
+        self.assertAlmostEqual(rows[1]['distance_km'], 35, delta=3)
+
+    def test_radius_excludes_far_events(self):
+        """Test events outside the radius are left out"""
+        response = self._near(near='51.5,-0.12', radius_km=10)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.london.pk])
+
+    def test_invalid_near_is_rejected(self):
+        """Test malformed coordinates or radii return a 400"""
+        for params in ({'near': 'leeds'}, {'near': '95,0'}, {'near': '53,-1', 'radius_km': '0'}):
+            self.assertEqual(self._near(**params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bounding_box_wraps_antimeridian(self):
+        """Test a box crossing 180 degrees matches both sides"""
+        from .geo import bounding_box
+        Event.objects.filter(pk=self.york.pk).update(latitude=-17.0, longitude=179.9)
+        Event.objects.filter(pk=self.london.pk).update(latitude=-17.0, longitude=-179.9)
+        ids = set(Event.objects.filter(bounding_box(-17.0, 180.0, 50)).values_list('id', flat=True))
+        self.assertEqual(ids, {self.york.pk, self.london.pk})
+
+
 class CloudinaryUploadTest(APITestCase):
     """Test Cloudinary image upload functionality"""
     
@@ -224,4 +882,307 @@ class CloudinaryUploadTest(APITestCase):
         event = Event.objects.get(id=event_id)
         
         # Check if the cover field has a value
-        self.assertIsNotNone(event.cover, "The cover field should not be None after upload")
\ No newline at end of file
+        self.assertIsNotNone(event.cover, "The cover field should not be None after upload")
+
+class EventCapacityTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', password='pass')
+        self.users = [
+            User.objects.create_user(username=f'fan{index}', password='pass')
+            for index in range(4)
+        ]
+        self.event = Event.objects.create(
+            owner=self.owner, title='Ticket drop', description='d',
+            date=timezone.now() + timedelta(days=7), location='Leeds',
+            category='music', capacity=2,
+        )
+
+    def register(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse('event-attendee-list'), {'event': self.event.pk})
+
+    def test_registrations_past_capacity_are_waitlisted(self):
+        """Test registrations beyond capacity go on the waitlist"""
+        statuses = [self.register(user).data['status'] for user in self.users[:3]]
+        self.assertEqual(statuses, ['registered', 'registered', 'waitlisted'])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendees_count, 2)
+
+    def test_cancellation_promotes_oldest_waitlisted(self):
+        """Test cancelling a registration promotes the first waitlisted user"""
+        first = self.register(self.users[0]).data
+        for user in self.users[1:]:
+            self.register(user)
+
+        self.client.force_authenticate(user=self.users[0])
+        url = reverse('event-attendee-detail', kwargs={'pk': first['id']})
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+
+        promoted = EventAttendee.objects.get(owner=self.users[2])
+        self.assertEqual(promoted.status, EventAttendee.REGISTERED)
+        self.assertEqual(EventAttendee.objects.get(owner=self.users[3]).status, EventAttendee.WAITLISTED)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendees_count, 2)
+
+    def test_cancelling_waitlisted_frees_no_seat(self):
+        """Test leaving the waitlist leaves the count alone"""
+        for user in self.users[:3]:
+            self.register(user)
+        waitlisted = EventAttendee.objects.get(owner=self.users[2])
+        self.client.force_authenticate(user=self.users[2])
+        self.client.delete(reverse('event-attendee-detail', kwargs={'pk': waitlisted.pk}))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attendees_count, 2)
+
+    def test_raising_capacity_promotes(self):
+        """Test raising the capacity fills new seats from the waitlist"""
+        for user in self.users:
+            self.register(user)
+        self.client.force_authenticate(user=self.owner)
+        self.client.patch(reverse('event-detail', kwargs={'pk': self.event.pk}), {'capacity': 3})
+        self.assertEqual(
+            EventAttendee.objects.filter(status=EventAttendee.REGISTERED).count(), 3
+        )
+
+    def test_stale_edit_keeps_registrations(self):
+        """Test an edit racing registrations cannot reset the seat count"""
+        def register_during_update(serializer, *field_names):
+            # The PATCH has already read the event; two seats go meanwhile
+            for user in self.users[:2]:
+                self.register(user)
+            self.client.force_authenticate(user=self.owner)
+            return {}
+
+        self.client.force_authenticate(user=self.owner)
+        # The nested registrations count against the PATCH's query budget
+        with mock.patch('events.views.defer_uploads', register_during_update), \
+                override_settings(QUERY_BUDGET_STRICT=False), \
+                self.assertLogs('eventify.queries', 'WARNING'):
+            response = self.client.patch(
+                reverse('event-detail', kwargs={'pk': self.event.pk}), {'title': 'Renamed'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.title, self.event.attendees_count), ('Renamed', 2))
+        self.assertEqual(self.register(self.users[2]).data['status'], 'waitlisted')
+
+    def test_event_shows_attendance_status(self):
+        """Test the event says whether the viewer has a seat or is waitlisted"""
+        url = reverse('event-detail', kwargs={'pk': self.event.pk})
+        for user in self.users[:3]:
+            self.register(user)
+        self.assertEqual(self.client.get(url).data['attendance_status'], 'waitlisted')
+        self.client.force_authenticate(user=self.users[0])
+        self.assertEqual(self.client.get(url).data['attendance_status'], 'registered')
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(url)
+        self.assertIsNone(response.data['attendance_id'])
+        self.assertIsNone(response.data['attendance_status'])
+
+    def test_reconcile_ignores_waitlist(self):
+        """Test the reconcile command counts registered attendees only"""
+        for user in self.users:
+            self.register(user)
+        out = StringIO()
+        call_command('reconcile_event_counters', '--dry-run', stdout=out)
+        self.assertIn('attendees_count: 0 drifted', out.getvalue())
+
+
+class EventCapacityStressTests(TransactionTestCase):
+    """Registrations from many threads at once, each on its own connection"""
+    registrations = 200
+    capacity = 25
+
+    def register(self, user, event):
+        # Through the API, on this thread's own connection. SQLite allows
+        # one writer at a time; a lock timeout is a failed request for the
+        # client to retry, never an oversold seat. The test client hears
+        # every thread's request exceptions, so errors are read from the
+        # response instead of re-raised
+        client = APIClient(raise_request_exception=False)
+        client.force_authenticate(user=user)
+        try:
+            for _ in range(50):
+                response = client.post(reverse('event-attendee-list'), {'event': event.pk})
+                if response.status_code != status.HTTP_500_INTERNAL_SERVER_ERROR:
+                    self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+                    return response.data['status']
+                time.sleep(0.01)
+        finally:
+            connection.close()
+        raise AssertionError('registration never acquired the database')
+
+    def test_burst_never_oversells(self):
+        """Test hundreds of concurrent registrations never exceed capacity"""
+        owner = User.objects.create_user(username='owner')
+        event = Event.objects.create(
+            owner=owner, title='Ticket drop', description='d', date=timezone.now(),
+            location='Leeds', category='music', capacity=self.capacity,
+        )
+        users = User.objects.bulk_create(
+            User(username=f'fan{index}') for index in range(self.registrations)
+        )
+        start = threading.Barrier(20)
+
+        def worker(batch):
+            start.wait()
+            return [self.register(user, event) for user in batch]
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            batches = [users[index::20] for index in range(20)]
+            statuses = [status for result in pool.map(worker, batches) for status in result]
+
+        event.refresh_from_db()
+        registered = EventAttendee.objects.filter(event=event, status=EventAttendee.REGISTERED)
+        self.assertEqual(statuses.count(EventAttendee.REGISTERED), self.capacity)
+        self.assertEqual(registered.count(), self.capacity)
+        self.assertEqual(event.attendees_count, self.capacity)
+        self.assertEqual(EventAttendee.objects.filter(event=event).count(), self.registrations)
+
+
+class AttendeeListingQueryTests(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='pass')
+        self.fans = [
+            User.objects.create_user(username=f'fan{index}', password='pass')
+            for index in range(10)
+        ]
+        self.events = [
+            Event.objects.create(
+                owner=self.owner, title=f'Event {index}', description='d',
+                date=timezone.now() + timedelta(days=index + 1), location='Leeds',
+                category='music',
+            )
+            for index in range(10)
+        ]
+
+    def attend(self, users, events):
+        for user in users:
+            for event in events:
+                EventAttendee.objects.create(owner=user, event=event)
+
+    def test_attendee_list_query_count_is_constant(self):
+        """Test listing registrations is a count plus one joined page query"""
+        fan = self.fans[0]
+        self.client.force_authenticate(user=fan)
+        self.attend([fan], self.events[:2])
+        with self.assertNumQueries(2):
+            self.client.get(reverse('event-attendee-list'))
+
+        self.attend([fan], self.events[2:])
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('event-attendee-list'))
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['event_title'], 'Event 9')
+
+    def test_username_filter_needs_no_user_lookup(self):
+        """Test ?owner__username= filters through the join"""
+        self.attend(self.fans[:2], self.events[:3])
+        self.client.force_authenticate(user=self.owner)
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('event-attendee-list'), {'owner__username': 'fan1'}
+            )
+        self.assertEqual(
+            {row['owner'] for row in response.data['results']}, {'fan1'}
+        )
+
+    def test_attendees_by_event_query_count_is_constant(self):
+        """Test the permission check and listing share the same two queries"""
+        url = reverse('event-attendees-by-event', kwargs={'event_id': self.events[0].pk})
+        self.attend(self.fans[:2], self.events[:1])
+        self.client.force_authenticate(user=self.owner)
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+        self.attend(self.fans[2:], self.events[:1])
+        for user in (self.owner, self.fans[5]):
+            self.client.force_authenticate(user=user)
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.data['count'], 10)
+
+    def test_attendees_by_event_hidden_from_others(self):
+        """Test users neither owning nor attending the event see nothing"""
+        self.attend(self.fans[:2], self.events[:1])
+        stranger = User.objects.create_user(username='stranger', password='pass')
+        self.client.force_authenticate(user=stranger)
+        url = reverse('event-attendees-by-event', kwargs={'event_id': self.events[0].pk})
+        self.assertEqual(self.client.get(url).data['count'], 0)
+
+
+@override_settings(EVENT_TRENDING_HALF_LIFE=24)
+class TrendingScoreTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.fans = [
+            User.objects.create_user(username=f'fan{i}', password='testpass123')
+            for i in range(3)
+        ]
+        self.quiet = self._create_event('Quiet')
+        self.busy = self._create_event('Busy')
+
+    def _create_event(self, title):
+        return Event.objects.create(
+            owner=self.user, title=title, description='Test Description',
+            date=timezone.now() + timedelta(days=3), location='Test Location', category='tech',
+        )
+
+    def score(self, event):
+        event.refresh_from_db(fields=['trending_score'])
+        return event.trending_score
+
+    def test_interactions_raise_the_score(self):
+        """Test each interaction adds its weight and removals take it back"""
+        like = Like.objects.create(owner=self.fans[0], event=self.busy)
+        Comment.objects.create(owner=self.fans[0], event=self.busy, content='Hi')
+        Favorite.objects.create(owner=self.fans[0], event=self.busy)
+        register_attendee(self.fans[0], self.busy)
+        self.assertAlmostEqual(self.score(self.busy), 1 + 2 + 2 + 3)
+
+        like.delete()
+        # Less the moment's decay of the like's weight
+        self.assertAlmostEqual(self.score(self.busy), 2 + 2 + 3, places=5)
+        self.assertEqual(self.score(self.quiet), 0)
+
+    def test_removals_take_back_the_decayed_weight(self):
+        """Test undoing an old interaction only removes what is left of it"""
+        like = Like.objects.create(owner=self.fans[0], event=self.busy)
+        Favorite.objects.create(owner=self.fans[0], event=self.busy)
+        Like.objects.filter(pk=like.pk).update(created_at=timezone.now() - timedelta(hours=24))
+        call_command('decay_trending_scores', hours=24, stdout=StringIO())
+        self.assertAlmostEqual(self.score(self.busy), (1 + 2) / 2)
+
+        Like.objects.get(pk=like.pk).delete()
+        # The favorite's decayed weight is untouched
+        self.assertAlmostEqual(self.score(self.busy), 1, places=3)
+
+    def test_decay_halves_scores_in_one_update(self):
+        """Test the decay sweep is a single UPDATE scaling every score"""
+        Event.objects.filter(pk=self.busy.pk).update(trending_score=8)
+        Event.objects.filter(pk=self.quiet.pk).update(trending_score=0.015)
+        with self.assertNumQueries(1):
+            call_command('decay_trending_scores', hours=24, stdout=StringIO())
+        self.assertAlmostEqual(self.score(self.busy), 4)
+        # Below the floor once decayed, so cleared rather than kept tiny
+        self.assertEqual(self.score(self.quiet), 0)
+
+    def test_rebuild_weights_interactions_by_age(self):
+        """Test --rebuild recomputes scores with older interactions counting less"""
+        Like.objects.create(owner=self.fans[0], event=self.busy)
+        old = Like.objects.create(owner=self.fans[1], event=self.busy)
+        Like.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(hours=24))
+        Event.objects.filter(pk=self.quiet.pk).update(trending_score=5)
+        call_command('decay_trending_scores', rebuild=True, stdout=StringIO())
+        self.assertAlmostEqual(self.score(self.busy), 1.5, places=3)
+        self.assertEqual(self.score(self.quiet), 0)
+
+    def test_order_by_trending(self):
+        """Test ?ordering=-trending lists the most engaged events first"""
+        for fan in self.fans:
+            Like.objects.create(owner=fan, event=self.busy)
+        Favorite.objects.create(owner=self.fans[0], event=self.quiet)
+        response = self.client.get(reverse('event-list'), {'ordering': '-trending'})
+        titles = [row['title'] for row in response.data['results']]
+        self.assertEqual(titles, ['Busy', 'Quiet'])
@@ -6,6 +6,7 @@ urlpatterns = [
     # Event URLs
     path('events/', views.EventList.as_view(), name='event-list'),
     path('events/<int:pk>/', views.EventDetail.as_view(), name='event-detail'),
+    path('events/cache-stats/', views.EventCacheStats.as_view(), name='event-cache-stats'),
     
     # Attendance URLs
     path('attendees/', views.EventAttendeeList.as_view(), name='event-attendee-list'),
@@ -1,38 +1,52 @@
 # events/views.py
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Exists, F, Q
 from rest_framework import generics, permissions, filters
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Event, EventAttendee
-from .serializers import EventSerializer, EventAttendeeSerializer
+from .models import Event, EventAttendee, promote_waitlist
+from .serializers import EventSerializer, EventAttendeeSerializer, RelatedEventSerializer
+from .search import EventSearchFilter
+from .geo import NearFilter
+from .cache import CachedReadMixin, cache_stats
 from eventify.permissions import IsOwnerOrReadOnly
+from eventify.pagination import EventCursorPagination
+from eventify.conditional import ConditionalGetMixin
+from eventify.counters import AtomicCreateMixin
+from uploads.pipeline import defer_uploads, enqueue_uploads
+from recommendations.content import related_event_ids, related_events
 
 
-class EventList(generics.ListCreateAPIView):
+class EventList(CachedReadMixin, generics.ListCreateAPIView):
     """
     List all events, or create a new event.
     """
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = EventCursorPagination
+    # POST includes the cover's asset lookup and upload job, the owner's
+    # events_count, the feed fan-out and the text vector
+    query_budget = {'GET': 6, 'POST': 13}
     filter_backends = [
-        filters.SearchFilter,
+        EventSearchFilter,
+        NearFilter,
         filters.OrderingFilter,
         DjangoFilterBackend,
     ]
-    search_fields = ['title', 'owner__username', 'category']
-    ordering_fields = ['date', 'likes_count', 'comments_count', 'attendees_count']
+    # Only used on databases without a full-text search backend
+    search_fields = ['title', 'description', 'location', 'owner__username', 'category']
+    # 'trending' is the stored trending_score; see events.models.trending_update
+    ordering_fields = ['date', 'likes_count', 'comments_count', 'attendees_count', 'trending']
     filterset_fields = ['category', 'owner__profile']
     
     def get_queryset(self):
         """
         Custom queryset method to handle special filters like favorites
         """
-        # Base queryset with annotations
-        queryset = Event.objects.annotate(
-            likes_count=Count('likes', distinct=True),
-            comments_count=Count('comments', distinct=True),
-            attendees_count=Count('attendees', distinct=True),
-            favorites_count=Count('favorited_by', distinct=True)
-        )
+        # Engagement counters are stored columns, so the only join needed
+        # is the owner for the username and is_owner fields
+        queryset = Event.objects.select_related('owner').annotate(trending=F('trending_score'))
         
         # Handle favorite filter - show only events favorited by current user
         if self.request.query_params.get('favorite') == 'true':
@@ -45,8 +59,6 @@ class EventList(generics.ListCreateAPIView):
                 
                 # Filter events to only those IDs
                 queryset = queryset.filter(id__in=favorite_event_ids)
-                
-                print(f"Filtered to {queryset.count()} favorites for user {self.request.user.username}")
             else:
                 # No favorites for unauthenticated users
                 queryset = queryset.none()
@@ -61,8 +73,6 @@ class EventList(generics.ListCreateAPIView):
                 
                 # Filter events to only those IDs
                 queryset = queryset.filter(id__in=attendance_event_ids)
-                
-                print(f"Filtered to {queryset.count()} events user {self.request.user.username} is attending")
             else:
                 # No events for unauthenticated users
                 queryset = queryset.none()
@@ -88,28 +98,48 @@ class EventList(generics.ListCreateAPIView):
                 print(f"Cover in request.data: {type(self.request.data['cover'])}")
         print("==============================\n")
             
-        # Save the event
+        # Save the event straight away and upload the cover in the background
+        files = defer_uploads(serializer, 'cover')
         event = serializer.save(owner=self.request.user)
+        enqueue_uploads(event, files)
         
         # Log the result
         print(f"Event created: {event.id}, cover: {event.cover}")
         return event
 
 
-class EventDetail(generics.RetrieveUpdateDestroyAPIView):
+class EventDetail(ConditionalGetMixin, CachedReadMixin, generics.RetrieveUpdateDestroyAPIView):
     """
-    Retrieve, update or delete an event.
+    Retrieve, update or delete an event. Retrieving also lists upcoming
+    events with similar text under `related`.
     """
     permission_classes = [IsOwnerOrReadOnly]
     serializer_class = EventSerializer
-    queryset = Event.objects.annotate(
-        likes_count=Count('likes', distinct=True),
-        comments_count=Count('comments', distinct=True),
-        # Add count of attendees for event detail
-        attendees_count=Count('attendees', distinct=True),
-        # Add count of favorites
-        favorites_count=Count('favorited_by', distinct=True)
+    queryset = Event.objects.select_related('owner')
+    # Writes include a bounded waitlist promotion when capacity changes,
+    # the text vector upsert and the transaction's savepoint; GETs look up
+    # the related events
+    query_budget = {'GET': 8, 'PUT': 15, 'PATCH': 15}
+    validator_fields = (
+        'updated_at', 'engagement_at', 'likes_count', 'comments_count',
+        'attendees_count', 'favorites_count',
     )
+
+    def get_validator_extras(self, request):
+        # related changes as other events are saved or go past, none of
+        # which touches this event's row, so its ids are part of the ETag
+        self.related_ids = related_event_ids(int(self.kwargs['pk']))
+        return self.related_ids
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        # Added outside the response cache, so edits to other events show up
+        if response.status_code == 200:
+            response.data['related'] = RelatedEventSerializer(
+                related_events(self.kwargs['pk'], ids=self.related_ids),
+                many=True, context=self.get_serializer_context(),
+            ).data
+        return response
     
     def perform_update(self, serializer):
         """Override to add debugging for image uploads during event updates"""
@@ -124,16 +154,44 @@ class EventDetail(generics.RetrieveUpdateDestroyAPIView):
             print("No cover file in update request")
         print("============================\n")
             
-        # Save the event
-        event = serializer.save()
+        # Save the event straight away and upload the cover in the background
+        files = defer_uploads(serializer, 'cover')
+        with transaction.atomic():
+            event = serializer.save()
+            enqueue_uploads(event, files)
+            if 'capacity' in serializer.validated_data:
+                # Raising the capacity (or removing it) opens seats to the waitlist
+                promote_waitlist(event.id)
         
         # Log the result
         print(f"Event updated: {event.id}, cover: {event.cover}")
         return event
 
 
+class EventCacheStats(APIView):
+    """
+    Hit and miss counters for the anonymous event response cache.
+    Only available to staff.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
+
+
 # Views for event attendance/registration
-class EventAttendeeList(generics.ListCreateAPIView):
+def attendee_queryset():
+    """
+    Attendance rows with just the owner and event columns the serializer
+    reads, joined in so listing them is a single query.
+    """
+    return EventAttendee.objects.select_related('owner', 'event').only(
+        'id', 'registered_at', 'status', 'owner__username',
+        'event__title', 'event__date', 'event__cover',
+    )
+
+
+class EventAttendeeList(AtomicCreateMixin, generics.ListCreateAPIView):
     """
     List all events a user is attending, or register for a new event.
     GET: Returns list of events the user is registered for (can filter by owner__username)
@@ -143,25 +201,18 @@ class EventAttendeeList(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['owner', 'owner__username', 'event'] 
+    # Count and page, whatever the page size
+    query_budget = {'GET': 4}
     
     def get_queryset(self):
         """Return all attendance records with the ability to filter"""
         # Check if specific owner username is requested
         username = self.request.query_params.get('owner__username', None)
         if username:
-            # If we have a username parameter, filter by that username
-            from django.contrib.auth.models import User
-            try:
-                user = User.objects.get(username=username)
-                return EventAttendee.objects.filter(owner=user)
-            except User.DoesNotExist:
-                return EventAttendee.objects.none()
+            # Filter through the join rather than looking the user up first
+            return attendee_queryset().filter(owner__username=username)
         # If no username specified, default to current user for backwards compatibility
-        return EventAttendee.objects.filter(owner=self.request.user)
-    
-    def perform_create(self, serializer):
-        """Set the owner to the current user when registering for an event"""
-        serializer.save(owner=self.request.user)
+        return attendee_queryset().filter(owner=self.request.user)
 
 
 class EventAttendeeDetail(generics.RetrieveDestroyAPIView):
@@ -172,7 +223,16 @@ class EventAttendeeDetail(generics.RetrieveDestroyAPIView):
     """
     permission_classes = [IsOwnerOrReadOnly]
     serializer_class = EventAttendeeSerializer
-    queryset = EventAttendee.objects.all()
+    query_budget = {'GET': 3}
+
+    def get_queryset(self):
+        return attendee_queryset()
+
+    def perform_destroy(self, instance):
+        """Cancel, handing a freed seat to the oldest waitlisted attendee"""
+        with transaction.atomic():
+            instance.delete()
+            promote_waitlist(instance.event_id)
 
 
 class EventAttendeesByEvent(generics.ListAPIView):
@@ -182,17 +242,17 @@ class EventAttendeesByEvent(generics.ListAPIView):
     """
     serializer_class = EventAttendeeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = {'GET': 4}
     
     def get_queryset(self):
         """Get attendees for a specific event if user has permission"""
         event_id = self.kwargs['event_id']
         user = self.request.user
-        
-        # Check if user is event owner or an attendee
-        try:
-            event = Event.objects.get(id=event_id)
-            if event.owner == user or EventAttendee.objects.filter(event=event, owner=user).exists():
-                return EventAttendee.objects.filter(event=event_id)
-            return EventAttendee.objects.none()
-        except Event.DoesNotExist:
-            return EventAttendee.objects.none()
+
+        # The event owner or an attendee may see the list. Both checks are
+        # part of the listing query: the owner through the event join and
+        # attendance as an EXISTS, so no separate lookups run first
+        is_attendee = Exists(EventAttendee.objects.filter(event_id=event_id, owner=user))
+        return attendee_queryset().filter(
+            Q(event__owner=user) | Q(is_attendee), event_id=event_id
+        )
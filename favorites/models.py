@@ -1,7 +1,9 @@
 # favorites/models.py
 from django.db import models
 from django.contrib.auth.models import User
-from events.models import Event
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from events.models import Event, update_engagement
 
 class Favorite(models.Model):
     """
@@ -23,6 +25,20 @@ class Favorite(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['owner', 'event']
+        indexes = [
+            models.Index(fields=['event', '-created_at'], name='favorite_event_created_idx'),
+        ]
 
     def __str__(self):
-        return f'{self.owner} favorited {self.event}'
\ No newline at end of file
+        return f'{self.owner} favorited {self.event}'
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(sender, instance, created, **kwargs):
+    if created:
+        update_engagement(instance.event_id, 'favorites_count', 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(sender, instance, **kwargs):
+    update_engagement(instance.event_id, 'favorites_count', -1, instance.created_at)
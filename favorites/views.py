@@ -1,11 +1,12 @@
 # favorites/views.py
 from rest_framework import generics, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
+from eventify.counters import AtomicCreateMixin
 from eventify.permissions import IsOwnerOrReadOnly
 from .models import Favorite
 from .serializers import FavoriteSerializer
 
-class FavoriteList(generics.ListCreateAPIView):
+class FavoriteList(AtomicCreateMixin, generics.ListCreateAPIView):
     """
     List favorites or create a favorite if logged in.
     Can filter by event and owner.
@@ -33,9 +34,6 @@ class FavoriteList(generics.ListCreateAPIView):
             
         return queryset
 
-    def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
-
 class FavoriteDetail(generics.RetrieveDestroyAPIView):
     """
     Retrieve a favorite or remove it by id if you own it.
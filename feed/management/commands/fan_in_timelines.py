@@ -0,0 +1,14 @@
+# feed/management/commands/fan_in_timelines.py
+from django.core.management.base import BaseCommand
+from feed.models import fan_in
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy new events from accounts over FEED_FANOUT_LIMIT followers into '
+        'their followers\' timelines. Schedule it every few minutes.'
+    )
+
+    def handle(self, *args, **options):
+        count = fan_in()
+        self.stdout.write(self.style.SUCCESS(f'Added {count} timeline entries'))
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_timelines(apps, schema_editor):
+    # Seed each existing follow with the followed account's recent events
+    Follower = apps.get_model('followers', 'Follower')
+    Event = apps.get_model('events', 'Event')
+    TimelineEntry = apps.get_model('feed', 'TimelineEntry')
+    for owner_id, author_id in Follower.objects.values_list('owner_id', 'followed_id').iterator():
+        events = Event.objects.filter(owner_id=author_id).order_by('-created_at')
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(owner_id=owner_id, author_id=author_id, event_id=pk, created_at=created_at)
+                for pk, created_at in events.values_list('id', 'created_at')[:settings.FEED_BACKFILL]
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('events', '0017_event_capacity_waitlist'),
+        ('followers', '0001_initial'),
+        ('profiles', '0005_profile_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.event')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['owner', 'created_at', 'id'], name='timeline_owner_created_idx'), models.Index(fields=['owner', 'author', 'created_at'], name='timeline_owner_author_idx')],
+                'constraints': [models.UniqueConstraint(fields=('owner', 'event'), name='timeline_owner_event_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,114 @@
+# feed/models.py
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from events.models import Event
+from followers.models import Follower
+
+
+class TimelineEntry(models.Model):
+    """
+    One event in a user's following feed. Entries are written ahead of
+    time so reading a page of the feed is a range scan on
+    (owner, created_at, id). created_at is the event's creation time and
+    author its owner, copied so neither needs a join.
+    """
+    owner = models.ForeignKey(User, related_name='timeline', on_delete=models.CASCADE)
+    author = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    event = models.ForeignKey(Event, related_name='+', on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'event'], name='timeline_owner_event_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', 'created_at', 'id'], name='timeline_owner_created_idx'),
+            # Newest entry per followed account, for fan-in and unfollows
+            models.Index(fields=['owner', 'author', 'created_at'], name='timeline_owner_author_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.event_id} in {self.owner}\'s feed'
+
+
+def fan_out(event_id):
+    """
+    Copy a new event into the timeline of everyone following its author,
+    in one INSERT ... SELECT however many followers there are. Authors
+    with FEED_FANOUT_LIMIT followers or more are skipped and fanned in
+    by their followers instead.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO feed_timelineentry (owner_id, author_id, event_id, created_at) '
+            'SELECT f.owner_id, e.owner_id, e.id, e.created_at '
+            'FROM events_event e '
+            'JOIN followers_follower f ON f.followed_id = e.owner_id '
+            'JOIN profiles_profile p ON p.owner_id = e.owner_id '
+            'WHERE e.id = %s AND p.followers_count < %s '
+            'ON CONFLICT DO NOTHING',
+            [event_id, settings.FEED_FANOUT_LIMIT],
+        )
+
+
+def fan_in(user_id=None):
+    """
+    Pull events from high-follower accounts into their followers'
+    timelines, for one user or, by default, everyone. Only events newer
+    than the newest entry already copied for each account are read, so
+    this is cheap when nothing has changed. Run by the fan_in_timelines
+    command rather than on read, so the feed stays a read-only range
+    scan. Returns the number of entries added.
+    """
+    where, params = '', [settings.FEED_FANOUT_LIMIT]
+    if user_id is not None:
+        where, params = 'AND f.owner_id = %s ', params + [user_id]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO feed_timelineentry (owner_id, author_id, event_id, created_at) '
+            'SELECT f.owner_id, e.owner_id, e.id, e.created_at '
+            'FROM followers_follower f '
+            'JOIN profiles_profile p ON p.owner_id = f.followed_id '
+            'JOIN events_event e ON e.owner_id = f.followed_id '
+            'WHERE p.followers_count >= %s ' + where +
+            'AND e.created_at > COALESCE(('
+            '  SELECT MAX(t.created_at) FROM feed_timelineentry t '
+            '  WHERE t.owner_id = f.owner_id AND t.author_id = f.followed_id'
+            '), f.created_at) '
+            'ON CONFLICT DO NOTHING',
+            params,
+        )
+        return cursor.rowcount
+
+
+def backfill(owner_id, author_id):
+    """Copy an account's most recent events into a new follower's timeline"""
+    events = Event.objects.filter(owner_id=author_id).order_by('-created_at')
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(owner_id=owner_id, author_id=author_id, event_id=pk, created_at=created_at)
+            for pk, created_at in events.values_list('id', 'created_at')[:settings.FEED_BACKFILL]
+        ],
+        ignore_conflicts=True,
+    )
+
+
+@receiver(post_save, sender=Event)
+def fan_out_event(sender, instance, created, **kwargs):
+    if created:
+        fan_out(instance.pk)
+
+
+@receiver(post_save, sender=Follower)
+def follow_backfill(sender, instance, created, **kwargs):
+    if created:
+        backfill(instance.owner_id, instance.followed_id)
+
+
+@receiver(post_delete, sender=Follower)
+def unfollow_cleanup(sender, instance, **kwargs):
+    TimelineEntry.objects.filter(owner_id=instance.owner_id, author_id=instance.followed_id).delete()
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Event
+from followers.models import Follower
+from .models import TimelineEntry
+
+
+class FeedTests(APITestCase):
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader', password='pass')
+        self.author = User.objects.create_user(username='author', password='pass')
+        self.stranger = User.objects.create_user(username='stranger', password='pass')
+        self.client.force_authenticate(user=self.reader)
+
+    def create_event(self, owner, title='Event'):
+        return Event.objects.create(
+            owner=owner, title=title, description='d',
+            date=timezone.now() + timedelta(days=1), location='Leeds', category='tech',
+        )
+
+    def feed_titles(self, **params):
+        response = self.client.get(reverse('feed'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['title'] for row in response.data['results']]
+
+    def test_new_events_fan_out_to_followers(self):
+        """Test a new event lands in followers' timelines only"""
+        Follower.objects.create(owner=self.reader, followed=self.author)
+        self.create_event(self.author, 'Followed')
+        self.create_event(self.stranger, 'Not followed')
+        self.assertEqual(self.feed_titles(), ['Followed'])
+        self.assertEqual(TimelineEntry.objects.filter(owner=self.reader).count(), 1)
+
+    def test_follow_backfills_and_unfollow_removes(self):
+        """Test following copies recent events in and unfollowing takes them out"""
+        for index in range(3):
+            self.create_event(self.author, f'Event {index}')
+        with self.settings(FEED_BACKFILL=2):
+            follow = Follower.objects.create(owner=self.reader, followed=self.author)
+        self.assertEqual(self.feed_titles(), ['Event 2', 'Event 1'])
+
+        follow.delete()
+        self.assertEqual(self.feed_titles(), [])
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_high_follower_accounts_are_fanned_in(self):
+        """Test accounts over the fan-out limit are pulled in by the command"""
+        Follower.objects.create(owner=self.reader, followed=self.author)
+        self.create_event(self.author, 'Popular')
+        self.assertFalse(TimelineEntry.objects.exists())
+
+        out = StringIO()
+        call_command('fan_in_timelines', stdout=out)
+        self.assertIn('Added 1 timeline entries', out.getvalue())
+        self.assertEqual(self.feed_titles(), ['Popular'])
+        # Already pulled, so running again copies nothing new
+        call_command('fan_in_timelines', stdout=out)
+        self.assertIn('Added 0 timeline entries', out.getvalue())
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_reading_the_feed_never_writes(self):
+        """Test a feed GET is read-only, even with high-follower accounts"""
+        Follower.objects.create(owner=self.reader, followed=self.author)
+        self.create_event(self.author, 'Popular')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.feed_titles(), [])
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in queries))
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_keyset_pages_cover_every_event_once(self):
+        """Test walking the feed's cursors returns each event once, newest first"""
+        Follower.objects.create(owner=self.reader, followed=self.author)
+        created = [self.create_event(self.author, f'Event {index}') for index in range(25)]
+
+        titles, url = [], reverse('feed')
+        while url:
+            response = self.client.get(url)
+            titles += [row['title'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(titles, [event.title for event in reversed(created)])
+
+    def test_feed_query_count_is_constant(self):
+        """Test a feed page costs the same number of queries at any size"""
+        Follower.objects.create(owner=self.reader, followed=self.author)
+        self.create_event(self.author)
+        with self.assertNumQueries(4):
+            self.client.get(reverse('feed'))
+        for index in range(8):
+            self.create_event(self.author)
+        with self.assertNumQueries(4):
+            self.client.get(reverse('feed'))
+
+    def test_feed_reads_the_timeline_index(self):
+        """Test a feed page is a range scan on the timeline index"""
+        queryset = TimelineEntry.objects.filter(owner=self.reader).order_by('-created_at', '-id')[:10]
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            self.assertIn('timeline_owner_created_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_feed_requires_login(self):
+        """Test anonymous users cannot read a feed"""
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('feed'))
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
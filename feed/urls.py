@@ -0,0 +1,7 @@
+# feed/urls.py
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('feed/', views.Feed.as_view(), name='feed'),
+]
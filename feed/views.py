@@ -0,0 +1,34 @@
+# feed/views.py
+from rest_framework import generics, permissions
+from eventify.pagination import KeysetPagination
+from events.serializers import EventSerializer
+from .models import TimelineEntry
+
+
+class FeedPagination(KeysetPagination):
+    """Newest first, keyed on the timeline's (created_at, id) index"""
+    ordering = '-created_at'
+
+
+class Feed(generics.ListAPIView):
+    """
+    Events from the accounts the current user follows, newest first.
+    """
+    serializer_class = EventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
+    filter_backends = []
+    # The page of entries with their events and the viewer's
+    # like/favorite/attendance lookups. Reads never write: high-follower
+    # accounts are pulled in by the fan_in_timelines command
+    query_budget = {'GET': 5}
+
+    def get_queryset(self):
+        return TimelineEntry.objects.filter(
+            owner=self.request.user
+        ).select_related('event__owner')
+
+    def list(self, request, *args, **kwargs):
+        entries = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer([entry.event for entry in entries], many=True)
+        return self.get_paginated_response(serializer.data)
@@ -1,6 +1,9 @@
 # followers/models.py
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from profiles.models import update_profile_counter
 
 class Follower(models.Model):
     """
@@ -24,4 +27,24 @@ class Follower(models.Model):
         unique_together = ['owner', 'followed']
 
     def __str__(self):
-        return f'{self.owner} follows {self.followed}'
\ No newline at end of file
+        return f'{self.owner} follows {self.followed}'
+
+
+def update_follow_counts(follower, delta):
+    """
+    Adjust the followed user's followers_count and the follower's
+    following_count. Both profiles' engagement_at move with them.
+    """
+    update_profile_counter(follower.followed_id, 'followers_count', delta)
+    update_profile_counter(follower.owner_id, 'following_count', delta)
+
+
+@receiver(post_save, sender=Follower)
+def follower_created(sender, instance, created, **kwargs):
+    if created:
+        update_follow_counts(instance, 1)
+
+
+@receiver(post_delete, sender=Follower)
+def follower_deleted(sender, instance, **kwargs):
+    update_follow_counts(instance, -1)
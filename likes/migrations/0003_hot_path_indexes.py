@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_hot_path_indexes'),
+        ('likes', '0002_alter_like_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='like',
+            index=models.Index(fields=['event', '-created_at'], name='like_event_created_idx'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 # likes/models.py
 from django.db import models
 from django.contrib.auth.models import User
-from events.models import Event
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from events.models import Event, update_engagement
 
 class Like(models.Model):
     """
@@ -19,6 +21,20 @@ class Like(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['owner', 'event']
+        indexes = [
+            models.Index(fields=['event', '-created_at'], name='like_event_created_idx'),
+        ]
 
     def __str__(self):
-        return f'{self.owner} liked {self.event}'
\ No newline at end of file
+        return f'{self.owner} liked {self.event}'
+
+
+@receiver(post_save, sender=Like)
+def increment_likes_count(sender, instance, created, **kwargs):
+    if created:
+        update_engagement(instance.event_id, 'likes_count', 1)
+
+
+@receiver(post_delete, sender=Like)
+def decrement_likes_count(sender, instance, **kwargs):
+    update_engagement(instance.event_id, 'likes_count', -1, instance.created_at)
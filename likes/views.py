@@ -1,11 +1,12 @@
 # likes/views.py
 from rest_framework import generics, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
+from eventify.counters import AtomicCreateMixin
 from eventify.permissions import IsOwnerOrReadOnly
 from .models import Like
 from .serializers import LikeSerializer
 
-class LikeList(generics.ListCreateAPIView):
+class LikeList(AtomicCreateMixin, generics.ListCreateAPIView):
     """
     List likes or create a like if logged in.
     Can filter by event and owner.
@@ -18,9 +19,6 @@ class LikeList(generics.ListCreateAPIView):
     ordering_fields = ['created_at']
     template_name = None
 
-    def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
-
 class LikeDetail(generics.RetrieveDestroyAPIView):
     """
     Retrieve a like or delete it by id if you own it.
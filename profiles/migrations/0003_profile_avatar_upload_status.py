@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:06
+
+import cloudinary.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_alter_profile_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_upload_status',
+            field=models.CharField(choices=[('none', 'None'), ('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='none', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='avatar',
+            field=cloudinary.models.CloudinaryField(blank=True, default='default_profile_ju9xum', max_length=255, null=True, verbose_name='avatar'),
+        ),
+    ]
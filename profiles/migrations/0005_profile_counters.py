@@ -0,0 +1,59 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:32
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Profile = apps.get_model('profiles', 'Profile')
+    Follower = apps.get_model('followers', 'Follower')
+    Event = apps.get_model('events', 'Event')
+    sources = {
+        'followers_count': (Follower, 'followed'),
+        'following_count': (Follower, 'owner'),
+        'events_count': (Event, 'owner'),
+    }
+    for field, (model, user_field) in sources.items():
+        counts = (
+            model.objects.filter(**{user_field: OuterRef('owner')})
+            .order_by()
+            .values(user_field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        Profile.objects.update(**{field: Coalesce(Subquery(counts), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_profile_avatar_variants'),
+        ('followers', '0001_initial'),
+        ('events', '0017_event_capacity_waitlist'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='events_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['followers_count', 'id'], name='profile_followers_id_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
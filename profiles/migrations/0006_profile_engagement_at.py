@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_profile_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='engagement_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
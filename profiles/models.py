@@ -1,11 +1,15 @@
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from cloudinary.models import CloudinaryField
+from eventify.counters import StoredCountersMixin
+from uploads.models import UploadStatus
 
 
-class Profile(models.Model):
+class Profile(StoredCountersMixin, models.Model):
     owner = models.OneToOneField(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -27,28 +31,46 @@ class Profile(models.Model):
             'height': 400
         }
     )
+    avatar_upload_status = models.CharField(
+        max_length=20, choices=UploadStatus.choices, default=UploadStatus.NONE
+    )
+    # Resized variant URLs written at upload time; see uploads.storage
+    avatar_variants = models.JSONField(default=dict, blank=True)
+    # Stored counters, kept in step with the follower and event tables by
+    # update_profile_counter() below
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    events_count = models.PositiveIntegerField(default=0)
+    # When a counter above last moved. updated_at only tracks the owner's
+    # edits; Last-Modified is the later of the two
+    engagement_at = models.DateTimeField(null=True, blank=True)
+    # Never written back by save(), which may hold values from before a
+    # concurrent follow
+    stored_counters = ('followers_count', 'following_count', 'events_count', 'engagement_at')
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # ?ordering=-followers_count on the profile list
+            models.Index(fields=['followers_count', 'id'], name='profile_followers_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.owner}'s profile"
-    
-    def save(self, *args, **kwargs):
-        """Override save method to handle Cloudinary avatar field"""
-        try:
-            # Call parent save method
-            super().save(*args, **kwargs)
-        except Exception as e:
-            # If error is related to Cloudinary, try to save without the image
-            if 'avatar' in str(e).lower() or 'cloudinary' in str(e).lower():
-                # Set avatar to default value
-                self.avatar = None
-                # Try saving again without triggering this custom save method
-                super(Profile, self).save(*args, **kwargs)
-            else:
-                # Re-raise other errors
-                raise
+
+
+def update_profile_counter(user_id, field, delta):
+    """
+    Atomically adjust one of a user's profile counters. Like the event
+    engagement counters, decrements never go below zero, and engagement_at
+    moves with the counts so the profile's Last-Modified stays truthful
+    without touching updated_at.
+    """
+    profiles = Profile.objects.filter(owner_id=user_id)
+    if delta < 0:
+        profiles = profiles.filter(**{f'{field}__gte': -delta})
+    profiles.update(**{field: F(field) + delta, 'engagement_at': timezone.now()})
+
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
@@ -4,26 +4,46 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Profile
 from django.dispatch import receiver
-from followers.models import Follower
+from .viewer_state import FollowingState
+from uploads.delivery import image_url
+from uploads.serializers import CloudinaryImageField, ImageVariantsField, SignedUploadMixin
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email')
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileListSerializer(serializers.ListSerializer):
+    """Resolves the viewer's follow ids for the whole page up front"""
+    def to_representation(self, data):
+        profiles = list(data.all() if hasattr(data, 'all') else data)
+        FollowingState.for_context(self.context).load(
+            profile.owner_id for profile in profiles
+        )
+        return super().to_representation(profiles)
+
+
+class ProfileSerializer(SignedUploadMixin, serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.username')
     is_owner = serializers.SerializerMethodField()
     following_id = serializers.SerializerMethodField()
-    followers_count = serializers.SerializerMethodField()
-    following_count = serializers.SerializerMethodField()
+    # Stored counters; see profiles.models.update_profile_counter
+    followers_count = serializers.ReadOnlyField()
+    following_count = serializers.ReadOnlyField()
+    events_count = serializers.ReadOnlyField()
     avatar_url = serializers.SerializerMethodField()
     # Add explicit ImageField for avatar to handle uploads
-    avatar = serializers.ImageField(required=False)
+    avatar = CloudinaryImageField(required=False)
+    # Avatars are uploaded in the background; see uploads.pipeline
+    avatar_upload_status = serializers.ReadOnlyField()
+    # Thumbnail, medium and full URLs; lists should use the thumbnail
+    avatar_variants = ImageVariantsField('avatar')
+    # Or uploaded straight to storage with /api/uploads/sign/
+    signed_upload_fields = ('avatar',)
 
     def get_avatar_url(self, obj):
         if obj.avatar and hasattr(obj.avatar, 'url'):
-            return obj.avatar.url
+            return image_url(obj.avatar)
         # If no avatar, return the default avatar URL
         return 'https://res.cloudinary.com/dpw2txejq/image/upload/default_profile_ju9xum'
 
@@ -32,24 +52,14 @@ class ProfileSerializer(serializers.ModelSerializer):
         return request.user == obj.owner
 
     def get_following_id(self, obj):
-        user = self.context['request'].user
-        if user.is_authenticated:
-            following = Follower.objects.filter(
-                owner=user, followed=obj.owner
-            ).first()
-            return following.id if following else None
-        return None
-    
-    def get_followers_count(self, obj):
-        return Follower.objects.filter(followed=obj.owner).count()
-    
-    def get_following_count(self, obj):
-        return Follower.objects.filter(owner=obj.owner).count()
-    
+        return FollowingState.for_context(self.context).get(obj)
+
     class Meta:
         model = Profile
+        list_serializer_class = ProfileListSerializer
         fields = [
             'id', 'owner', 'created_at', 'updated_at', 'name',
-            'bio', 'location', 'avatar', 'avatar_url', 'is_owner', 'following_id',
-            'followers_count', 'following_count',
+            'bio', 'location', 'avatar', 'avatar_url', 'avatar_upload_status', 'avatar_variants',
+            'is_owner', 'following_id',
+            'followers_count', 'following_count', 'events_count',
         ]
\ No newline at end of file
@@ -4,6 +4,11 @@ from .views import ProfileList
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
+from unittest import mock
+from django.db import connection
+from django.utils import timezone
+from events.models import Event
+from followers.models import Follower
 
 class ProfileTest(APITestCase):
 
@@ -44,4 +49,109 @@ class ProfileTest(APITestCase):
         url = reverse('profile-details', kwargs={'pk': self.user2.profile.pk})
         data = {'name': 'Updated Name'}
         response = self.client.patch(url, data)
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_profile_etag_returns_304(self):
+        """Test a matching If-None-Match on a profile returns a 304"""
+        url = reverse('profile-details', kwargs={'pk': self.user.profile.pk})
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_profile_if_modified_since_returns_304(self):
+        """Test an unchanged profile answers If-Modified-Since with a 304"""
+        url = reverse('profile-details', kwargs={'pk': self.user.profile.pk})
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_follow_changes_profile_etag(self):
+        """Test following a user changes their profile's ETag"""
+        url = reverse('profile-details', kwargs={'pk': self.user.profile.pk})
+        etag = self.client.get(url)['ETag']
+        Follower.objects.create(owner=self.user2, followed=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['followers_count'], 1)
+
+
+class ProfileCounterTests(APITestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'user{index}', password='pass')
+            for index in range(6)
+        ]
+
+    def profile(self, user):
+        return Profile.objects.get(owner=user)
+
+    def test_follows_maintain_counts(self):
+        """Test follow and unfollow update both users' counters"""
+        follow = Follower.objects.create(owner=self.users[0], followed=self.users[1])
+        self.assertEqual(self.profile(self.users[0]).following_count, 1)
+        self.assertEqual(self.profile(self.users[1]).followers_count, 1)
+
+        follow.delete()
+        self.assertEqual(self.profile(self.users[0]).following_count, 0)
+        self.assertEqual(self.profile(self.users[1]).followers_count, 0)
+
+    def test_stale_edit_keeps_follow_counts(self):
+        """Test a profile edit racing a follow cannot reset the counters"""
+        def follow_during_update(serializer, *field_names):
+            # The PATCH has already read the profile; a follow lands meanwhile
+            self.client.force_authenticate(user=self.users[1])
+            self.client.post(reverse('follower-list'), {'followed': self.users[0].pk})
+            self.client.force_authenticate(user=self.users[0])
+            return {}
+
+        self.client.force_authenticate(user=self.users[0])
+        url = reverse('profile-details', kwargs={'pk': self.profile(self.users[0]).pk})
+        with mock.patch('profiles.views.defer_uploads', follow_during_update):
+            response = self.client.patch(url, {'bio': 'Hello'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile = self.profile(self.users[0])
+        self.assertEqual((profile.bio, profile.followers_count), ('Hello', 1))
+
+    def test_events_maintain_count(self):
+        """Test creating and deleting events updates events_count"""
+        event = Event.objects.create(
+            owner=self.users[0], title='t', description='d',
+            date=timezone.now(), location='Leeds', category='music',
+        )
+        self.assertEqual(self.profile(self.users[0]).events_count, 1)
+        event.delete()
+        self.assertEqual(self.profile(self.users[0]).events_count, 0)
+
+    def test_list_query_count_is_constant(self):
+        """Test the profile list resolves follow ids in one batched query"""
+        viewer = self.users[0]
+        for user in self.users[1:4]:
+            Follower.objects.create(owner=viewer, followed=user)
+        self.client.force_authenticate(user=viewer)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('profile-list'))
+
+        following = {row['owner']: row['following_id'] for row in response.data['results']}
+        self.assertIsNotNone(following['user1'])
+        self.assertIsNone(following['user5'])
+
+        User.objects.create_user(username='late', password='pass')
+        with self.assertNumQueries(3):
+            self.client.get(reverse('profile-list'))
+
+    def test_order_by_followers(self):
+        """Test ?ordering=-followers_count puts the most followed first"""
+        for follower in self.users[1:4]:
+            Follower.objects.create(owner=follower, followed=self.users[5])
+        Follower.objects.create(owner=self.users[1], followed=self.users[2])
+        response = self.client.get(reverse('profile-list'), {'ordering': '-followers_count'})
+        owners = [row['owner'] for row in response.data['results']]
+        self.assertEqual(owners[:2], ['user5', 'user2'])
+
+    def test_follower_ordering_uses_index(self):
+        """Test the popularity ordering reads the index instead of sorting"""
+        queryset = Profile.objects.order_by('-followers_count')[:10]
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            self.assertIn('profile_followers_id_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
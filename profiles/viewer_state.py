@@ -0,0 +1,40 @@
+# profiles/viewer_state.py
+from followers.models import Follower
+
+
+class FollowingState:
+    """
+    Resolves the current user's follow ids for a batch of profiles in one
+    query instead of one per profile. One instance lives in the
+    serializer context for the whole request.
+    """
+    def __init__(self, user):
+        self.user = user
+        self._loaded = set()
+        self._ids = {}
+
+    @classmethod
+    def for_context(cls, context):
+        """Return the request's resolver, creating it on first use"""
+        state = context.get('following_state')
+        if state is None:
+            state = context['following_state'] = cls(context['request'].user)
+        return state
+
+    def load(self, user_ids):
+        """Fetch follow ids for any profile owners not already resolved"""
+        missing = {pk for pk in user_ids if pk not in self._loaded}
+        if not missing:
+            return
+        self._loaded |= missing
+        if not self.user.is_authenticated:
+            return
+        self._ids.update(
+            Follower.objects.filter(
+                owner=self.user, followed_id__in=missing
+            ).values_list('followed_id', 'id')
+        )
+
+    def get(self, profile):
+        self.load([profile.owner_id])
+        return self._ids.get(profile.owner_id)
@@ -1,18 +1,31 @@
 # profiles / views.py
 
-from rest_framework import generics, permissions
+from rest_framework import filters, generics, permissions
 from .models import Profile
 from .serializers import ProfileSerializer
 from eventify.permissions import IsOwnerOrReadOnly
+from eventify.conditional import ConditionalGetMixin
+from uploads.pipeline import defer_uploads, enqueue_uploads
 
 class ProfileList(generics.ListAPIView):
-    queryset = Profile.objects.all()
+    queryset = Profile.objects.select_related('owner')
     serializer_class = ProfileSerializer
+    # Count, page and the viewer's follows, plus session auth
+    query_budget = {'GET': 5}
+    filter_backends = [filters.OrderingFilter]
+    # ?ordering=-followers_count is served by profile_followers_id_idx
+    ordering_fields = ['followers_count', 'following_count', 'events_count', 'created_at']
 
-class ProfileDetail(generics.RetrieveUpdateAPIView):
+class ProfileDetail(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     permission_classes = [IsOwnerOrReadOnly]
-    queryset = Profile.objects.all()
+    queryset = Profile.objects.select_related('owner')
     serializer_class = ProfileSerializer
+    # Writes also look up the owner's events to retire their cached responses
+    query_budget = {'GET': 5, 'PUT': 9, 'PATCH': 9}
+    # The counters move engagement_at, but keep them in the ETag directly
+    validator_fields = (
+        'updated_at', 'engagement_at', 'followers_count', 'following_count', 'events_count',
+    )
     
     def perform_update(self, serializer):
         """Override to add debugging for image uploads during profile updates"""
@@ -29,8 +42,10 @@ class ProfileDetail(generics.RetrieveUpdateAPIView):
                 print(f"Avatar in request.data: {type(self.request.data['avatar'])}")
         print("===========================\n")
             
-        # Save the profile
+        # Save the profile straight away and upload the avatar in the background
+        files = defer_uploads(serializer, 'avatar')
         profile = serializer.save()
+        enqueue_uploads(profile, files)
         
         # Log the result
         print(f"Profile updated: {profile.id}, avatar: {profile.avatar}")
@@ -0,0 +1,6 @@
+from django.contrib import admin
+from .models import EventNeighbor, EventVector
+
+# Register your models here.
+admin.site.register(EventNeighbor)
+admin.site.register(EventVector)
@@ -0,0 +1,259 @@
+# recommendations/content.py
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from events.models import Event
+from .models import EventVector
+
+# Text fields an event is compared on, and how much a word in each counts
+FIELDS = {'title': 3.0, 'category': 2.0, 'location': 2.0, 'description': 1.0}
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from in is it of on or our the this to we will with you your'.split()
+)
+TOKEN = re.compile(r'[a-z0-9]{2,}')
+
+
+def dimensions():
+    return settings.RECOMMENDATIONS_CONTENT_DIMENSIONS
+
+
+def vectorize(event):
+    """
+    Unit-length float32 vector of an event's weighted word counts. Words
+    are hashed into a fixed number of buckets with a hashed sign, so no
+    vocabulary has to be kept and each event is vectorized on its own.
+    """
+    weights = Counter()
+    for field, weight in FIELDS.items():
+        for token in TOKEN.findall((getattr(event, field) or '').lower()):
+            if token not in STOP_WORDS:
+                weights[token] += weight
+
+    size = dimensions()
+    vector = np.zeros(size, dtype=np.float32)
+    for token, weight in weights.items():
+        digest = zlib.crc32(token.encode('utf-8'))
+        sign = 1.0 if digest & 0x80000000 else -1.0
+        # Sublinear, so a word repeated through a description cannot swamp the title
+        vector[digest % size] += sign * (1.0 + math.log(weight))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class ContentIndex:
+    """
+    In-memory matrix of upcoming events' vectors, one row per event.
+    Related events are a single matrix-vector product and a partial sort,
+    with past and deleted events masked out by their dates.
+
+    The arrays are allocated with spare rows and doubled when full, so
+    adding an event copies nothing in the common case. Every method holds
+    the lock while it reads or writes them.
+    """
+    def __init__(self, ids, dates, vectors):
+        self.count = len(ids)
+        capacity = max(self.count, 64)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.ids[:self.count] = ids
+        # Unused rows are undated, so they never match
+        self.dates = np.full(capacity, -np.inf)
+        self.dates[:self.count] = dates
+        self.vectors = np.zeros((capacity, dimensions()), dtype=np.float32)
+        self.vectors[:self.count] = vectors
+        self.rows = {pk: row for row, pk in enumerate(self.ids[:self.count].tolist())}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, since=None):
+        """Build the index from stored vectors of events on or after `since`"""
+        size = dimensions()
+        rows = EventVector.objects.filter(date__gte=since or timezone.now()).values_list(
+            'event_id', 'date', 'vector'
+        )
+        ids, dates, blobs = [], [], []
+        for pk, date, blob in rows.iterator(chunk_size=5000):
+            blob = bytes(blob)
+            # Vectors from a different dimension setting wait for a rebuild
+            if len(blob) == size * 4:
+                ids.append(pk)
+                dates.append(date.timestamp())
+                blobs.append(blob)
+        vectors = np.frombuffer(b''.join(blobs), dtype=np.float32).reshape(-1, size)
+        return cls(ids, dates, vectors)
+
+    def __len__(self):
+        with self._lock:
+            return len(self.rows)
+
+    def vector(self, event_id):
+        with self._lock:
+            row = self.rows.get(event_id)
+            # A copy, as upsert() may overwrite the row after the lock is released
+            return None if row is None else self.vectors[row].copy()
+
+    def _grow(self):
+        capacity = len(self.ids) * 2
+        ids = np.zeros(capacity, dtype=np.int64)
+        dates = np.full(capacity, -np.inf)
+        vectors = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+        ids[:self.count] = self.ids[:self.count]
+        dates[:self.count] = self.dates[:self.count]
+        vectors[:self.count] = self.vectors[:self.count]
+        self.ids, self.dates, self.vectors = ids, dates, vectors
+
+    def upsert(self, event_id, date, vector):
+        with self._lock:
+            row = self.rows.get(event_id)
+            if row is None:
+                if self.count == len(self.ids):
+                    self._grow()
+                row = self.count
+                self.ids[row] = event_id
+                self.count += 1
+                self.rows[event_id] = row
+            self.dates[row] = date.timestamp()
+            self.vectors[row] = vector
+
+    def remove(self, event_id):
+        with self._lock:
+            row = self.rows.get(event_id)
+            if row is not None:
+                # Rows are never moved, so an undated row is simply never a match
+                self.dates[row] = -np.inf
+
+    def nearest(self, vector, k, now, exclude=()):
+        """The k (event id, score) pairs most similar to vector, best first"""
+        with self._lock:
+            scores = self.vectors[:self.count] @ vector
+            scores[self.dates[:self.count] < now] = -np.inf
+            for event_id in exclude:
+                if event_id in self.rows:
+                    scores[self.rows[event_id]] = -np.inf
+            if len(scores) > k:
+                top = np.argpartition(-scores, k)[:k]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [
+                (int(self.ids[row]), float(scores[row]))
+                for row in top
+                if scores[row] > 0
+            ]
+
+
+_index = None
+_loaded_at = 0.0
+_reloading = False
+_index_lock = threading.Lock()
+
+
+def _reload():
+    global _index, _loaded_at, _reloading
+    try:
+        index = ContentIndex.load()
+        with _index_lock:
+            _index, _loaded_at = index, time.monotonic()
+    finally:
+        with _index_lock:
+            _reloading = False
+        connections.close_all()
+
+
+def get_index():
+    """
+    The process's index. Saves in this process update it straight away;
+    every RECOMMENDATIONS_CONTENT_TTL seconds a background thread reloads
+    it to pick up events saved by other processes, while requests keep
+    using the current one. Only the first call in a process loads it
+    inline. A local save landing during a reload may be missing from the
+    new index until the one after.
+    """
+    global _index, _loaded_at, _reloading
+    with _index_lock:
+        if _index is None:
+            _index = ContentIndex.load()
+            _loaded_at = time.monotonic()
+        elif (
+            not _reloading
+            and time.monotonic() - _loaded_at > settings.RECOMMENDATIONS_CONTENT_TTL
+        ):
+            _reloading = True
+            threading.Thread(target=_reload, name='content-index-reload', daemon=True).start()
+        return _index
+
+
+def reset_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def related_event_ids(event_id, k=None):
+    """Ids of the upcoming events most similar to an event, best first"""
+    index = get_index()
+    vector = index.vector(event_id)
+    if vector is None:
+        # Past events are not held in memory
+        blob = EventVector.objects.filter(pk=event_id).values_list('vector', flat=True).first()
+        if blob is None or len(blob) != dimensions() * 4:
+            return []
+        vector = np.frombuffer(bytes(blob), dtype=np.float32)
+    k = k or settings.RECOMMENDATIONS_RELATED
+    return [pk for pk, _ in index.nearest(vector, k, time.time(), exclude=[event_id])]
+
+
+def related_events(event_id, k=None, ids=None):
+    """
+    The related events themselves, in one query, best match first. Pass
+    ids already found by related_event_ids() to skip the search.
+    """
+    if ids is None:
+        ids = related_event_ids(event_id, k)
+    if not ids:
+        return []
+    events = Event.objects.in_bulk(ids)
+    return [events[pk] for pk in ids if pk in events]
+
+
+def store_vectors(events, batch_size=1000):
+    """Vectorize events and upsert their stored vectors"""
+    vectors = [
+        EventVector(event_id=event.pk, date=event.date, vector=vectorize(event).tobytes())
+        for event in events
+    ]
+    EventVector.objects.bulk_create(
+        vectors,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['event'],
+        update_fields=['date', 'vector'],
+    )
+    return vectors
+
+
+@receiver(post_save, sender=Event)
+def vectorize_event(sender, instance, update_fields=None, **kwargs):
+    # Counter and upload saves leave the text alone
+    if update_fields is not None and not set(update_fields) & (set(FIELDS) | {'date'}):
+        return
+    stored, = store_vectors([instance])
+    if _index is not None:
+        _index.upsert(instance.pk, instance.date, np.frombuffer(stored.vector, dtype=np.float32))
+
+
+@receiver(post_delete, sender=Event)
+def drop_event_vector(sender, instance, **kwargs):
+    # The stored vector goes with the event's row
+    if _index is not None:
+        _index.remove(instance.pk)
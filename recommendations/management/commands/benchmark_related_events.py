@@ -0,0 +1,67 @@
+# recommendations/management/commands/benchmark_related_events.py
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from recommendations.content import ContentIndex, vectorize
+
+CATEGORIES = ['music', 'tech', 'sports', 'art', 'food', 'business', 'education']
+CITIES = ['London', 'Leeds', 'Manchester', 'Bristol', 'Glasgow', 'Cardiff', 'Belfast']
+
+
+def synthetic_event(rng, vocabulary):
+    return SimpleNamespace(
+        title=' '.join(rng.choices(vocabulary, k=4)),
+        description=' '.join(rng.choices(vocabulary, k=60)),
+        category=rng.choice(CATEGORIES),
+        location=rng.choice(CITIES),
+    )
+
+
+class Command(BaseCommand):
+    help = 'Time vectorizing and related-event searches over synthetic events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--events', type=int, default=100000, help='Events in the index.',
+        )
+        parser.add_argument(
+            '--queries', type=int, default=200, help='Related-event searches to time.',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0, help='Random seed for the synthetic text.',
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [f'word{index}' for index in range(5000)]
+        count = options['events']
+
+        start = time.perf_counter()
+        vectors = np.stack([vectorize(synthetic_event(rng, vocabulary)) for _ in range(count)])
+        vectorized = time.perf_counter() - start
+        self.stdout.write(
+            f'Vectorized {count} events in {vectorized:.1f}s '
+            f'({vectorized / count * 1e6:.0f} us each), index {vectors.nbytes / 2**20:.1f} MiB'
+        )
+
+        now = time.time()
+        # Half the events are in the past and must be masked out
+        dates = now + np.where(np.arange(count) % 2, 86400.0, -86400.0)
+        index = ContentIndex(np.arange(1, count + 1), dates, vectors)
+
+        timings = []
+        for _ in range(options['queries']):
+            pk = rng.randrange(1, count + 1)
+            start = time.perf_counter()
+            index.nearest(index.vector(pk), 6, now, exclude=[pk])
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f'Related search: median {statistics.median(timings):.2f} ms, '
+            f'p95 {p95:.2f} ms, max {timings[-1]:.2f} ms'
+        )
@@ -0,0 +1,55 @@
+# recommendations/management/commands/build_event_neighbors.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recommendations.models import EventNeighbor
+from recommendations.similarity import interaction_matrix, top_neighbors
+
+
+class Command(BaseCommand):
+    help = 'Recompute each event\'s most similar events from likes, favorites, attendance and comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--neighbors',
+            type=int,
+            default=settings.RECOMMENDATIONS_NEIGHBORS,
+            help='Similar events kept per event.',
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=1024,
+            help='Events whose similarities are computed together.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of rows written per INSERT batch.',
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        matrix, event_ids = interaction_matrix()
+        self.stdout.write(
+            f'{matrix.nnz} interactions from {matrix.shape[0]} users on {matrix.shape[1]} events'
+        )
+
+        event_ids = event_ids.tolist()
+        rows = [
+            EventNeighbor(event_id=event_ids[column], neighbor_id=event_ids[neighbor], score=score)
+            for column, neighbors, scores in top_neighbors(
+                matrix, options['neighbors'], options['block_size']
+            )
+            for neighbor, score in zip(neighbors.tolist(), scores.tolist())
+        ]
+        # Readers see the old neighbors until the new set is complete
+        with transaction.atomic():
+            EventNeighbor.objects.all().delete()
+            EventNeighbor.objects.bulk_create(rows, batch_size=options['batch_size'])
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Stored {len(rows)} neighbors in {elapsed:.1f}s'))
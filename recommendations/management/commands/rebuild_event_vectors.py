@@ -0,0 +1,37 @@
+# recommendations/management/commands/rebuild_event_vectors.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from events.models import Event
+from recommendations.content import FIELDS, reset_index, store_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored text vector of every event.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of events vectorized and written per batch.',
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        batch_size = options['batch_size']
+        events = Event.objects.order_by('pk').only('pk', 'date', *FIELDS)
+        total, batch = 0, []
+        with transaction.atomic():
+            for event in events.iterator(chunk_size=batch_size):
+                batch.append(event)
+                if len(batch) == batch_size:
+                    total += len(store_vectors(batch, batch_size))
+                    batch = []
+            total += len(store_vectors(batch, batch_size))
+        # Other processes pick the new vectors up on their next reload
+        reset_index()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Stored {total} event vectors in {elapsed:.1f}s'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('events', '0017_event_capacity_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='events.event')),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbor_of', to='events.event')),
+            ],
+            options={
+                'ordering': ['event', '-score'],
+                'constraints': [models.UniqueConstraint(fields=('event', 'neighbor'), name='neighbor_event_neighbor_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-17 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0017_event_capacity_waitlist'),
+        ('recommendations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventVector',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='events.event')),
+                ('date', models.DateTimeField(db_index=True)),
+                ('vector', models.BinaryField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# recommendations/models.py
+from django.db import models
+from events.models import Event
+
+
+class EventNeighbor(models.Model):
+    """
+    One of an event's most similar events by who interacted with both,
+    written in batch by the build_event_neighbors command.
+    """
+    event = models.ForeignKey(Event, related_name='neighbors', on_delete=models.CASCADE)
+    neighbor = models.ForeignKey(Event, related_name='neighbor_of', on_delete=models.CASCADE)
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['event', '-score']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'neighbor'], name='neighbor_event_neighbor_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.neighbor_id} is like {self.event_id} ({self.score:.3f})'
+
+
+class EventVector(models.Model):
+    """
+    An event's hashed term-frequency vector over its title, description,
+    category and location, stored as raw float32 bytes. The date is
+    copied so the in-memory index can load upcoming events only.
+    """
+    event = models.OneToOneField(Event, primary_key=True, related_name='+', on_delete=models.CASCADE)
+    date = models.DateTimeField(db_index=True)
+    vector = models.BinaryField()
+
+    def __str__(self):
+        return f'Vector for {self.event_id}'
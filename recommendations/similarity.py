@@ -0,0 +1,78 @@
+# recommendations/similarity.py
+from itertools import chain
+
+import numpy as np
+from scipy import sparse
+
+from comments.models import Comment
+from events.models import EventAttendee
+from favorites.models import Favorite
+from likes.models import Like
+
+# Interaction tables and how strongly each signals interest. Repeats in
+# one table (several comments on an event) count once.
+SOURCES = {
+    'like': (Like, 1.0),
+    'favorite': (Favorite, 2.0),
+    'attendance': (EventAttendee, 3.0),
+    'comment': (Comment, 1.0),
+}
+
+
+def load_pairs(model, chunk_size=10000):
+    """(owner_id, event_id) rows of a table as an n×2 int64 array"""
+    rows = model.objects.order_by().values_list('owner_id', 'event_id').iterator(chunk_size)
+    return np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 2)
+
+
+def interaction_matrix(sources=SOURCES):
+    """
+    Build the sparse user×event interest matrix. Returns the CSR matrix
+    and the event id of each column.
+    """
+    pairs = {name: load_pairs(model) for name, (model, _) in sources.items()}
+    everything = np.concatenate(list(pairs.values()))
+    user_ids, users = np.unique(everything[:, 0], return_inverse=True)
+    event_ids, events = np.unique(everything[:, 1], return_inverse=True)
+    shape = (len(user_ids), len(event_ids))
+
+    matrix = sparse.csr_matrix(shape, dtype=np.float32)
+    start = 0
+    for name, (_, weight) in sources.items():
+        end = start + len(pairs[name])
+        source = sparse.csr_matrix(
+            (np.ones(end - start, dtype=np.float32), (users[start:end], events[start:end])),
+            shape=shape,
+        )
+        # Duplicates are summed on conversion; clamp them back to one
+        source.data[:] = weight
+        matrix = matrix + source
+        start = end
+    return matrix, event_ids
+
+
+def top_neighbors(matrix, k, block_size=1024):
+    """
+    Yield (column, neighbor columns, scores) with each event's k most
+    cosine-similar events, best first. Similarities are computed as
+    sparse products a block of events at a time, so memory stays bounded
+    by the block rather than the full event×event matrix.
+    """
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    scale = sparse.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0))
+    normalized = (matrix @ scale).tocsr()
+    by_event = normalized.T.tocsr()
+
+    for start in range(0, matrix.shape[1], block_size):
+        block = (by_event[start:start + block_size] @ normalized).tocsr()
+        for row in range(block.shape[0]):
+            column = start + row
+            lo, hi = block.indptr[row], block.indptr[row + 1]
+            neighbors, scores = block.indices[lo:hi], block.data[lo:hi]
+            keep = (neighbors != column) & (scores > 0)
+            neighbors, scores = neighbors[keep], scores[keep]
+            if len(scores) > k:
+                top = np.argpartition(-scores, k)[:k]
+                neighbors, scores = neighbors[top], scores[top]
+            order = np.lexsort((neighbors, -scores))
+            yield column, neighbors[order], scores[order]
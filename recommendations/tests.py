@@ -0,0 +1,306 @@
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from scipy import sparse
+
+from comments.models import Comment
+from events.models import Event, EventAttendee
+from favorites.models import Favorite
+from likes.models import Like
+from . import content
+from .content import ContentIndex, get_index, reset_index, vectorize
+from .models import EventNeighbor, EventVector
+from .similarity import interaction_matrix, top_neighbors
+
+
+class SimilarityTests(APITestCase):
+    def test_top_neighbors_ranks_by_cosine(self):
+        """Test neighbors are the most co-interacted events, best first"""
+        # Users 0-2 share events 0 and 1; user 2 also has event 2
+        matrix = sparse.csr_matrix(np.array([
+            [1, 1, 0, 0],
+            [1, 1, 0, 0],
+            [1, 1, 1, 0],
+            [0, 0, 0, 1],
+        ], dtype=np.float32))
+        neighbors = {
+            column: (list(found), list(scores))
+            for column, found, scores in top_neighbors(matrix, k=1, block_size=3)
+        }
+        self.assertEqual(neighbors[0][0], [1])
+        self.assertAlmostEqual(neighbors[0][1][0], 1.0, places=5)
+        self.assertEqual(neighbors[2][0], [0])
+        # Nobody else touched event 3
+        self.assertEqual(neighbors[3], ([], []))
+
+
+class RecommendationTests(APITestCase):
+    def setUp(self):
+        self.viewer = User.objects.create_user(username='viewer', password='pass')
+        self.others = [
+            User.objects.create_user(username=f'user{index}', password='pass')
+            for index in range(3)
+        ]
+        self.host = User.objects.create_user(username='host', password='pass')
+        self.events = {
+            name: self.create_event(name)
+            for name in ('jazz', 'blues', 'soul', 'chess')
+        }
+        self.client.force_authenticate(user=self.viewer)
+
+    def create_event(self, title, days=7, owner=None):
+        return Event.objects.create(
+            owner=owner or self.host, title=title, description='d',
+            date=timezone.now() + timedelta(days=days), location='Leeds', category='music',
+        )
+
+    def build(self):
+        call_command('build_event_neighbors', stdout=StringIO())
+
+    def recommended(self):
+        response = self.client.get(reverse('event-recommended'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['title'] for row in response.data]
+
+    def test_interaction_matrix_weights_each_source_once(self):
+        """Test repeat interactions in one table count once at its weight"""
+        event = self.events['jazz']
+        Like.objects.create(owner=self.viewer, event=event)
+        Comment.objects.create(owner=self.viewer, event=event, content='one')
+        Comment.objects.create(owner=self.viewer, event=event, content='two')
+        matrix, event_ids = interaction_matrix()
+        self.assertEqual(list(event_ids), [event.pk])
+        self.assertEqual(matrix.toarray().tolist(), [[2.0]])
+
+    def test_command_stores_neighbors(self):
+        """Test events shared by the same users become each other's neighbors"""
+        for user in self.others:
+            Like.objects.create(owner=user, event=self.events['jazz'])
+            Favorite.objects.create(owner=user, event=self.events['blues'])
+        Like.objects.create(owner=self.others[0], event=self.events['chess'])
+        self.build()
+
+        neighbors = EventNeighbor.objects.filter(event=self.events['jazz'])
+        self.assertEqual(neighbors.first().neighbor, self.events['blues'])
+        self.assertEqual(neighbors.count(), 2)
+
+        # Rebuilding replaces the table
+        self.build()
+        self.assertEqual(EventNeighbor.objects.filter(event=self.events['jazz']).count(), 2)
+
+    def test_recommends_similar_unseen_upcoming_events(self):
+        """Test recommendations follow neighbors and skip seen, past and own events"""
+        past = self.create_event('old jazz', days=-7)
+        own = self.create_event('my jazz', owner=self.viewer)
+        for user in self.others:
+            for name in ('jazz', 'blues'):
+                EventAttendee.objects.create(owner=user, event=self.events[name])
+            Like.objects.create(owner=user, event=past)
+            Like.objects.create(owner=user, event=own)
+        Like.objects.create(owner=self.others[0], event=self.events['soul'])
+        Like.objects.create(owner=self.viewer, event=self.events['jazz'])
+        self.build()
+
+        self.assertEqual(self.recommended(), ['blues', 'soul'])
+
+    def test_no_interactions_means_no_recommendations(self):
+        """Test a new user gets an empty list rather than an error"""
+        self.build()
+        self.assertEqual(self.recommended(), [])
+
+    def test_recommendations_query_count_is_constant(self):
+        """Test the endpoint is one lookup plus the viewer's state"""
+        for user in self.others:
+            for event in self.events.values():
+                Like.objects.create(owner=user, event=event)
+        Like.objects.create(owner=self.viewer, event=self.events['jazz'])
+        self.build()
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self.recommended()), 3)
+
+    def test_recommendations_require_login(self):
+        """Test anonymous users cannot ask for recommendations"""
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('event-recommended'))
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+
+class ContentIndexTests(SimpleTestCase):
+    def setUp(self):
+        reset_index()
+        self.addCleanup(reset_index)
+        self.tomorrow = timezone.now() + timedelta(days=1)
+
+    def unit(self, bucket):
+        vector = np.zeros(content.dimensions(), dtype=np.float32)
+        vector[bucket] = 1.0
+        return vector
+
+    def test_upserts_grow_capacity_by_doubling(self):
+        """Test adding events reuses spare rows and doubles when full"""
+        index = ContentIndex([], [], np.zeros((0, content.dimensions()), dtype=np.float32))
+        matrices = set()
+        for pk in range(1, 201):
+            index.upsert(pk, self.tomorrow, self.unit(pk % 3))
+            matrices.add(id(index.vectors))
+        self.assertEqual(len(index), 200)
+        self.assertEqual(len(index.vectors), 256)
+        # 64, 128, 256 rows: two reallocations for 200 inserts
+        self.assertEqual(len(matrices), 3)
+        self.assertEqual(index.vector(7).tolist(), self.unit(1).tolist())
+        matches = index.nearest(self.unit(1), 3, time.time())
+        self.assertTrue(all(pk % 3 == 1 for pk, _ in matches))
+
+    def test_reads_during_upserts(self):
+        """Test lookups racing inserts never see a row past the matrix"""
+        index = ContentIndex([], [], np.zeros((0, content.dimensions()), dtype=np.float32))
+        errors = []
+
+        def read():
+            for pk in range(1, 2001):
+                try:
+                    index.vector(pk)
+                    index.nearest(self.unit(0), 5, 0)
+                except Exception as exc:
+                    errors.append(exc)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for pk in range(1, 2001):
+            index.upsert(pk, self.tomorrow, self.unit(pk % 5))
+        reader.join()
+        self.assertEqual(errors, [])
+
+    @override_settings(RECOMMENDATIONS_CONTENT_TTL=0)
+    def test_expired_index_reloads_in_the_background(self):
+        """Test a request past the TTL gets the current index while a new one loads"""
+        empty = np.zeros((0, content.dimensions()), dtype=np.float32)
+        first, second = ContentIndex([], [], empty), ContentIndex([], [], empty)
+        release = threading.Event()
+
+        def slow_load(*args, **kwargs):
+            release.wait(5)
+            return second
+
+        with mock.patch.object(ContentIndex, 'load', return_value=first):
+            self.assertIs(get_index(), first)
+        with mock.patch.object(ContentIndex, 'load', side_effect=slow_load):
+            self.assertIs(get_index(), first)
+            # Still loading, so no second reload is started
+            self.assertIs(get_index(), first)
+            release.set()
+            for _ in range(100):
+                if content._index is second:
+                    break
+                time.sleep(0.01)
+        self.assertIs(content._index, second)
+
+
+class RelatedEventTests(APITestCase):
+    def setUp(self):
+        # The index is per process and would outlive each test's rows
+        reset_index()
+        self.addCleanup(reset_index)
+        self.host = User.objects.create_user(username='host', password='pass')
+
+    def create_event(self, title, description='', category='music', location='Leeds', days=7):
+        return Event.objects.create(
+            owner=self.host, title=title, description=description,
+            date=timezone.now() + timedelta(days=days), location=location, category=category,
+        )
+
+    def related(self, event):
+        response = self.client.get(reverse('event-detail', args=[event.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['title'] for row in response.data['related']]
+
+    def test_similar_text_scores_higher(self):
+        """Test events sharing words are closer than unrelated ones"""
+        jazz = vectorize(self.create_event('Jazz night', 'Live jazz trio'))
+        more_jazz = vectorize(self.create_event('Jazz brunch', 'Jazz and pancakes'))
+        coding = vectorize(self.create_event('Python workshop', 'Learn Django', category='tech', location='Bristol'))
+        self.assertEqual(jazz.dtype, np.float32)
+        self.assertAlmostEqual(float(np.linalg.norm(jazz)), 1.0, places=5)
+        self.assertGreater(jazz @ more_jazz, jazz @ coding)
+
+    def test_detail_lists_related_upcoming_events(self):
+        """Test related events are similar, upcoming and exclude the event itself"""
+        event = self.create_event('Jazz night', 'Live jazz trio in the cellar bar')
+        self.create_event('Jazz brunch', 'A jazz trio plays while you eat')
+        self.create_event('Old jazz night', 'Live jazz trio', days=-3)
+        self.create_event('Python workshop', 'Learn Django', category='tech', location='Bristol')
+        self.assertEqual(self.related(event), ['Jazz brunch'])
+
+    def test_past_events_use_their_stored_vector(self):
+        """Test a past event's page still lists upcoming related events"""
+        past = self.create_event('Jazz night', 'Live jazz trio', days=-3)
+        self.create_event('Jazz brunch', 'A jazz trio plays while you eat')
+        get_index()
+        self.assertEqual(self.related(past), ['Jazz brunch'])
+
+    def test_saves_update_the_index(self):
+        """Test edits and deletes are reflected without a rebuild"""
+        event = self.create_event('Jazz night', 'Live jazz trio')
+        other = self.create_event('Chess club', 'Bring a board', category='games', location='York')
+        get_index()
+        self.assertEqual(self.related(event), [])
+
+        other.title = 'Jazz chess club'
+        other.description = 'Chess with a jazz trio'
+        other.save()
+        self.assertEqual(self.related(event), ['Jazz chess club'])
+
+        other.delete()
+        self.assertEqual(self.related(event), [])
+
+    def test_related_changes_bust_the_etag(self):
+        """Test a new related event is not hidden behind a 304"""
+        event = self.create_event('Jazz night', 'Live jazz trio')
+        url = reverse('event-detail', args=[event.pk])
+        get_index()
+        first = self.client.get(url)
+        self.create_event('Jazz brunch', 'A jazz trio plays while you eat')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['title'] for row in response.data['related']], ['Jazz brunch'])
+        # Nothing dated changed, so If-Modified-Since alone cannot be trusted
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_counter_saves_skip_vectorizing(self):
+        """Test saves that do not touch the text leave the vector alone"""
+        event = self.create_event('Jazz night')
+        EventVector.objects.filter(pk=event.pk).update(vector=b'')
+        event.save(update_fields=['capacity'])
+        self.assertEqual(bytes(EventVector.objects.get(pk=event.pk).vector), b'')
+
+    def test_rebuild_restores_vectors(self):
+        """Test the rebuild command recreates every event's vector"""
+        events = [self.create_event(f'Jazz {index}', 'Live jazz') for index in range(3)]
+        EventVector.objects.all().delete()
+        call_command('rebuild_event_vectors', batch_size=2, stdout=StringIO())
+        self.assertEqual(EventVector.objects.count(), 3)
+        self.assertEqual(len(get_index()), 3)
+        self.assertEqual(self.related(events[0]), ['Jazz 1', 'Jazz 2'])
+
+    def test_related_costs_one_query(self):
+        """Test the related list adds a single lookup to the detail view"""
+        event = self.create_event('Jazz night', 'Live jazz trio')
+        for index in range(4):
+            self.create_event(f'Jazz {index}', 'Live jazz trio')
+        get_index()
+        # Validators, event, related events; anonymous so no viewer state
+        with self.assertNumQueries(3):
+            self.assertEqual(len(self.related(event)), 4)
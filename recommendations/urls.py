@@ -0,0 +1,7 @@
+# recommendations/urls.py
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('events/recommended/', views.RecommendedEvents.as_view(), name='event-recommended'),
+]
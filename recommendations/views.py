@@ -0,0 +1,41 @@
+# recommendations/views.py
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.utils import timezone
+from rest_framework import generics, permissions
+from events.models import Event
+from events.serializers import EventSerializer
+from .similarity import SOURCES
+
+
+def interacted_events(user):
+    """Ids of the events a user has liked, favorited, joined or commented on"""
+    interacted = Q()
+    for model, _ in SOURCES.values():
+        interacted |= Q(pk__in=model.objects.filter(owner=user).values('event_id'))
+    return Event.objects.filter(interacted).values('pk')
+
+
+class RecommendedEvents(generics.ListAPIView):
+    """
+    Upcoming events similar to the ones the current user has interacted
+    with, best match first. Scores are the summed similarity from the
+    precomputed EventNeighbor table, so this is one query over its index.
+    """
+    serializer_class = EventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+    # The recommendations, then the viewer's like/favorite/attendance ids
+    query_budget = {'GET': 5}
+
+    def get_queryset(self):
+        user = self.request.user
+        seen = interacted_events(user)
+        return (
+            Event.objects.filter(neighbor_of__event__in=seen, date__gte=timezone.now())
+            .exclude(pk__in=seen)
+            .exclude(owner=user)
+            .annotate(recommendation_score=Sum('neighbor_of__score'))
+            .select_related('owner')
+            .order_by('-recommendation_score', '-pk')[:settings.RECOMMENDATIONS_LIMIT]
+        )
@@ -0,0 +1,6 @@
+from django.contrib import admin
+from .models import Asset, UploadJob
+
+# Register your models here.
+admin.site.register(UploadJob)
+admin.site.register(Asset)
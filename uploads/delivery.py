@@ -0,0 +1,62 @@
+# uploads/delivery.py
+import json
+from functools import lru_cache
+
+import cloudinary
+import cloudinary.utils
+
+URL_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _build_url(public_id, version, image_format, upload_type, resource_type,
+               transformation, cloud_name, secure):
+    url, _ = cloudinary.utils.cloudinary_url(
+        public_id,
+        version=version,
+        format=image_format,
+        type=upload_type,
+        resource_type=resource_type,
+        **json.loads(transformation),
+    )
+    return url
+
+
+def image_url(resource, **transformation):
+    """
+    Delivery URL for a CloudinaryField value, the same string as
+    resource.build_url(**transformation). URLs are memoized per public_id,
+    version and transformation: list endpoints serialize the same handful
+    of images over and over, and building a Cloudinary URL is far more
+    work than a dict lookup. Returns None for empty values.
+    """
+    if not resource:
+        return None
+    config = cloudinary.config()
+    return _build_url(
+        resource.public_id,
+        resource.version,
+        resource.format,
+        resource.type,
+        resource.resource_type or 'image',
+        # Option values can be dicts or lists (chained transformations),
+        # so the key is their canonical JSON rather than the options
+        json.dumps({**resource.url_options, **transformation}, sort_keys=True),
+        # Part of the key so a reconfigured account never serves stale URLs
+        config.cloud_name,
+        getattr(config, 'secure', None),
+    )
+
+
+def variant_urls(resource, sizes):
+    """{name: url} of fill-cropped transformations for each (width, height)"""
+    if not resource:
+        return {}
+    return {
+        name: image_url(resource, crop='fill', width=width, height=height)
+        for name, (width, height) in sizes.items()
+    }
+
+
+def url_cache_info():
+    return _build_url.cache_info()
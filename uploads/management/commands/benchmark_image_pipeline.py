@@ -0,0 +1,73 @@
+# uploads/management/commands/benchmark_image_pipeline.py
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from events.models import Event
+from PIL import Image, ImageOps
+from uploads.processing import prepare_image, target_size
+
+
+def phone_photo(path, size):
+    """Write a noisy JPEG with EXIF orientation, like a camera upload"""
+    image = Image.effect_noise(size, 64).convert('RGB')
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 CW
+    exif[0x010F] = 'Benchmark'  # Make
+    image.save(path, format='JPEG', quality=92, exif=exif)
+
+
+def full_decode(path, size):
+    """The naive path: decode at full size, then resize"""
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image)
+        image = ImageOps.fit(image.convert('RGB'), size, Image.Resampling.LANCZOS)
+        fd, output = tempfile.mkstemp(suffix='.jpg', dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as out:
+            image.save(out, format='JPEG', quality=92)
+    return output
+
+
+class Command(BaseCommand):
+    help = 'Compare upload size and processing time for raw and preprocessed covers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--width', type=int, default=4032, help='Source image width.',
+        )
+        parser.add_argument(
+            '--height', type=int, default=3024, help='Source image height.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5, help='Runs per variant.',
+        )
+
+    def handle(self, *args, **options):
+        size = target_size(Event._meta.get_field('cover'))
+        workdir = tempfile.mkdtemp()
+        try:
+            source = os.path.join(workdir, 'source.jpg')
+            phone_photo(source, (options['width'], options['height']))
+            self.stdout.write(
+                f"Source {options['width']}x{options['height']} JPEG, target {size[0]}x{size[1]}"
+            )
+            self.report('raw upload', os.path.getsize(source), 0.0)
+            for label, run in (
+                ('full decode', lambda: full_decode(source, size)),
+                ('draft + webp', lambda: prepare_image(source, size)),
+            ):
+                elapsed = []
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    output = run()
+                    elapsed.append(time.perf_counter() - start)
+                    nbytes = os.path.getsize(output)
+                    os.remove(output)
+                self.report(label, nbytes, min(elapsed))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def report(self, label, nbytes, seconds):
+        self.stdout.write(f'{label:<14} {nbytes / 1024:>9.1f} KiB {seconds * 1000:>9.1f} ms')
@@ -0,0 +1,32 @@
+# uploads/management/commands/process_uploads.py
+import time
+
+from django.core.management.base import BaseCommand
+from uploads.pipeline import process_pending
+
+
+class Command(BaseCommand):
+    help = 'Upload spooled cover and avatar images to storage, requeueing stalled jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_pending(limit=50)
+            if processed:
+                self.stdout.write(f'Processed {processed} upload jobs')
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['interval'])
@@ -0,0 +1,74 @@
+# uploads/models.py
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class UploadStatus(models.TextChoices):
+    """Upload state shown on models with a deferred image field"""
+    NONE = 'none', 'None'
+    PENDING = 'pending', 'Pending'
+    DONE = 'done', 'Done'
+    FAILED = 'failed', 'Failed'
+
+
+class UploadJob(models.Model):
+    """
+    An image spooled to local disk by a request, waiting for a background
+    worker to send it to storage and set it on `field_name` of the target
+    object.
+    """
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    field_name = models.CharField(max_length=50)
+    spool_path = models.CharField(max_length=500)
+    # SHA-256 of the file as uploaded, before any processing
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # Pending jobs that failed wait until this time before another attempt
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='uploadjob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.content_type.model} {self.object_id} {self.field_name} ({self.status})'
+
+
+class Asset(models.Model):
+    """
+    An image already in storage, keyed by the SHA-256 of the file the user
+    uploaded and the image field it was processed for (`kind`, e.g.
+    'cover'). Uploading the same file again reuses the stored value and
+    variants instead of uploading and resizing it a second time.
+    """
+    sha256 = models.CharField(max_length=64)
+    kind = models.CharField(max_length=50)
+    value = models.CharField(max_length=255)
+    variants = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['sha256', 'kind'], name='asset_sha256_kind_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.sha256[:12]}'
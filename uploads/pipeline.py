@@ -0,0 +1,292 @@
+# uploads/pipeline.py
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Asset, UploadJob, UploadStatus
+from .processing import prepare_upload
+from .resilience import StorageUnavailable
+from .storage import get_backend
+
+logger = logging.getLogger('eventify.uploads')
+
+_executor = None
+
+
+def status_field(field_name):
+    return f'{field_name}_upload_status'
+
+
+def variants_field(field_name):
+    return f'{field_name}_variants'
+
+
+def build_variants(value, field):
+    """Variant URLs for a stored image; failures leave the field without them"""
+    try:
+        return get_backend().variants(value, field)
+    except (OSError, ValueError, StorageUnavailable) as exc:
+        logger.warning('Could not build %s variants for %s: %s', field.name, value, exc)
+        return {}
+
+
+def defer_uploads(serializer, *field_names):
+    """
+    Take uploaded files out of a serializer's validated data so that
+    save() does not send them to storage on the request thread. Each file
+    is spooled to disk and hashed; a file already in the Asset table is
+    put back as its stored value, so save() attaches it directly.
+    Returns the remaining spooled files for enqueue_uploads(); their
+    status is set to pending so save() records it with the rest.
+    """
+    spooled = {}
+    for name in field_names:
+        uploaded = serializer.validated_data.get(name)
+        # Signed direct uploads arrive as an already stored resource
+        if not isinstance(uploaded, UploadedFile):
+            continue
+        path, digest = spool(uploaded)
+        asset = Asset.objects.filter(sha256=digest, kind=name).first()
+        if asset is None:
+            serializer.validated_data.pop(name)
+            serializer.validated_data[status_field(name)] = UploadStatus.PENDING
+            spooled[name] = (path, digest)
+            continue
+        # Seen this exact file before: no upload, no resizing
+        os.remove(path)
+        serializer.validated_data.update({
+            name: asset.value,
+            status_field(name): UploadStatus.DONE,
+            variants_field(name): asset.variants,
+        })
+    return spooled
+
+
+def enqueue_uploads(instance, spooled):
+    """Queue a job to upload each spooled file"""
+    for field_name, (path, digest) in spooled.items():
+        enqueue_upload(instance, field_name, path, digest)
+
+
+def spool(uploaded):
+    """
+    Copy an uploaded file to the spool directory in chunks, hashing it on
+    the way. Returns the spooled path and the file's SHA-256 hex digest.
+    """
+    spool_dir = Path(settings.UPLOADS_SPOOL_DIR)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    suffix = Path(uploaded.name or '').suffix.lower()
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=spool_dir)
+    digest = hashlib.sha256()
+    with os.fdopen(fd, 'wb') as spooled:
+        for chunk in uploaded.chunks():
+            digest.update(chunk)
+            spooled.write(chunk)
+    return path, digest.hexdigest()
+
+
+def set_upload_status(instance, field_name, status):
+    """
+    Record an upload's progress on its object. save() rather than
+    update(), like attach(), so updated_at moves and the cache receivers
+    retire responses still showing the old status.
+    """
+    setattr(instance, status_field(field_name), status)
+    instance.save(update_fields=[status_field(field_name), 'updated_at'])
+
+
+def attach(instance, field_name, value, variants):
+    """Set a stored image on its object and mark the upload done"""
+    setattr(instance, field_name, value)
+    setattr(instance, status_field(field_name), UploadStatus.DONE)
+    setattr(instance, variants_field(field_name), variants)
+    # save() rather than update() so cache and search receivers see it
+    instance.save(update_fields=[
+        field_name, status_field(field_name), variants_field(field_name), 'updated_at'
+    ])
+
+
+def enqueue_upload(instance, field_name, path, digest=''):
+    """
+    Queue a job to upload a spooled file to an object that was saved with
+    the field's status already pending, see defer_uploads()
+    """
+    job = UploadJob.objects.create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        field_name=field_name,
+        spool_path=path,
+        sha256=digest,
+    )
+    if settings.UPLOADS_WORKER_THREADS:
+        transaction.on_commit(lambda: get_executor().submit(run_job, job.pk))
+    return job
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.UPLOADS_WORKER_THREADS,
+            thread_name_prefix='uploads',
+        )
+    return _executor
+
+
+def run_job(job_id):
+    """Executor entry point; worker threads manage their own connections"""
+    close_old_connections()
+    try:
+        process_job(job_id)
+    except StorageUnavailable:
+        logger.info('Upload job %s left queued while storage is unavailable', job_id)
+    except Exception:
+        logger.exception('Upload job %s crashed', job_id)
+    finally:
+        close_old_connections()
+
+
+def claim(job_id):
+    """Move a pending job to processing; False if another worker has it"""
+    return UploadJob.objects.filter(pk=job_id, status=UploadJob.PENDING).update(
+        status=UploadJob.PROCESSING, updated_at=timezone.now()
+    ) == 1
+
+
+def retry_later(job, delay):
+    """
+    Put a job back in the queue for another go in `delay` seconds. Worker
+    threads resubmit it themselves; otherwise process_uploads picks it up
+    once it is due.
+    """
+    job.status = UploadJob.PENDING
+    job.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    job.save(update_fields=['status', 'attempts', 'error', 'next_attempt_at', 'updated_at'])
+    if settings.UPLOADS_WORKER_THREADS:
+        timer = threading.Timer(delay, lambda: get_executor().submit(run_job, job.pk))
+        timer.daemon = True
+        timer.start()
+
+
+def process_job(job_id):
+    if not claim(job_id):
+        return
+    job = UploadJob.objects.select_related('content_type').get(pk=job_id)
+    model = job.content_type.model_class()
+    upload_path = job.spool_path
+    target = None
+    try:
+        target = model.objects.filter(pk=job.object_id).first()
+        if target is None:
+            # The object was deleted while the upload was queued
+            finish(job, UploadJob.DONE)
+            return
+
+        asset = job.sha256 and Asset.objects.filter(sha256=job.sha256, kind=job.field_name).first()
+        if asset:
+            # An identical file finished uploading while this job was queued
+            attach(target, job.field_name, asset.value, asset.variants)
+            finish(job, UploadJob.DONE)
+            return
+
+        field = model._meta.get_field(job.field_name)
+        # Downscale and re-encode before the bytes leave the machine
+        upload_path = prepare_upload(job.spool_path, field)
+        value = get_backend().upload(upload_path, field)
+        variants = build_variants(value, field)
+        attach(target, job.field_name, value, variants)
+        if job.sha256:
+            remember_asset(job.sha256, job.field_name, value, variants)
+        finish(job, UploadJob.DONE)
+    except StorageUnavailable:
+        # Not an attempt: storage was never called. The object keeps its
+        # default image until the breaker lets uploads through again
+        retry_later(job, settings.UPLOADS_BREAKER_RESET)
+        raise
+    except Exception as exc:
+        job.attempts += 1
+        job.error = str(exc)
+        if job.attempts < settings.UPLOADS_MAX_ATTEMPTS:
+            delay = settings.UPLOADS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            retry_later(job, delay)
+            logger.warning('Upload job %s failed, will retry in %ss: %s', job.pk, delay, exc)
+            return
+        target = target or model.objects.filter(pk=job.object_id).first()
+        if target is not None:
+            set_upload_status(target, job.field_name, UploadStatus.FAILED)
+        finish(job, UploadJob.FAILED)
+        logger.error('Upload job %s gave up after %s attempts: %s', job.pk, job.attempts, exc)
+    finally:
+        if upload_path != job.spool_path and os.path.exists(upload_path):
+            os.remove(upload_path)
+
+
+def remember_asset(sha256, kind, value, variants):
+    try:
+        with transaction.atomic():
+            Asset.objects.create(sha256=sha256, kind=kind, value=value, variants=variants)
+    except IntegrityError:
+        # Another worker stored the same file first; either copy will do
+        pass
+
+
+def finish(job, status):
+    job.status = status
+    job.save(update_fields=['status', 'attempts', 'error', 'updated_at'])
+    try:
+        os.remove(job.spool_path)
+    except FileNotFoundError:
+        pass
+
+
+def reclaim_stale():
+    """
+    Requeue jobs left in processing by a worker that died mid-upload, as
+    a failed attempt. Returns the number of jobs requeued.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.UPLOADS_STALE_AFTER)
+    return UploadJob.objects.filter(status=UploadJob.PROCESSING, updated_at__lt=cutoff).update(
+        status=UploadJob.PENDING,
+        attempts=F('attempts') + 1,
+        error='Worker stopped while processing',
+        next_attempt_at=None,
+        updated_at=timezone.now(),
+    )
+
+
+def process_pending(limit=None):
+    """
+    Requeue stale jobs, then run due jobs on this thread, oldest first.
+    Stops early while the storage circuit breaker is open. Returns the
+    number of jobs run.
+    """
+    reclaimed = reclaim_stale()
+    if reclaimed:
+        logger.warning('Requeued %s upload jobs left in processing', reclaimed)
+    job_ids = UploadJob.objects.filter(
+        Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=timezone.now()),
+        status=UploadJob.PENDING,
+    ).values_list('pk', flat=True)
+    if limit:
+        job_ids = job_ids[:limit]
+    processed = 0
+    for job_id in list(job_ids):
+        try:
+            process_job(job_id)
+        except StorageUnavailable:
+            logger.info('Storage unavailable, leaving remaining upload jobs queued')
+            break
+        processed += 1
+    return processed
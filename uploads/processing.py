@@ -0,0 +1,84 @@
+# uploads/processing.py
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+logger = logging.getLogger('eventify.uploads')
+
+EXTENSIONS = {'WEBP': '.webp', 'JPEG': '.jpg'}
+
+
+def target_size(field):
+    """
+    The (width, height) a field's Cloudinary transformation crops to, or
+    None if it does not resize.
+    """
+    transformation = field.options.get('transformation') or {}
+    if isinstance(transformation, list):
+        transformation = transformation[0] if transformation else {}
+    width, height = transformation.get('width'), transformation.get('height')
+    if width and height:
+        return int(width), int(height)
+    return None
+
+
+def fit_size(image_size, size):
+    """
+    `size`, scaled down until it fits inside `image_size`, so fitting to
+    it crops to the target's aspect ratio without upscaling
+    """
+    scale = min(1.0, image_size[0] / size[0], image_size[1] / size[1])
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def prepare_image(path, size, image_format=None, quality=None):
+    """
+    Downscale an image file to `size` with the same centre crop as
+    Cloudinary's crop=fill, drop EXIF/ICC metadata and re-encode it.
+    Images smaller than `size` are only cropped to its shape, never
+    enlarged; storage can scale them on delivery without baking the
+    blur into the file.
+
+    JPEGs are decoded in draft mode, which lets libjpeg scale by 1/2 to
+    1/8 while decoding, so a 12MP phone photo never reaches full size in
+    memory. Returns the path of a new file next to the original.
+    """
+    image_format = image_format or settings.UPLOADS_IMAGE_FORMAT
+    quality = quality or settings.UPLOADS_IMAGE_QUALITY
+    with Image.open(path) as image:
+        # Ask for the longer side in both directions so the draft still
+        # covers the crop whichever way EXIF rotates the image
+        longest = max(size)
+        image.draft('RGB', (longest, longest))
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        mode = 'RGBA' if has_alpha and image_format == 'WEBP' else 'RGB'
+        image = ImageOps.fit(
+            image.convert(mode), fit_size(image.size, size), Image.Resampling.LANCZOS
+        )
+
+        fd, output = tempfile.mkstemp(
+            suffix=EXTENSIONS[image_format], dir=os.path.dirname(path)
+        )
+        with os.fdopen(fd, 'wb') as out:
+            # No exif/icc_profile arguments, so no metadata is written
+            image.save(out, format=image_format, quality=quality, optimize=True)
+    return output
+
+
+def prepare_upload(path, field):
+    """
+    Run the preprocessing stage for a spooled upload. Returns the file to
+    send to storage; files Pillow cannot read are sent unchanged.
+    """
+    size = target_size(field)
+    if size is None:
+        return path
+    try:
+        return prepare_image(path, size)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning('Could not preprocess %s, uploading as-is: %s', path, exc)
+        return path
@@ -0,0 +1,125 @@
+# uploads/resilience.py
+import logging
+import threading
+import time
+
+logger = logging.getLogger('eventify.uploads')
+
+
+class StorageUnavailable(Exception):
+    """Raised without calling storage while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `reset_after` seconds. After that one trial call is let through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold, reset_after, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_after:
+                self.state = self.HALF_OPEN
+                return
+            # Open, or half-open with the trial call still running
+            raise StorageUnavailable('Storage circuit breaker is open')
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning('Storage circuit breaker opened after %s failures', self.failures)
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+
+def is_timeout(exc):
+    # Cloudinary wraps socket errors in its own Error, so check the text too
+    return isinstance(exc, TimeoutError) or 'timeout' in repr(exc).lower()
+
+
+class ResilientBackend:
+    """
+    Wraps a storage backend's network calls (upload, variants) in a
+    circuit breaker and keeps per-process call metrics. Signing and
+    verification are local and pass straight through.
+    """
+    guarded = ('upload', 'variants')
+
+    def __init__(self, backend, breaker):
+        self.backend = backend
+        self.breaker = breaker
+        self._lock = threading.Lock()
+        self.metrics = {
+            'calls': 0, 'failures': 0, 'timeouts': 0, 'rejected': 0,
+            'total_ms': 0.0, 'max_ms': 0.0,
+        }
+
+    def __getattr__(self, name):
+        attr = getattr(self.backend, name)
+        if name not in self.guarded:
+            return attr
+
+        def call(*args, **kwargs):
+            return self.call(attr, *args, **kwargs)
+        return call
+
+    def call(self, method, *args, **kwargs):
+        try:
+            self.breaker.before_call()
+        except StorageUnavailable:
+            self.count(rejected=1)
+            raise
+
+        start = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception as exc:
+            self.breaker.record_failure()
+            self.count(start, failures=1, timeouts=int(is_timeout(exc)))
+            raise
+        self.breaker.record_success()
+        self.count(start)
+        return result
+
+    def count(self, start=None, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self.metrics[name] += value
+            if start is not None:
+                elapsed = (time.perf_counter() - start) * 1000
+                self.metrics['calls'] += 1
+                self.metrics['total_ms'] += elapsed
+                self.metrics['max_ms'] = max(self.metrics['max_ms'], elapsed)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.metrics)
+        calls = stats['calls']
+        stats['avg_ms'] = round(stats['total_ms'] / calls, 2) if calls else None
+        stats['total_ms'] = round(stats['total_ms'], 2)
+        stats['max_ms'] = round(stats['max_ms'], 2)
+        stats['breaker'] = self.breaker.state
+        stats['backend'] = type(self.backend).__name__
+        return stats
@@ -0,0 +1,126 @@
+# uploads/serializers.py
+from cloudinary import CloudinaryResource
+from rest_framework import serializers
+
+from .delivery import image_url, variant_urls
+from .models import UploadStatus
+from .pipeline import build_variants, status_field, variants_field
+from .storage import get_backend, upload_format, variant_sizes
+
+
+class CloudinaryImageField(serializers.ImageField):
+    """
+    ImageField for a CloudinaryField: accepts uploads as usual and renders
+    the memoized delivery URL instead of building it for every row.
+    """
+    def to_representation(self, value):
+        if isinstance(value, str):
+            # Not yet reloaded from the database, e.g. straight after create
+            value = self.parent.Meta.model._meta.get_field(self.source).to_python(value)
+        return image_url(value)
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Read-only {name: url} map of an image's resized variants. Uses the
+    URLs stored at upload time; images that predate them, such as the
+    default cover, get Cloudinary transformation URLs instead.
+    """
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        stored = getattr(instance, variants_field(self.image_field))
+        if stored:
+            return stored
+        field = type(instance)._meta.get_field(self.image_field)
+        resource = field.to_python(getattr(instance, self.image_field))
+        return variant_urls(resource, variant_sizes(field))
+
+
+class SignUploadSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=['cover', 'avatar'])
+
+
+class SignedUploadMixin:
+    """
+    Lets a ModelSerializer accept an image the client uploaded straight to
+    storage. For each name in `signed_upload_fields` it adds write-only
+    <name>_public_id, <name>_version and <name>_signature fields; the
+    signature storage returned with the upload is checked before the
+    resulting resource is written to the model field. Storage only signs
+    the public_id and version, so nothing else is taken from the client:
+    the format is the one fixed by the signed upload parameters.
+    """
+    # Storage response values the client might send that are not signed
+    unsigned_parts = ('format',)
+    signed_upload_fields = ()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.signed_upload_fields:
+            fields[f'{name}_public_id'] = serializers.CharField(
+                write_only=True, required=False, max_length=200
+            )
+            fields[f'{name}_version'] = serializers.IntegerField(
+                write_only=True, required=False, min_value=1
+            )
+            fields[f'{name}_signature'] = serializers.CharField(
+                write_only=True, required=False, max_length=128
+            )
+        return fields
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        for name in self.signed_upload_fields:
+            signed = {
+                part: attrs.pop(f'{name}_{part}', None)
+                for part in ('public_id', 'version', 'signature')
+            }
+            if signed['public_id'] is None:
+                continue
+            attrs[name] = self.verify_signed_upload(name, signed, attrs)
+            attrs[status_field(name)] = UploadStatus.DONE
+            attrs[variants_field(name)] = build_variants(
+                attrs[name], self.Meta.model._meta.get_field(name)
+            )
+        return attrs
+
+    def verify_signed_upload(self, name, signed, attrs):
+        if attrs.get(name):
+            raise serializers.ValidationError(
+                {name: f'Send either a file or {name}_public_id, not both.'}
+            )
+        unsigned = [part for part in self.unsigned_parts if f'{name}_{part}' in self.initial_data]
+        if unsigned:
+            raise serializers.ValidationError(
+                {f'{name}_{part}': 'Not covered by the upload signature.' for part in unsigned}
+            )
+        missing = [part for part in ('version', 'signature') if signed[part] is None]
+        if missing:
+            raise serializers.ValidationError(
+                {f'{name}_{part}': 'This field is required.' for part in missing}
+            )
+
+        field = self.Meta.model._meta.get_field(name)
+        folder = field.options.get('folder')
+        if folder and not signed['public_id'].startswith(f'{folder}/'):
+            raise serializers.ValidationError(
+                {f'{name}_public_id': f'Uploads for {name} must be in the {folder} folder.'}
+            )
+        if not get_backend().verify(signed['public_id'], signed['version'], signed['signature']):
+            raise serializers.ValidationError(
+                {f'{name}_signature': 'Upload signature does not match.'}
+            )
+
+        resource = CloudinaryResource(
+            signed['public_id'],
+            format=upload_format(),
+            version=signed['version'],
+            type=field.type,
+            # resource_type='auto' is only meaningful when uploading
+            resource_type='image' if field.resource_type == 'auto' else field.resource_type,
+        )
+        return resource.get_prep_value()
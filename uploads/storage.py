@@ -0,0 +1,198 @@
+# uploads/storage.py
+import hashlib
+import hmac
+import os
+import random
+import shutil
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+import cloudinary
+import cloudinary.uploader
+import cloudinary.utils
+from django.conf import settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from urllib3 import Timeout
+
+from .delivery import variant_urls
+from .processing import EXTENSIONS, prepare_image
+from .resilience import CircuitBreaker, ResilientBackend
+
+
+def upload_format():
+    """The format signed direct uploads are converted to on arrival"""
+    return EXTENSIONS[settings.UPLOADS_IMAGE_FORMAT].lstrip('.')
+
+
+def upload_params(field):
+    """
+    The parameters a signed direct upload for this field is bound to. The
+    format is among them so the server never takes it from the client.
+    """
+    params = {'timestamp': int(time.time()), 'format': upload_format()}
+    if field.options.get('folder'):
+        params['folder'] = field.options['folder']
+    return params
+
+
+def variant_sizes(field):
+    """The {name: (width, height)} variants configured for a field"""
+    return settings.UPLOADS_IMAGE_VARIANTS.get(field.name, {})
+
+
+def variant_transformations(field):
+    return [
+        {'crop': 'fill', 'width': width, 'height': height}
+        for width, height in variant_sizes(field).values()
+    ]
+
+
+class CloudinaryBackend:
+    """
+    Uploads through the Cloudinary API with the same options the model's
+    CloudinaryField would use (folder, transformation, resource type).
+    """
+    def upload(self, path, field):
+        options = {
+            'type': field.type,
+            'resource_type': field.resource_type,
+            'timeout': Timeout(
+                connect=settings.UPLOADS_CONNECT_TIMEOUT, read=settings.UPLOADS_READ_TIMEOUT
+            ),
+        }
+        options.update(field.options)
+        if variant_sizes(field):
+            # Generate the variants now rather than on the first request
+            options['eager'] = variant_transformations(field)
+        resource = cloudinary.uploader.upload_resource(path, **options)
+        return resource.get_prep_value()
+
+    def variants(self, value, field):
+        """URLs of the eager transformations requested at upload time"""
+        return variant_urls(field.to_python(value), variant_sizes(field))
+
+    def sign_upload(self, field):
+        """
+        Parameters for a browser to POST a file straight to Cloudinary.
+        Cloudinary rejects signed requests older than an hour.
+        """
+        config = cloudinary.config()
+        params = upload_params(field)
+        if field.options.get('transformation'):
+            # Applied by Cloudinary on arrival, like the worker's resize
+            params['transformation'] = cloudinary.utils.generate_transformation_string(
+                **field.options['transformation']
+            )[0]
+        if variant_sizes(field):
+            params['eager'] = '|'.join(
+                cloudinary.utils.generate_transformation_string(**transformation)[0]
+                for transformation in variant_transformations(field)
+            )
+        params['signature'] = cloudinary.utils.api_sign_request(params, config.api_secret)
+        params['api_key'] = config.api_key
+        url = cloudinary.utils.cloudinary_api_url('upload', resource_type=field.resource_type)
+        return {'url': url, 'fields': params}
+
+    def verify(self, public_id, version, signature):
+        """Check the signature Cloudinary returned with an upload response"""
+        return cloudinary.utils.verify_api_response_signature(public_id, version, signature)
+
+
+class FakeBackend:
+    """
+    Stores uploads under settings.UPLOADS_FAKE_ROOT and returns values in
+    the same format CloudinaryField stores, so the worker can run locally
+    and in tests without network access.
+
+    UPLOADS_FAKE_LATENCY and UPLOADS_FAKE_ERROR_RATE slow down and fail a
+    share of uploads, to exercise timeouts and the circuit breaker. A
+    latency past UPLOADS_READ_TIMEOUT raises TimeoutError like a socket.
+    """
+    def __init__(self, root=None):
+        self._root = root
+
+    @property
+    def root(self):
+        # Read lazily: get_backend() caches instances across settings changes
+        return Path(self._root or settings.UPLOADS_FAKE_ROOT)
+
+    def upload(self, path, field):
+        self.simulate_network()
+        path = Path(path)
+        with path.open('rb') as source:
+            public_id, version = self.store(source, field.options.get('folder', ''), path.suffix)
+        return f'image/upload/v{version}/{public_id}{path.suffix}'
+
+    def simulate_network(self):
+        latency = settings.UPLOADS_FAKE_LATENCY
+        if latency:
+            time.sleep(min(latency, settings.UPLOADS_READ_TIMEOUT))
+            if latency > settings.UPLOADS_READ_TIMEOUT:
+                raise TimeoutError('Read timed out')
+        if random.random() < settings.UPLOADS_FAKE_ERROR_RATE:
+            raise ConnectionError('Injected storage error')
+
+    def store(self, source, folder, suffix):
+        public_id = '/'.join(part for part in (folder, uuid.uuid4().hex) if part)
+        destination = self.root / f'{public_id}{suffix}'
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with destination.open('wb') as out:
+            shutil.copyfileobj(source, out)
+        return public_id, int(time.time())
+
+    def variants(self, value, field):
+        """
+        Resize the stored file to each configured size with Pillow and
+        write the results beside it, served from UPLOADS_FAKE_URL.
+        """
+        resource = field.to_python(value)
+        source = self.root / f'{resource.public_id}.{resource.format}'
+        if not source.exists():
+            return {}
+        suffix = EXTENSIONS[settings.UPLOADS_IMAGE_FORMAT]
+        urls = {}
+        for name, size in variant_sizes(field).items():
+            variant_id = f'{resource.public_id}_{name}'
+            os.replace(prepare_image(source, size), self.root / f'{variant_id}{suffix}')
+            urls[name] = f'{settings.UPLOADS_FAKE_URL}{variant_id}{suffix}'
+        return urls
+
+    def sign(self, params):
+        # Same canonical form as Cloudinary's api_sign_request, with HMAC
+        message = '&'.join(f'{key}={params[key]}' for key in sorted(params) if params[key])
+        return hmac.new(
+            settings.SECRET_KEY.encode('utf-8'), message.encode('utf-8'), hashlib.sha256
+        ).hexdigest()
+
+    def sign_upload(self, field):
+        params = upload_params(field)
+        params['signature'] = self.sign(params)
+        return {'url': reverse('fake-storage-upload'), 'fields': params}
+
+    def verify(self, public_id, version, signature):
+        expected = self.sign({'public_id': public_id, 'version': version})
+        return hmac.compare_digest(expected, str(signature))
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    breaker = CircuitBreaker(
+        settings.UPLOADS_BREAKER_THRESHOLD, settings.UPLOADS_BREAKER_RESET
+    )
+    return ResilientBackend(import_string(path)(), breaker)
+
+
+def get_backend():
+    """
+    Return the storage backend named by settings.UPLOADS_BACKEND, wrapped
+    in a circuit breaker. One instance, and so one breaker, per process.
+    """
+    return _load_backend(settings.UPLOADS_BACKEND)
+
+
+def reset_backends():
+    """Forget loaded backends, with their breaker state and metrics"""
+    _load_backend.cache_clear()
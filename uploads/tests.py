@@ -0,0 +1,543 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from events.models import Event
+from .delivery import image_url, url_cache_info
+from .models import Asset, UploadJob
+from .pipeline import process_pending, run_job, spool
+from .resilience import CircuitBreaker, StorageUnavailable
+from .storage import get_backend, reset_backends
+from .processing import prepare_image, prepare_upload
+
+
+class FailingBackend:
+    def upload(self, path, field):
+        raise ConnectionError('storage unavailable')
+
+
+def make_image(name='cover.jpg', size=(120, 90), **save_options):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color='blue').save(buffer, format='JPEG', **save_options)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class UploadTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        overrides = override_settings(
+            UPLOADS_BACKEND='uploads.storage.FakeBackend',
+            UPLOADS_SPOOL_DIR=os.path.join(self.tmp, 'spool'),
+            UPLOADS_FAKE_ROOT=os.path.join(self.tmp, 'storage'),
+            UPLOADS_WORKER_THREADS=0,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        # Breaker state and metrics live with the loaded backend
+        reset_backends()
+        self.addCleanup(reset_backends)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+    def _create_event(self, **extra):
+        data = {
+            'title': 'New Event',
+            'description': 'New Description',
+            'date': (timezone.now() + timedelta(days=7)).isoformat(),
+            'location': 'Leeds',
+            'category': 'music',
+            'price': 15.00,
+        }
+        data.update(extra)
+        return self.client.post(reverse('event-list'), data, format='multipart')
+
+
+class DeferredUploadTests(UploadTestCase):
+    def test_create_returns_before_upload(self):
+        """Test the event is saved at once and the cover queued"""
+        response = self._create_event(cover=make_image())
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['cover_upload_status'], 'pending')
+
+        job = UploadJob.objects.get()
+        self.assertEqual(job.field_name, 'cover')
+        self.assertTrue(os.path.exists(job.spool_path))
+        self.assertEqual(str(Event.objects.get().cover), 'default_post_o0lbny')
+
+    def test_worker_sets_cover_and_cleans_spool(self):
+        """Test the worker uploads the file and updates the event"""
+        self._create_event(cover=make_image())
+        job = UploadJob.objects.get()
+        self.assertEqual(process_pending(), 1)
+
+        event = Event.objects.get()
+        self.assertEqual(event.cover_upload_status, 'done')
+        self.assertTrue(event.cover.public_id.startswith('events/'))
+        self.assertFalse(os.path.exists(job.spool_path))
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.DONE)
+
+    def test_create_without_cover_queues_nothing(self):
+        """Test events without a cover skip the pipeline"""
+        response = self._create_event()
+        self.assertEqual(response.data['cover_upload_status'], 'none')
+        self.assertFalse(UploadJob.objects.exists())
+
+    def test_avatar_update_is_deferred(self):
+        """Test profile avatars go through the same pipeline"""
+        url = reverse('profile-details', kwargs={'pk': self.user.profile.pk})
+        response = self.client.patch(url, {'avatar': make_image('me.jpg')}, format='multipart')
+        self.assertEqual(response.data['avatar_upload_status'], 'pending')
+        process_pending()
+        self.user.profile.refresh_from_db()
+        self.assertTrue(self.user.profile.avatar.public_id.startswith('profiles/'))
+
+    @override_settings(
+        UPLOADS_BACKEND='uploads.tests.FailingBackend', UPLOADS_MAX_ATTEMPTS=2, UPLOADS_RETRY_DELAY=0
+    )
+    def test_failures_retry_then_give_up(self):
+        """Test a failing upload is retried, then marked failed"""
+        self._create_event(cover=make_image())
+        process_pending()
+        job = UploadJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (UploadJob.PENDING, 1))
+
+        process_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, UploadJob.FAILED)
+        self.assertEqual(Event.objects.get().cover_upload_status, 'failed')
+
+    @override_settings(
+        UPLOADS_BACKEND='uploads.tests.FailingBackend', UPLOADS_MAX_ATTEMPTS=1,
+        EVENT_CACHE_ENABLED=True,
+    )
+    def test_failure_retires_cached_responses(self):
+        """Test giving up on an upload is visible through the cache and validators"""
+        self._create_event(cover=make_image())
+        self.client.force_authenticate(user=None)
+        url = reverse('event-detail', kwargs={'pk': Event.objects.get().pk})
+        first = self.client.get(url)
+        self.assertEqual(first.data['cover_upload_status'], 'pending')
+
+        process_pending()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['cover_upload_status'], 'failed')
+
+    @override_settings(UPLOADS_BACKEND='uploads.tests.FailingBackend')
+    def test_retries_wait_for_their_backoff(self):
+        """Test a failed job is not picked up again until it is due"""
+        self._create_event(cover=make_image())
+        process_pending()
+        job = UploadJob.objects.get()
+        self.assertGreater(job.next_attempt_at, timezone.now())
+        self.assertEqual(process_pending(), 0)
+
+        UploadJob.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(UPLOADS_BACKEND='uploads.tests.FailingBackend', UPLOADS_WORKER_THREADS=1)
+    def test_worker_threads_resubmit_retries(self):
+        """Test in thread mode a failed job is scheduled again after its delay"""
+        self._create_event(cover=make_image())
+        with mock.patch('uploads.pipeline.threading.Timer') as timer:
+            process_pending()
+        delay, resubmit = timer.call_args.args
+        self.assertEqual(delay, settings.UPLOADS_RETRY_DELAY)
+        timer.return_value.start.assert_called_once()
+        with mock.patch('uploads.pipeline.get_executor') as executor:
+            resubmit()
+        executor.return_value.submit.assert_called_once_with(run_job, UploadJob.objects.get().pk)
+
+    def test_processing_errors_are_retried(self):
+        """Test a failure before the upload itself does not strand the job"""
+        self._create_event(cover=make_image())
+        with mock.patch('uploads.pipeline.prepare_upload', side_effect=OSError('disk full')):
+            process_pending()
+        job = UploadJob.objects.get()
+        self.assertEqual((job.status, job.attempts, job.error), (UploadJob.PENDING, 1, 'disk full'))
+
+    def test_stale_processing_jobs_are_requeued(self):
+        """Test jobs whose worker died mid-upload are picked up again"""
+        self._create_event(cover=make_image())
+        UploadJob.objects.update(
+            status=UploadJob.PROCESSING, updated_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(process_pending(), 1)
+        job = UploadJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (UploadJob.DONE, 1))
+        self.assertEqual(Event.objects.get().cover_upload_status, 'done')
+
+    def test_deleted_target_is_skipped(self):
+        """Test a job whose event was deleted finishes without uploading"""
+        self._create_event(cover=make_image())
+        Event.objects.all().delete()
+        process_pending()
+        self.assertEqual(UploadJob.objects.get().status, UploadJob.DONE)
+
+
+class ImageProcessingTests(UploadTestCase):
+    def _spool(self, upload):
+        path = os.path.join(self.tmp, upload.name)
+        with open(path, 'wb') as out:
+            out.write(upload.read())
+        return path
+
+    def test_cover_is_cropped_and_transcoded(self):
+        """Test a large photo is cropped to the cover size as WebP"""
+        exif = Image.Exif()
+        exif[0x010F] = 'PhoneCo'
+        path = self._spool(make_image(size=(4000, 2000), quality=95, exif=exif))
+        output = prepare_upload(path, Event._meta.get_field('cover'))
+        self.addCleanup(os.remove, output)
+
+        self.assertNotEqual(output, path)
+        with Image.open(output) as image:
+            self.assertEqual(image.format, 'WEBP')
+            self.assertEqual(image.size, (800, 600))
+            self.assertNotIn('exif', image.info)
+        self.assertLess(os.path.getsize(output), os.path.getsize(path))
+
+    def test_small_images_are_not_upscaled(self):
+        """Test images under the cover size keep their pixels, cropped to shape"""
+        field = Event._meta.get_field('cover')
+        for size, expected in [((400, 300), (400, 300)), ((1000, 300), (400, 300))]:
+            output = prepare_upload(self._spool(make_image(size=size)), field)
+            self.addCleanup(os.remove, output)
+            with Image.open(output) as image:
+                self.assertEqual(image.size, expected)
+
+    def test_exif_orientation_is_applied(self):
+        """Test rotated camera images come out upright"""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        # Stored sideways: only rotating it gives the portrait size uncropped
+        path = self._spool(make_image(size=(400, 300), exif=exif))
+        output = prepare_image(path, (300, 400), image_format='JPEG')
+        self.addCleanup(os.remove, output)
+        with Image.open(output) as image:
+            self.assertEqual(image.size, (300, 400))
+            self.assertNotIn(0x0112, image.getexif())
+
+    def test_unreadable_file_is_uploaded_unchanged(self):
+        """Test files Pillow cannot decode fall back to the original"""
+        path = os.path.join(self.tmp, 'broken.jpg')
+        with open(path, 'wb') as out:
+            out.write(b'not an image')
+        self.assertEqual(prepare_upload(path, Event._meta.get_field('cover')), path)
+
+    def test_worker_uploads_processed_file(self):
+        """Test the stored cover is the processed WebP and temp files are removed"""
+        self._create_event(cover=make_image(size=(1600, 1200)))
+        process_pending()
+
+        event = Event.objects.get()
+        self.assertEqual(event.cover.format, 'webp')
+        stored = os.path.join(self.tmp, 'storage', f'{event.cover.public_id}.webp')
+        with Image.open(stored) as image:
+            self.assertEqual(image.size, (800, 600))
+        self.assertEqual(os.listdir(os.path.join(self.tmp, 'spool')), [])
+
+
+class SignedUploadTests(UploadTestCase):
+    def _direct_upload(self, kind='cover', upload=None, **overrides):
+        """Sign, then upload to the fake storage server as a browser would"""
+        signed = self.client.post(reverse('upload-sign'), {'kind': kind}).data
+        fields = dict(signed['fields'], **overrides)
+        fields['file'] = upload or make_image()
+        # The storage server is a different origin; no API credentials go there
+        self.client.force_authenticate(user=None)
+        response = self.client.post(signed['url'], fields, format='multipart')
+        self.client.force_authenticate(user=self.user)
+        return response
+
+    def _signed_fields(self, prefix, stored):
+        return {
+            f'{prefix}_public_id': stored['public_id'],
+            f'{prefix}_version': stored['version'],
+            f'{prefix}_signature': stored['signature'],
+        }
+
+    def test_sign_requires_login(self):
+        """Test anonymous users cannot get upload signatures"""
+        self.client.force_authenticate(user=None)
+        response = self.client.post(reverse('upload-sign'), {'kind': 'cover'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_create_event_with_signed_cover(self):
+        """Test an event can reference a cover uploaded straight to storage"""
+        stored = self._direct_upload().data
+        self.assertTrue(stored['public_id'].startswith('events/'))
+
+        response = self._create_event(**self._signed_fields('cover', stored))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['cover_upload_status'], 'done')
+        self.assertFalse(UploadJob.objects.exists())
+
+        event = Event.objects.get()
+        self.assertEqual(event.cover.public_id, stored['public_id'])
+        self.assertEqual(event.cover.format, 'webp')
+
+    def test_patch_avatar_with_signed_upload(self):
+        """Test profiles accept signed avatar uploads"""
+        stored = self._direct_upload('avatar', make_image('me.jpg')).data
+        url = reverse('profile-details', kwargs={'pk': self.user.profile.pk})
+        response = self.client.patch(url, self._signed_fields('avatar', stored))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.avatar.public_id, stored['public_id'])
+
+    def test_tampered_signature_is_rejected(self):
+        """Test a public_id that storage did not sign is refused"""
+        stored = dict(self._direct_upload().data, public_id='events/someone-elses')
+        response = self._create_event(**self._signed_fields('cover', stored))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cover_signature', response.data)
+
+    def test_unsigned_format_is_rejected(self):
+        """Test a format the signature does not cover cannot be sent"""
+        stored = self._direct_upload().data
+        fields = dict(self._signed_fields('cover', stored), cover_format='svg')
+        response = self._create_event(**fields)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cover_format', response.data)
+
+    def test_wrong_folder_is_rejected(self):
+        """Test an avatar upload cannot be used as an event cover"""
+        stored = self._direct_upload('avatar').data
+        response = self._create_event(**self._signed_fields('cover', stored))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cover_public_id', response.data)
+
+    def test_storage_rejects_bad_and_stale_signatures(self):
+        """Test the fake storage server checks the upload signature and age"""
+        response = self._direct_upload(folder='profiles')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self._direct_upload(format='svg')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with override_settings(UPLOADS_SIGNATURE_MAX_AGE=-1):
+            response = self._direct_upload()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ImageUrlTests(UploadTestCase):
+    def test_matches_cloudinary_url(self):
+        """Test memoized URLs are the ones CloudinaryResource builds"""
+        event = Event.objects.create(
+            owner=self.user, title='t', date=timezone.now(), category='music',
+            cover='image/upload/v12/events/abc.jpg',
+        )
+        event.refresh_from_db()
+        self.assertEqual(image_url(event.cover), event.cover.url)
+        self.assertEqual(
+            image_url(event.cover, width=200, crop='fill'),
+            event.cover.build_url(width=200, crop='fill'),
+        )
+        self.assertIsNone(image_url(None))
+
+    def test_nested_transformation_options(self):
+        """Test list and dict option values are cached like any other"""
+        event = Event.objects.create(
+            owner=self.user, title='t', date=timezone.now(), category='music',
+            cover='image/upload/v12/events/abc.jpg',
+        )
+        event.refresh_from_db()
+        chained = [{'crop': 'fill', 'width': 200}, {'angle': 90}]
+        self.assertEqual(
+            image_url(event.cover, transformation=chained),
+            event.cover.build_url(transformation=chained),
+        )
+        self.assertEqual(
+            image_url(event.cover, transformation={'effect': 'sepia'}),
+            event.cover.build_url(transformation={'effect': 'sepia'}),
+        )
+
+    def test_list_reuses_built_urls(self):
+        """Test serializing a list builds each distinct URL once"""
+        for index in range(3):
+            Event.objects.create(
+                owner=self.user, title=f'e{index}', date=timezone.now(), category='music',
+            )
+        self.client.get(reverse('event-list'))
+        misses = url_cache_info().misses
+        response = self.client.get(reverse('event-list'), {'category': 'music'})
+        self.assertEqual(url_cache_info().misses, misses)
+        covers = {event['cover'] for event in response.data['results']}
+        self.assertEqual(len(covers), 1)
+        self.assertIn('default_post_o0lbny', covers.pop())
+
+
+class ImageVariantTests(UploadTestCase):
+    def test_worker_stores_variants(self):
+        """Test the worker writes each configured size and stores its URL"""
+        self._create_event(cover=make_image(size=(1600, 1200)))
+        process_pending()
+
+        variants = Event.objects.get().cover_variants
+        self.assertEqual(list(variants), ['thumbnail', 'medium', 'full'])
+        for name, size in (('thumbnail', (200, 150)), ('medium', (400, 300))):
+            path = os.path.join(self.tmp, 'storage', variants[name][len('/fake-storage/'):])
+            with Image.open(path) as image:
+                self.assertEqual(image.size, size)
+
+    def test_signed_upload_stores_variants(self):
+        """Test signed avatar uploads get variants when they are attached"""
+        signed = self.client.post(reverse('upload-sign'), {'kind': 'avatar'}).data
+        stored = self.client.post(
+            signed['url'], dict(signed['fields'], file=make_image(size=(500, 500))),
+            format='multipart',
+        ).data
+        url = reverse('profile-details', kwargs={'pk': self.user.profile.pk})
+        response = self.client.patch(url, {
+            'avatar_public_id': stored['public_id'],
+            'avatar_version': stored['version'],
+            'avatar_signature': stored['signature'],
+        })
+        self.assertIn(stored['public_id'], response.data['avatar_variants']['thumbnail'])
+
+    def test_default_cover_uses_transformation_urls(self):
+        """Test images without stored variants fall back to Cloudinary transformations"""
+        Event.objects.create(owner=self.user, title='t', date=timezone.now(), category='music')
+        response = self.client.get(reverse('event-list'))
+        variants = response.data['results'][0]['cover_variants']
+        self.assertIn('c_fill,h_150,w_200', variants['thumbnail'])
+        self.assertIn('default_post_o0lbny', variants['full'])
+
+
+class DeduplicationTests(UploadTestCase):
+    def _stored_files(self):
+        return sum(len(files) for _, _, files in os.walk(os.path.join(self.tmp, 'storage')))
+
+    def test_spool_hashes_stream(self):
+        """Test spooling returns the SHA-256 of the whole file"""
+        upload = make_image(size=(900, 700))
+        expected = hashlib.sha256(upload.read()).hexdigest()
+        upload.seek(0)
+        path, digest = spool(upload)
+        self.assertEqual(digest, expected)
+        self.assertTrue(os.path.exists(path))
+
+    def test_reupload_reuses_stored_cover(self):
+        """Test the same banner uploaded twice is stored and resized once"""
+        self._create_event(cover=make_image())
+        process_pending()
+        first = Event.objects.get()
+        stored = self._stored_files()
+
+        response = self._create_event(title='Again', cover=make_image())
+        self.assertEqual(response.data['cover_upload_status'], 'done')
+        self.assertEqual(UploadJob.objects.count(), 1)
+        self.assertEqual(self._stored_files(), stored)
+
+        second = Event.objects.get(title='Again')
+        self.assertEqual(second.cover.public_id, first.cover.public_id)
+        self.assertEqual(second.cover_variants, first.cover_variants)
+        self.assertEqual(os.listdir(os.path.join(self.tmp, 'spool')), [])
+
+    def test_queued_duplicates_upload_once(self):
+        """Test identical files queued together are uploaded once"""
+        self._create_event(cover=make_image())
+        self._create_event(title='Again', cover=make_image())
+        self.assertEqual(process_pending(), 2)
+        self.assertEqual(Asset.objects.count(), 1)
+        covers = {event.cover.public_id for event in Event.objects.all()}
+        self.assertEqual(len(covers), 1)
+
+    def test_same_file_as_avatar_is_processed_again(self):
+        """Test assets are per image field, since sizes differ"""
+        self._create_event(cover=make_image())
+        process_pending()
+        url = reverse('profile-details', kwargs={'pk': self.user.profile.pk})
+        response = self.client.patch(url, {'avatar': make_image()}, format='multipart')
+        self.assertEqual(response.data['avatar_upload_status'], 'pending')
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(UploadTestCase):
+    def test_opens_after_threshold_then_half_opens(self):
+        """Test the breaker rejects calls until the reset period passes"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=2, reset_after=30, clock=clock)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(StorageUnavailable):
+            breaker.before_call()
+
+        clock.now = 31
+        breaker.before_call()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        # Only the one trial call goes through
+        with self.assertRaises(StorageUnavailable):
+            breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        clock.now = 62
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual((breaker.state, breaker.failures), (CircuitBreaker.CLOSED, 0))
+
+    @override_settings(UPLOADS_FAKE_ERROR_RATE=1, UPLOADS_BREAKER_THRESHOLD=2)
+    def test_open_breaker_fails_fast_and_keeps_jobs(self):
+        """Test jobs stop hitting storage once the breaker opens"""
+        for index in range(4):
+            self._create_event(title=f'Event {index}', cover=make_image(size=(90 + index, 90)))
+        self.assertEqual(process_pending(), 2)
+
+        stats = get_backend().stats()
+        self.assertEqual((stats['calls'], stats['failures']), (2, 2))
+        self.assertEqual(stats['breaker'], 'open')
+        self.assertEqual(stats['rejected'], 1)
+        # The rejected job was not charged an attempt
+        self.assertEqual(
+            sorted(UploadJob.objects.values_list('attempts', flat=True)), [0, 0, 1, 1]
+        )
+        self.assertFalse(UploadJob.objects.exclude(status=UploadJob.PENDING).exists())
+        self.assertEqual(
+            {str(event.cover) for event in Event.objects.all()}, {'default_post_o0lbny'}
+        )
+
+    @override_settings(UPLOADS_FAKE_LATENCY=0.2, UPLOADS_READ_TIMEOUT=0.05)
+    def test_slow_storage_times_out(self):
+        """Test uploads slower than the read timeout fail and are counted"""
+        self._create_event(cover=make_image())
+        process_pending()
+        self.assertEqual(UploadJob.objects.get().attempts, 1)
+        self.assertEqual(get_backend().stats()['timeouts'], 1)
+
+    def test_stats_are_staff_only(self):
+        """Test storage stats need a staff account"""
+        url = reverse('upload-storage-stats')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(url).data['backend'], 'FakeBackend')
@@ -0,0 +1,9 @@
+# uploads/urls.py
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('uploads/sign/', views.SignUpload.as_view(), name='upload-sign'),
+    path('uploads/storage-stats/', views.StorageStats.as_view(), name='upload-storage-stats'),
+    path('uploads/fake-storage/', views.FakeStorageUpload.as_view(), name='fake-storage-upload'),
+]
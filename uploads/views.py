@@ -0,0 +1,106 @@
+# uploads/views.py
+import hmac
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.http import Http404
+from rest_framework import permissions, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .serializers import SignUploadSerializer
+from .storage import FakeBackend, get_backend
+
+# Which model field each kind of signed upload is for
+SIGNED_UPLOAD_FIELDS = {
+    'cover': ('events.Event', 'cover'),
+    'avatar': ('profiles.Profile', 'avatar'),
+}
+
+
+class SignUpload(APIView):
+    """
+    Issue short-lived signed parameters for uploading a cover or avatar
+    straight to storage. The client POSTs the file and `fields` to `url`,
+    then sends the public_id, version and signature from the storage
+    response to the event or profile endpoint.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = SignUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        model, field_name = SIGNED_UPLOAD_FIELDS[serializer.validated_data['kind']]
+        field = apps.get_model(model)._meta.get_field(field_name)
+        data = get_backend().sign_upload(field)
+        data['expires_at'] = data['fields']['timestamp'] + settings.UPLOADS_SIGNATURE_MAX_AGE
+        return Response(data)
+
+
+class StorageStats(APIView):
+    """
+    Call counts, latency and circuit breaker state for this process's
+    storage client. Only available to staff.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(get_backend().stats())
+
+
+class FakeStorageUpload(APIView):
+    """
+    Stand-in for Cloudinary's upload API when FakeBackend is configured.
+    Checks the request signature and age like the real service, stores
+    the file and answers with a signed public_id and version.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        backend = get_backend().backend
+        if not isinstance(backend, FakeBackend):
+            raise Http404
+
+        upload = request.FILES.get('file')
+        params = {
+            key: request.data[key]
+            for key in ('timestamp', 'folder', 'format')
+            if key in request.data
+        }
+        if upload is None or 'timestamp' not in params:
+            return Response(
+                {'error': {'message': 'Missing file or timestamp'}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not hmac.compare_digest(backend.sign(params), str(request.data.get('signature', ''))):
+            return Response(
+                {'error': {'message': 'Invalid Signature'}},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+        try:
+            age = time.time() - int(params['timestamp'])
+        except ValueError:
+            age = None
+        if age is None or age > settings.UPLOADS_SIGNATURE_MAX_AGE:
+            return Response(
+                {'error': {'message': 'Stale request'}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Cloudinary converts to the signed format; the fake only renames
+        if 'format' in params:
+            suffix = f".{params['format']}"
+        else:
+            suffix = Path(upload.name or '').suffix.lower()
+        public_id, version = backend.store(upload, params.get('folder', ''), suffix)
+        return Response({
+            'public_id': public_id,
+            'version': version,
+            'format': suffix.lstrip('.'),
+            'signature': backend.sign({'public_id': public_id, 'version': version}),
+        })